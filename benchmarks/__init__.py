@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+""" Performance benchmarks with stored baselines. Run: python -m benchmarks """
@@ -0,0 +1,49 @@
+# benchmarks/__main__.py
+"""
+python -m benchmarks                 run everything, fail on regressions
+python -m benchmarks -k timeline     only cases whose name contains "timeline"
+python -m benchmarks --update        record the current numbers as baselines
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+# Qt cases never open windows
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import cases  # noqa: F401  (registers the cases)
+from benchmarks.harness import (BASELINE_PATH, DEFAULT_TOLERANCE, compare, load_baselines,
+                                run_all, save_baselines)
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("-k", dest="pattern", help="Only run cases containing this text")
+    parser.add_argument("--repeat", type=int, help="Timed runs per case (default per case)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--baselines", default=BASELINE_PATH)
+    parser.add_argument("--update", action="store_true", help="Save results as the new baselines")
+    args = parser.parse_args()
+
+    print("⏱  Kanha benchmarks")
+    with tempfile.TemporaryDirectory(prefix="kanha_bench_") as workdir:
+        results = run_all(workdir, args.pattern, args.repeat)
+
+    if args.update:
+        save_baselines(results, args.baselines)
+        print(f"✅ Baselines saved to {args.baselines}")
+        return 0
+
+    regressions = compare(results, load_baselines(args.baselines), args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} performance regression(s) (tolerance {args.tolerance:.0%}):")
+        for name, base, now, ratio in regressions:
+            print(f"  {name:<40} {base * 1000:.3f} ms -> {now * 1000:.3f} ms  ({ratio:.2f}x)")
+        return 1
+    print("\n✅ No regressions against baselines")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
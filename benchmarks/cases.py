@@ -0,0 +1,242 @@
+# benchmarks/cases.py
+""" The hot paths we gate on. Setup runs untimed; the returned callable is timed. """
+import os
+import shutil
+
+import numpy as np
+
+from benchmarks.harness import benchmark, SkipBenchmark
+from benchmarks import synthetic
+
+FONT = {"font": "Arial", "size": 40, "color": "#FFFFFF", "y_pos": 50}
+
+# --- SUBTITLES ---
+@benchmark("generate_ass_file", sizes=(1_000, 10_000, 100_000))
+def bench_generate_ass(size, workdir):
+    from core.render_engine import generate_ass_file
+    subs = synthetic.make_subtitles(size)
+    path = os.path.join(workdir, f"bench_{size}.ass")
+    return lambda: generate_ass_file(subs, FONT, path)
+
+@benchmark("seconds_to_ass_time", sizes=(1_000, 10_000))
+def bench_ass_time_scalar(size, workdir):
+    from utils.time_utils import seconds_to_ass_time
+    times = (np.random.default_rng(0).random(size) * 7200).tolist()
+    return lambda: [seconds_to_ass_time(t) for t in times]
+
+@benchmark("format_ass_column", sizes=(10_000, 100_000, 1_000_000))
+def bench_ass_time_column(size, workdir):
+    from utils.timebase import format_ass
+    times = np.random.default_rng(0).random(size) * 7200
+    return lambda: format_ass(times)
+
+# --- PLUGINS ---
+@benchmark("discover_plugins", sizes=(10, 100), repeat=3)
+def bench_discover_plugins(size, workdir):
+    from core.plugin_loader import PluginManager
+    folder = os.path.join(workdir, f"plugins_{size}")
+    shutil.rmtree(folder, ignore_errors=True)
+    synthetic.make_plugin_folder(folder, size, broken=max(1, size // 20))
+    manager = PluginManager(folder)
+    return manager.discover_plugins
+
+# --- AUDIO ---
+def _wav(workdir, seconds):
+    path = os.path.join(workdir, f"tone_{seconds}s.wav")
+    if not os.path.exists(path):
+        synthetic.write_wav(path, seconds, pattern=(1.2, 0.6))
+    return path
+
+@benchmark("waveform_pyramid", sizes=(10, 60, 300), repeat=3)
+def bench_waveform(size, workdir):
+    from core.audio_analysis import analyze_audio
+    path = _wav(workdir, size)
+    return lambda: analyze_audio(path, ("waveform",))
+
+@benchmark("audio_analysis_all", sizes=(60,), repeat=3)
+def bench_analysis(size, workdir):
+    from core.audio_analysis import analyze_audio
+    path = _wav(workdir, size)
+    return lambda: analyze_audio(path)
+
+@benchmark("waveform_resample", sizes=(1_000, 4_000))
+def bench_waveform_resample(size, workdir):
+    from core.audio_analysis import analyze_audio
+    pyramid = analyze_audio(_wav(workdir, 300), ("waveform",))["waveform"]
+    return lambda: pyramid.resample(size)
+
+@benchmark("audio_sync_pair", sizes=(60, 600), repeat=3)
+def bench_audio_sync(size, workdir):
+    """ Coarse-to-fine offset of a half-length clip inside a `size` s recording (decode untimed) """
+    from core.audio_sync import _prepare, sync_pair
+    a = _prepare(_wav(workdir, size))
+    other = os.path.join(workdir, f"cam_{size}s.wav")
+    if not os.path.exists(other):
+        synthetic.write_wav(other, size / 2, pattern=(0.7, 0.9), seed=1)
+    b = _prepare(other)
+    return lambda: sync_pair(a, b)
+
+@benchmark("audio_mix", sizes=(60, 600), repeat=3)
+def bench_audio_mix(size, workdir):
+    """ Full A1-A3 mixdown of a `size` s sequence: 5 s clips, crossfades, gain and pan """
+    from core.mixer import AudioMixer, crossfade
+    from core.timeline import Sequence
+    seq = Sequence()
+    source = seq.source_id(_wav(workdir, 10))
+    fade_out, fade_in = crossfade(0.5)
+    for i, track in enumerate(("A1", "A2", "A3")):
+        effects = [fade_in, fade_out, {"name": "Pan", "pan": i - 1.0}, {"name": "Amplitude", "gain_db": -6.0}]
+        for start in np.arange(0.0, size, 4.5):
+            seq.add_clip(track, seq.new_clip_id(), source, 1.0, 6.0, float(start), effects)
+    mixer = AudioMixer(seq)
+
+    def run():
+        for _ in mixer.blocks(0.0, size):
+            pass
+    return run
+
+# --- TIMELINE ---
+@benchmark("timeline_paint", sizes=(1_000, 20_000), qt=True)
+def bench_timeline_paint(size, workdir):
+    """ One paint at each level of detail (bars, labels, waveform tiles) """
+    from core.audio_analysis import analyze_audio
+    from ui.widgets.timeline import TimelineView
+    path = _wav(workdir, 10)
+    view = TimelineView()
+    view.resize(1600, 400)
+    view.set_sequence(synthetic.make_sequence(size, source=path))
+    view.set_waveform(path, analyze_audio(path, ("waveform",))["waveform"])
+    zooms = (0.2, 20.0, 100.0)
+
+    def paint_all():
+        for pps in zooms:
+            view.pps = pps
+            view.scroll = size * 1.5 # Middle of the sequence
+            view.grab()
+    return paint_all
+
+@benchmark("caption_playback", sizes=(1_000, 10_000), qt=True)
+def bench_caption_playback(size, workdir):
+    """ 200 s of 20 Hz playhead ticks over `size` captions: lookup every tick, ~80 caption renders """
+    from PySide6.QtWidgets import QFrame
+    from core.project import ProjectState
+    from ui.widgets.caption_overlay import CaptionOverlay
+    project = ProjectState()
+    project.set_field("subtitles", synthetic.make_subtitles(size))
+    surface = QFrame()
+    surface.resize(1280, 720)
+    surface.show()
+    overlay = CaptionOverlay(surface)
+    overlay.set_project(project)
+    ticks = np.arange(0.0, 200.0, 0.05).tolist()
+
+    def play():
+        overlay._cache.clear()
+        for t in ticks:
+            overlay.set_time(t)
+    return play
+
+# --- VIDEO ---
+@benchmark("shot_detector", sizes=(600, 6_000), repeat=3)
+def bench_shot_detector(size, workdir):
+    """ Feature + boundary pass over `size` tiny frames (6 samples/s: 100 s and 1000 s of video) """
+    from core.shot_detection import BATCH, FRAME_H, FRAME_W, SAMPLE_FPS, ShotDetector
+    frames = synthetic.make_frames(size, FRAME_W, FRAME_H)
+    times = np.arange(size) / SAMPLE_FPS
+
+    def run():
+        detector = ShotDetector()
+        for i in range(0, size, BATCH):
+            detector.feed(frames[i:i + BATCH], times[i:i + BATCH])
+        return detector.finish()
+    return run
+
+@benchmark("transitions", sizes=(720, 1080), repeat=3)
+def bench_transitions(size, workdir):
+    """ 30 frames of each transition at `size`p (mattes cached by a first pass, as in preview) """
+    from core.transitions import TRANSITIONS, TransitionRenderer
+    width = size * 16 // 9
+    a, b = synthetic.make_frames(2, width, size, 3)
+    renderer = TransitionRenderer(width, size)
+
+    def run():
+        for name in TRANSITIONS:
+            for i in range(30):
+                renderer.render(name, a, b, i / 29)
+    run()
+    return run
+
+MOTION = {"pos_x": 880, "pos_y": 600, "scale": 85, "rotation": 12}
+
+@benchmark("motion_draft", sizes=(1080, 2160))
+def bench_motion_draft(size, workdir):
+    """ One interactive Motion preview frame: quarter-res render from the cached proxy """
+    from core.motion import DRAFT_FACTOR, MotionFrame, downsample, draft_canvas
+    width = size * 16 // 9
+    frame = synthetic.make_frames(1, width, size, 3)[0]
+    draft = MotionFrame(downsample(frame, DRAFT_FACTOR))
+    canvas = draft_canvas(width, size)
+    out = np.empty((canvas[1], canvas[0], 3), np.uint8)
+    return lambda: draft.render(MOTION, canvas, out)
+
+@benchmark("motion_refine", sizes=(1080, 2160), repeat=3)
+def bench_motion_refine(size, workdir):
+    """ Full-resolution Motion render (background refinement after a drag) """
+    from core.motion import MotionFrame, sequence_canvas
+    # Sanity check first: the default Motion reproduces 4:3 and portrait frames inside their bars
+    for w, h in ((size * 4 // 3, size), (size * 9 // 16, size)):
+        frame = synthetic.make_frames(1, w, h, 3)[0]
+        cw, ch = sequence_canvas(w, h)
+        x0, y0 = (cw - w) // 2, (ch - h) // 2
+        if not np.array_equal(MotionFrame(frame).render({}, (cw, ch))[y0:y0 + h, x0:x0 + w], frame):
+            raise AssertionError(f"Default Motion does not reproduce a {w}x{h} frame")
+    width = size * 16 // 9
+    full = MotionFrame(synthetic.make_frames(1, width, size, 3)[0])
+    out = np.empty((size, width, 3), np.uint8)
+    return lambda: full.render(MOTION, (width, size), out)
+
+def _lut(workdir):
+    from core.lut import load_cube
+    path = os.path.join(workdir, "grade.cube")
+    if not os.path.exists(path):
+        synthetic.write_cube(path)
+    return load_cube(path)
+
+@benchmark("lut_trilinear", sizes=(720, 1080), repeat=3)
+def bench_lut_trilinear(size, workdir):
+    lut = _lut(workdir)
+    frame = synthetic.make_frames(1, size * 16 // 9, size, 3)[0]
+    out = np.empty_like(frame)
+    return lambda: lut.apply(frame, out, baked=False)
+
+@benchmark("lut_baked", sizes=(720, 1080, 2160))
+def bench_lut_baked(size, workdir):
+    """ One-gather path (the table is baked untimed, once per LUT) """
+    lut = _lut(workdir)
+    lut.bake()
+    frame = synthetic.make_frames(1, size * 16 // 9, size, 3)[0]
+    out = np.empty_like(frame)
+    return lambda: lut.apply(frame, out)
+
+# --- FRAMES ---
+def _rust():
+    from core.audio_engine import RUST_AVAILABLE, kanha_core
+    if not RUST_AVAILABLE:
+        raise SkipBenchmark("kanha_core (Rust engine) not built")
+    return kanha_core
+
+@benchmark("frame_overlay", sizes=(720, 1080, 2160))
+def bench_overlay(size, workdir):
+    kanha_core = _rust()
+    width = size * 16 // 9
+    background = synthetic.make_frames(1, width, size, 3)[0].tobytes()
+    fg_w, fg_h = width // 2, size // 2
+    foreground = synthetic.make_frames(1, fg_w, fg_h, 4)[0].tobytes()
+    return lambda: kanha_core.ImageProcessor.overlay(background, width, foreground, fg_w, fg_h,
+                                                     width // 4, size // 4, 0.8)
+
+@benchmark("frame_color_adjust", sizes=(720, 1080, 2160))
+def bench_color_adjust(size, workdir):
+    kanha_core = _rust()
+    frame = synthetic.make_frames(1, size * 16 // 9, size, 3)[0].tobytes()
+    return lambda: kanha_core.ImageProcessor.color_adjust(frame, 20, 30.0)
@@ -0,0 +1,124 @@
+# benchmarks/harness.py
+"""
+Minimal benchmark runner: cases register with @benchmark, each run is
+timed `repeat` times after a warm-up, and the best time is compared to
+benchmarks/baselines.json. Anything slower than baseline * (1 + tolerance)
+is reported as a regression and fails the run.
+"""
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import time
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_TOLERANCE = 0.25
+# Cases faster than this are too noisy to gate on a relative tolerance alone
+NOISE_FLOOR = 0.0005
+
+BENCHMARKS = {}
+
+class SkipBenchmark(Exception):
+    """ Raised by a case setup when it cannot run here (e.g. no Rust engine) """
+
+class Case:
+    def __init__(self, name, setup, sizes, qt=False, repeat=5):
+        self.name = name
+        self.setup = setup   # setup(size, workdir) -> zero-arg callable that is timed
+        self.sizes = sizes
+        self.qt = qt
+        self.repeat = repeat
+
+def benchmark(name, sizes, qt=False, repeat=5):
+    """ Registers `setup(size, workdir)`; its returned callable is what gets timed """
+    def wrap(setup):
+        BENCHMARKS[name] = Case(name, setup, tuple(sizes), qt, repeat)
+        return setup
+    return wrap
+
+def key(name, size):
+    return f"{name}[{size}]"
+
+# ------------------------------------------
+#  QT
+# ------------------------------------------
+_app = None
+
+def qt_app():
+    """ Offscreen QApplication shared by all Qt cases """
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication([])
+    return _app
+
+# ------------------------------------------
+#  RUNNING
+# ------------------------------------------
+def time_case(case, size, workdir, repeat=None):
+    """ {"best", "median", "runs"} in seconds, or {"skipped": reason} """
+    if case.qt:
+        qt_app()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): # Silence plugin/loader prints
+            fn = case.setup(size, workdir)
+    except SkipBenchmark as e:
+        return {"skipped": str(e)}
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn() # Warm-up (imports, caches, page faults)
+        for _ in range(repeat or case.repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+    return {"best": min(times), "median": statistics.median(times), "runs": len(times)}
+
+def run_all(workdir, pattern=None, repeat=None, report=print):
+    results = {}
+    for case in BENCHMARKS.values():
+        if pattern and pattern not in case.name:
+            continue
+        for size in case.sizes:
+            result = time_case(case, size, workdir, repeat)
+            results[key(case.name, size)] = result
+            if "skipped" in result:
+                report(f"  {key(case.name, size):<40} skipped: {result['skipped']}")
+            else:
+                report(f"  {key(case.name, size):<40} {result['best'] * 1000:10.3f} ms"
+                       f"  (median {result['median'] * 1000:.3f} ms)")
+    return results
+
+# ------------------------------------------
+#  BASELINES
+# ------------------------------------------
+def load_baselines(path=BASELINE_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"machine": None, "cases": {}}
+
+def save_baselines(results, path=BASELINE_PATH, merge=True):
+    data = load_baselines(path) if merge else {"cases": {}}
+    data["machine"] = {"python": platform.python_version(), "system": platform.platform(),
+                       "processor": platform.processor() or platform.machine()}
+    for name, result in results.items():
+        if "best" in result:
+            data["cases"][name] = round(result["best"], 6)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def compare(results, baselines, tolerance=DEFAULT_TOLERANCE):
+    """ [(case, baseline s, now s, ratio)] for every case slower than allowed """
+    regressions = []
+    for name, result in results.items():
+        base = baselines.get("cases", {}).get(name)
+        if base is None or "best" not in result:
+            continue
+        limit = max(base * (1 + tolerance), base + NOISE_FLOOR)
+        if result["best"] > limit:
+            regressions.append((name, base, result["best"], result["best"] / base))
+    return regressions
@@ -0,0 +1,98 @@
+# benchmarks/synthetic.py
+""" Generators for benchmark inputs: everything is made locally, no media files needed """
+import os
+import wave
+
+import numpy as np
+
+def write_wav(path, seconds=10.0, sample_rate=48000, channels=2, pattern=(1.0, 0.5), freq=220.0, seed=0):
+    """
+    16-bit WAV of tone bursts and silence. `pattern` is (tone s, silence s),
+    repeated, so speech detection and waveform analysis see real edges.
+    A little noise keeps the silent parts from being exact zeros.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate)
+    t = np.arange(n) / sample_rate
+    tone, silence = pattern
+    on = (t % (tone + silence)) < tone
+    signal = np.where(on, 0.5 * np.sin(2 * np.pi * freq * t), 0.0)
+    signal += rng.normal(0, 0.001, n)
+    pcm = (np.clip(signal, -1, 1) * 32767).astype("<i2")
+    frames = np.repeat(pcm[:, None], channels, axis=1)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(frames.tobytes())
+    return path
+
+WORDS = ("the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "kanha", "studio",
+         "timeline", "caption", "render", "frame", "audio", "video")
+
+def make_subtitles(count, seed=0, words_per_line=6):
+    """ Subtitle dicts like the AI engine produces: contiguous 1-4 s segments """
+    rng = np.random.default_rng(seed)
+    lengths = rng.uniform(1.0, 4.0, count)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    picks = rng.integers(0, len(WORDS), (count, words_per_line))
+    return [{"start": float(s), "end": float(e), "text": " ".join(WORDS[i] for i in row)}
+            for s, e, row in zip(starts, ends, picks)]
+
+PLUGIN_TEMPLATE = '''# Generated benchmark plugin {i}
+def run_tool(editor_instance):
+    return {i}
+
+def register_plugin():
+    return {{"name": "Bench Plugin {i}", "version": "1.0.{i}", "type": "tool", "action": run_tool}}
+'''
+
+def make_plugin_folder(folder, count, broken=0):
+    """ `count` valid plugins plus `broken` ones that raise on import """
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        with open(os.path.join(folder, f"bench_plugin_{i}.py"), "w", encoding="utf-8") as f:
+            f.write(PLUGIN_TEMPLATE.format(i=i))
+    for i in range(broken):
+        with open(os.path.join(folder, f"broken_plugin_{i}.py"), "w", encoding="utf-8") as f:
+            f.write("raise RuntimeError('broken on purpose')\n")
+    return folder
+
+def make_frames(count, width=1920, height=1080, channels=3, seed=0):
+    """ Raw uint8 frames (count, height, width, channels): gradients plus noise """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.empty((height, width, channels), np.float32)
+    for c in range(channels):
+        base[..., c] = (x * (c + 1) / channels + y * (channels - c) / channels) / 2
+    frames = np.empty((count, height, width, channels), np.uint8)
+    for i in range(count):
+        frames[i] = np.clip(base + rng.integers(-8, 8, (1, width, 1)) + i, 0, 255)
+    return frames
+
+def make_sequence(clips_per_track, source="bench.wav", clip_len=2.5, gap=0.5):
+    """ core.timeline.Sequence with evenly spaced clips on every default track """
+    from core.timeline import Sequence
+    seq = Sequence()
+    sid = seq.source_id(source)
+    starts = np.arange(clips_per_track) * (clip_len + gap)
+    for track in seq.tracks:
+        ids = np.arange(clips_per_track) + seq.next_id
+        track.bulk_load(ids, np.full(clips_per_track, sid), np.zeros(clips_per_track),
+                        np.full(clips_per_track, clip_len), starts)
+        seq.next_id += clips_per_track
+    return seq
+
+def write_cube(path, size=33):
+    """ .cube 3D LUT with a filmic-ish grade (gamma, channel cross-talk, warm tint) """
+    grid = np.linspace(0.0, 1.0, size)
+    b, g, r = np.meshgrid(grid, grid, grid, indexing="ij") # .cube order: red fastest
+    rgb = np.stack([r, g, b], axis=-1).reshape(-1, 3) ** 0.8
+    graded = np.clip(rgb @ np.array([[0.9, 0.05, 0.0], [0.1, 0.9, 0.1], [0.0, 0.05, 0.9]]) * [1.05, 1.0, 0.92], 0, 1)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'TITLE "Kanha bench"\nLUT_3D_SIZE {size}\n')
+        f.write("\n".join(f"{v[0]:.6f} {v[1]:.6f} {v[2]:.6f}" for v in graded))
+        f.write("\n")
+    return path
@@ -1,6 +1,8 @@
 import threading
 import time
 
+from core import tracing
+
 class AIEngine:
     """ 
     Handles background AI tasks (Captioning, Object Removal).
@@ -21,14 +23,18 @@ class AIEngine:
 
     def _run_captioning(self, audio_path, callback):
         print(f"🤖 AI: Starting transcription for {audio_path}")
-        # --- STUB: SIMULATE AI WORK ---
-        time.sleep(2) 
-        # In future, put OpenAI/Whisper code here
-        result = [
-            {"start": 0.5, "end": 2.0, "text": "Hello world"},
-            {"start": 2.2, "end": 4.0, "text": "Welcome to Kanha Studio"}
-        ]
-        # ------------------------------
+        tracing.counter("ai.jobs", 1, "ai")
+        with tracing.span("ai.caption", "ai", path=audio_path) as sp:
+            # --- STUB: SIMULATE AI WORK ---
+            time.sleep(2) 
+            # In future, put OpenAI/Whisper code here
+            result = [
+                {"start": 0.5, "end": 2.0, "text": "Hello world"},
+                {"start": 2.2, "end": 4.0, "text": "Welcome to Kanha Studio"}
+            ]
+            # ------------------------------
+            sp.set(segments=len(result))
+        tracing.counter("ai.jobs", 0, "ai")
         print("🤖 AI: Transcription Complete")
         self.is_busy = False
         callback(result)
\ No newline at end of file
@@ -0,0 +1,353 @@
+# core/audio_analysis.py
+import math
+import time
+import wave
+
+import numpy as np
+
+from core import tracing
+from core.audio_engine import BLOCK_FRAMES, SpeechDetector, open_pcm_stream
+
+class Analyser:
+    """
+    Base class for anything that wants to look at decoded audio.
+    analyze_audio() calls start() once, feed() for every PCM block
+    (float32, frames x channels) and finish() at the end of the stream.
+    """
+    name = ""
+
+    def start(self, sample_rate, channels):
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    def feed(self, block):
+        pass
+
+    def finish(self):
+        return None
+
+# --- REGISTRY ---
+ANALYSERS = {}
+
+def register_analyser(name, cls=None):
+    """ Registers an Analyser class under `name`. Usable as a decorator. """
+    def _register(klass):
+        klass.name = name
+        ANALYSERS[name] = klass
+        return klass
+    return _register(cls) if cls is not None else _register
+
+def _build(spec):
+    """ Accepts "name", ("name", {options}) or an Analyser instance """
+    if isinstance(spec, Analyser):
+        return spec
+    if isinstance(spec, str):
+        name, options = spec, {}
+    else:
+        name, options = spec
+    if name not in ANALYSERS:
+        raise ValueError(f"Unknown audio analyser: {name}")
+    return ANALYSERS[name](**options)
+
+def analyze_audio(path, analyses=("waveform", "speech", "stats"), block_frames=BLOCK_FRAMES):
+    """
+    Decodes `path` ONCE and fans every PCM block out to all analysers.
+    Returns {analyser name: result}.
+    """
+    runners = [_build(spec) for spec in analyses]
+    sample_rate, channels, blocks = open_pcm_stream(path, block_frames)
+
+    for a in runners:
+        a.start(sample_rate, channels)
+    if tracing.ENABLED:
+        return _analyze_traced(runners, blocks)
+    for block in blocks:
+        for a in runners:
+            a.feed(block)
+    return {a.name: a.finish() for a in runners}
+
+def _analyze_traced(runners, blocks):
+    """ analyze_audio loop with decode / analyse time split per block """
+    blocks = iter(blocks)
+    count = 0
+    while True:
+        t0 = time.perf_counter()
+        block = next(blocks, None)
+        t1 = time.perf_counter()
+        if block is None:
+            break
+        tracing.complete("analysis.decode", t0, t1, "audio", frames=len(block))
+        for a in runners:
+            a.feed(block)
+        tracing.complete("analysis.feed", t1, time.perf_counter(), "audio")
+        count += 1
+    with tracing.span("analysis.finish", "audio", blocks=count):
+        return {a.name: a.finish() for a in runners}
+
+def _mono(block):
+    return block[:, 0] if block.shape[1] == 1 else block.mean(axis=1, dtype=np.float32)
+
+# ------------------------------------------
+#  BUILT-IN ANALYSERS
+# ------------------------------------------
+class WaveformPyramid:
+    """
+    RMS levels at `bin_frames` resolution plus coarser levels (each one 2x
+    coarser than the previous), so the timeline can redraw any zoom without
+    touching the audio again.
+    """
+    def __init__(self, levels, bin_frames, sample_rate):
+        self.levels = levels # levels[0] is finest
+        self.bin_frames = bin_frames
+        self.sample_rate = sample_rate
+
+    def resample(self, width):
+        """ Returns `width` points normalised to 0.0-1.0 (same contract as AudioClip.get_waveform) """
+        if width <= 0 or not len(self.levels[0]):
+            return [0.0] * max(0, width)
+        # Coarsest level that still has at least one bin per pixel
+        level = self.levels[0]
+        for candidate in self.levels:
+            if len(candidate) < width:
+                break
+            level = candidate
+        edges = np.linspace(0, len(level), width + 1).astype(np.int64)
+        edges[1:] = np.maximum(edges[1:], edges[:-1] + 1)
+        edges = np.minimum(edges, len(level))
+        sq = np.add.reduceat(level.astype(np.float64) ** 2, np.minimum(edges[:-1], len(level) - 1))
+        counts = np.maximum(edges[1:] - edges[:-1], 1)
+        points = np.sqrt(sq / counts)
+        peak = points.max()
+        if peak > 0:
+            points /= peak
+        return points.astype(np.float32).tolist()
+
+    def window(self, t0, t1, width):
+        """
+        `width` RMS points covering source seconds [t0, t1), scaled so the
+        loudest bin of the file is 1.0. Picks the pyramid level closest to
+        one bin per point, so cost is O(width) at any zoom.
+        """
+        if width <= 0 or not len(self.levels[0]) or t1 <= t0:
+            return np.zeros(max(0, width), np.float32)
+        if not hasattr(self, "_peak"):
+            self._peak = float(self.levels[0].max()) or 1.0
+        bin_t = self.bin_frames / self.sample_rate
+        bins_per_point = (t1 - t0) / bin_t / width
+        level = int(np.clip(np.floor(np.log2(max(bins_per_point, 1.0))), 0, len(self.levels) - 1))
+        data = self.levels[level]
+        centres = t0 + (np.arange(width) + 0.5) * ((t1 - t0) / width)
+        idx = (centres / (bin_t * 2 ** level)).astype(np.int64)
+        inside = (idx >= 0) & (idx < len(data))
+        out = np.zeros(width, np.float32)
+        out[inside] = data[idx[inside]] / self._peak
+        return out
+
+@register_analyser("waveform")
+class WaveformAnalyser(Analyser):
+    def __init__(self, bin_frames=256):
+        self.bin_frames = bin_frames
+
+    def start(self, sample_rate, channels):
+        super().start(sample_rate, channels)
+        self._tail = np.zeros(0, np.float32)
+        self._bins = []
+
+    def feed(self, block):
+        mono = _mono(block)
+        if self._tail.size:
+            mono = np.concatenate((self._tail, mono))
+        n = len(mono) // self.bin_frames
+        if n:
+            frames = mono[:n * self.bin_frames].reshape(n, self.bin_frames)
+            self._bins.append(np.einsum("ij,ij->i", frames, frames) / self.bin_frames)
+        self._tail = mono[n * self.bin_frames:].copy()
+
+    def finish(self):
+        if self._tail.size:
+            self._bins.append(np.array([np.dot(self._tail, self._tail) / self._tail.size], np.float32))
+        power = np.concatenate(self._bins) if self._bins else np.zeros(0, np.float32)
+        levels = [np.sqrt(power).astype(np.float32)]
+        while len(power) > 1:
+            if len(power) % 2:
+                power = np.append(power, power[-1])
+            power = power.reshape(-1, 2).mean(axis=1)
+            levels.append(np.sqrt(power).astype(np.float32))
+        return WaveformPyramid(levels, self.bin_frames, self.sample_rate)
+
+@register_analyser("speech")
+class SpeechAnalyser(Analyser):
+    """ Streams blocks through SpeechDetector, returns [(start, end)] in seconds """
+    def __init__(self, **options):
+        self.options = options
+
+    def start(self, sample_rate, channels):
+        super().start(sample_rate, channels)
+        self.detector = SpeechDetector(sample_rate, **self.options)
+        self._intervals = []
+
+    def feed(self, block):
+        self._intervals.extend(self.detector.feed(block))
+
+    def finish(self):
+        self._intervals.extend(self.detector.finish())
+        sr = self.sample_rate
+        return [(s / sr, e / sr) for s, e in self._intervals]
+
+def _db(power):
+    return 10.0 * math.log10(power) if power > 0 else float("-inf")
+
+@register_analyser("stats")
+class LevelStats(Analyser):
+    """
+    Peak, RMS and gated loudness in dBFS.
+    Loudness follows the BS.1770 gating scheme (400ms blocks, -70 absolute
+    and -10 relative gates) on unweighted power; no K-weighting filter.
+    """
+    def start(self, sample_rate, channels):
+        super().start(sample_rate, channels)
+        self._gate_frames = max(1, int(sample_rate * 0.4))
+        self._tail = np.zeros((0, channels), np.float32)
+        self._peak = 0.0
+        self._sum_sq = 0.0
+        self._count = 0
+        self._gate_power = []
+
+    def feed(self, block):
+        if not len(block):
+            return
+        self._peak = max(self._peak, float(np.abs(block).max()))
+        self._sum_sq += float(np.einsum("ij,ij->", block, block, dtype=np.float64))
+        self._count += block.size
+
+        if len(self._tail):
+            block = np.concatenate((self._tail, block))
+        n = len(block) // self._gate_frames
+        if n:
+            gates = block[:n * self._gate_frames].reshape(n, -1)
+            # Channel powers are summed, as in BS.1770
+            self._gate_power.append(np.einsum("ij,ij->i", gates, gates, dtype=np.float64) / self._gate_frames)
+        self._tail = block[n * self._gate_frames:].copy()
+
+    def finish(self):
+        stats = {
+            "peak_db": _db(self._peak ** 2),
+            "rms_db": _db(self._sum_sq / self._count) if self._count else float("-inf"),
+            "loudness": float("-inf"),
+            "duration": self._count / max(1, self.channels) / self.sample_rate,
+        }
+        if self._gate_power:
+            power = np.concatenate(self._gate_power)
+            power = power[power > 10.0 ** (-70.0 / 10.0)]
+            if len(power):
+                power = power[power > power.mean() * 10.0 ** (-10.0 / 10.0)]
+                stats["loudness"] = _db(float(power.mean()))
+        return stats
+
+@register_analyser("pcm_16k")
+class MonoResampler(Analyser):
+    """
+    Mono downmix resampled to `rate` (16 kHz for speech models).
+    Uses a windowed-sinc low-pass and exact integer position maths, so
+    output sample k always maps to input sample k * in_rate / rate.
+    With `sink` set, blocks are handed to it (e.g. file.write) instead of
+    being collected, keeping memory constant.
+    """
+    TAPS = 63
+
+    def __init__(self, rate=16000, sink=None):
+        self.rate = rate
+        self.sink = sink
+
+    def start(self, sample_rate, channels):
+        super().start(sample_rate, channels)
+        self._chunks = []
+        self._out_count = 0        # Output samples produced so far
+        self._base = 0             # Input index of self._x[0]
+        self._x = np.zeros(0, np.float32)
+
+        self._fir = None
+        if sample_rate > self.rate:
+            half = self.TAPS // 2
+            cutoff = 0.45 * self.rate / sample_rate
+            n = np.arange(-half, half + 1)
+            fir = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(self.TAPS)
+            self._fir = (fir / fir.sum()).astype(np.float32)
+            # Pre-pad by half the kernel so the filter output stays aligned with its input
+            self._hist = np.zeros(half, np.float32)
+
+    def feed(self, block):
+        self._push(_mono(block))
+
+    def finish(self):
+        if self._fir is not None:
+            self._push(np.zeros(self.TAPS // 2, np.float32), flush=True)
+        self._resample(final=True)
+        if self.sink is not None:
+            return self._out_count
+        return np.concatenate(self._chunks) if self._chunks else np.zeros(0, np.float32)
+
+    def _push(self, mono, flush=False):
+        if self._fir is not None:
+            x = np.concatenate((self._hist, mono))
+            self._hist = x[len(x) - (self.TAPS - 1):] if len(x) >= self.TAPS - 1 else x
+            if len(x) < self.TAPS:
+                return
+            mono = np.convolve(x, self._fir, mode="valid").astype(np.float32)
+        self._x = np.concatenate((self._x, mono))
+        self._resample()
+
+    def _resample(self, final=False):
+        x = self._x
+        if not len(x):
+            return
+        sr_in, sr_out = self.sample_rate, self.rate
+        last = self._base + len(x) - 1
+        if final:
+            # Every k with k * sr_in / sr_out <= last
+            k_end = max(self._out_count, (last * sr_out) // sr_in + 1)
+        else:
+            # Interpolation needs x[i + 1]: only k with k * sr_in / sr_out < last
+            k_end = (last * sr_out + sr_in - 1) // sr_in
+        k = np.arange(self._out_count, k_end, dtype=np.int64)
+        if len(k):
+            num = k * sr_in - self._base * sr_out
+            i = num // sr_out
+            frac = (num % sr_out).astype(np.float32) / sr_out
+            nxt = np.minimum(i + 1, len(x) - 1)
+            out = x[i] + (x[nxt] - x[i]) * frac
+            self._emit(out.astype(np.float32))
+            self._out_count = int(k_end)
+
+        # Keep only what the next interpolation still needs
+        next_i = (self._out_count * sr_in) // sr_out - self._base
+        drop = max(0, min(next_i, len(x) - 1))
+        self._x = x[drop:]
+        self._base += drop
+
+    def _emit(self, out):
+        if self.sink is not None:
+            self.sink(out)
+        else:
+            self._chunks.append(out)
+
+@register_analyser("wav")
+class WavExport(Analyser):
+    """ Writes the decoded audio to a 16-bit WAV file (replaces AudioClip.export_as_wav) """
+    def __init__(self, path):
+        self.path = path
+
+    def start(self, sample_rate, channels):
+        super().start(sample_rate, channels)
+        self._wav = wave.open(self.path, "wb")
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    def feed(self, block):
+        pcm = np.clip(block * 32767.0, -32768, 32767).astype("<i2")
+        self._wav.writeframes(pcm.tobytes())
+
+    def finish(self):
+        self._wav.close()
+        return self.path
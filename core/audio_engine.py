@@ -1,5 +1,23 @@
 # core/audio_engine.py
-import kanha_core # type: ignore # The Compiled Rust Pyd
+import math
+import os
+import subprocess
+import wave
+
+import numpy as np
+
+from utils.timebase import DEFAULT_RATE, FrameRate
+
+# Try to import our custom Rust engine
+try:
+    import kanha_core # type: ignore # The Compiled Rust Pyd
+    RUST_AVAILABLE = True
+except ImportError:
+    kanha_core = None
+    RUST_AVAILABLE = False
+
+# Frames per PCM block handed to analysers (~1.5s at 44.1kHz)
+BLOCK_FRAMES = 65536
 
 def generate_waveform_fast(video_path: str, resolution: int = 1500):
     """Wrapper to call Rust engine safely"""
@@ -9,4 +27,274 @@ def generate_waveform_fast(video_path: str, resolution: int = 1500):
         return kanha_core.get_waveform(video_path, resolution)
     except Exception as e:
         print(f"Rust Waveform Error: {e}")
-        return []
\ No newline at end of file
+        return []
+
+# ------------------------------------------
+#  MEDIA PROBES
+# ------------------------------------------
+def hidden_startupinfo():
+    """ Windows process handling to hide console """
+    if os.name != 'nt':
+        return None
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    return startupinfo
+
+def probe_audio(path):
+    """ Asks ffprobe for (sample_rate, channels) of the first audio stream """
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "a:0",
+           "-show_entries", "stream=sample_rate,channels", "-of", "csv=p=0", path]
+    out = subprocess.run(cmd, capture_output=True, text=True,
+                         startupinfo=hidden_startupinfo()).stdout.strip()
+    if not out:
+        raise IOError(f"No audio stream found in {path}")
+    sample_rate, channels = out.splitlines()[0].split(",")[:2]
+    return int(sample_rate), int(channels)
+
+def probe_fps(video_path):
+    """ Exact frame rate of the first video stream (Rust first, ffprobe fallback) """
+    if RUST_AVAILABLE:
+        return FrameRate.from_any(kanha_core.VideoClip(video_path).fps)
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0",
+           "-show_entries", "stream=r_frame_rate", "-of", "csv=p=0", video_path]
+    out = subprocess.run(cmd, capture_output=True, text=True,
+                         startupinfo=hidden_startupinfo()).stdout.strip()
+    return FrameRate.from_any(out.splitlines()[0]) if out else DEFAULT_RATE
+
+def probe_duration(video_path):
+    """ Container duration in seconds (Rust first, ffprobe fallback) """
+    if RUST_AVAILABLE:
+        duration = kanha_core.VideoClip(video_path).duration
+        if duration > 0:
+            return duration
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", video_path]
+    out = subprocess.run(cmd, capture_output=True, text=True,
+                         startupinfo=hidden_startupinfo()).stdout.strip()
+    if not out:
+        raise IOError(f"Could not read the duration of {video_path}")
+    return float(out.splitlines()[0])
+
+def probe_size(path):
+    """ (width, height) of the first video stream (Rust first, ffprobe fallback) """
+    if RUST_AVAILABLE:
+        clip = kanha_core.VideoClip(path)
+        return clip.width, clip.height
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0",
+           "-show_entries", "stream=width,height", "-of", "csv=p=0", path]
+    out = subprocess.run(cmd, capture_output=True, text=True,
+                         startupinfo=hidden_startupinfo()).stdout.strip()
+    if not out:
+        raise IOError(f"No video stream found in {path}")
+    w, h = out.splitlines()[0].split(",")[:2]
+    return int(w), int(h)
+
+# ------------------------------------------
+#  PCM STREAMING (Rust first, Python fallback)
+# ------------------------------------------
+def _wav_blocks(wav, block_frames):
+    """ Decodes an open wave.Wave_read block by block into float32 """
+    width = wav.getsampwidth()
+    channels = wav.getnchannels()
+    while True:
+        raw = wav.readframes(block_frames)
+        if not raw:
+            break
+        if width == 1:
+            data = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif width == 2:
+            data = np.frombuffer(raw, "<i2").astype(np.float32) / 32768.0
+        elif width == 3:
+            # Widen 24-bit samples to int32 (shift into the top bytes keeps the sign)
+            b = np.frombuffer(raw, np.uint8).reshape(-1, 3).astype(np.int32)
+            data = ((b[:, 0] << 8) | (b[:, 1] << 16) | (b[:, 2] << 24)).astype(np.float32) / 2147483648.0
+        else:
+            data = np.frombuffer(raw, "<i4").astype(np.float32) / 2147483648.0
+        yield data.reshape(-1, channels)
+    wav.close()
+
+def _ffmpeg_blocks(proc, channels, block_frames):
+    """ Reads f32le PCM from an ffmpeg pipe block by block """
+    block_bytes = block_frames * channels * 4
+    try:
+        while True:
+            raw = proc.stdout.read(block_bytes)
+            if not raw:
+                break
+            usable = len(raw) - len(raw) % (channels * 4)
+            yield np.frombuffer(raw[:usable], "<f4").reshape(-1, channels)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+def open_pcm_stream(path, block_frames=BLOCK_FRAMES):
+    """
+    Opens a streaming decode of the audio in `path`.
+    Returns (sample_rate, channels, blocks) where `blocks` yields float32
+    arrays shaped (frames, channels). Only one block is alive at a time,
+    so any analyser built on this runs in constant memory.
+    """
+    if RUST_AVAILABLE:
+        stream = kanha_core.AudioStream(path, block_frames)
+        channels = stream.channels
+        blocks = (np.frombuffer(b, "<f4").reshape(-1, channels) for b in stream)
+        return stream.sample_rate, channels, blocks
+
+    # Pure Python: WAV is read directly, anything else goes through the system FFmpeg
+    if path.lower().endswith(".wav"):
+        wav = wave.open(path, "rb")
+        return wav.getframerate(), wav.getnchannels(), _wav_blocks(wav, block_frames)
+
+    sample_rate, channels = probe_audio(path)
+    cmd = ["ffmpeg", "-v", "error", "-i", path, "-vn",
+           "-f", "f32le", "-acodec", "pcm_f32le", "-"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            startupinfo=hidden_startupinfo())
+    return sample_rate, channels, _ffmpeg_blocks(proc, channels, block_frames)
+
+# ------------------------------------------
+#  SPEECH / SILENCE DETECTION
+# ------------------------------------------
+class SpeechDetector:
+    """
+    Streaming speech-activity detector.
+    Feed it PCM blocks of any size: it computes windowed RMS with NumPy,
+    applies open/close hysteresis, drops bursts shorter than `attack_ms`,
+    bridges dips shorter than `release_ms`, then pads and merges gaps
+    shorter than `min_gap_ms`.
+
+    Everything is tracked as sample indices, so timestamps are exact and
+    never drift, and only one partial window plus one pending interval is
+    kept between blocks (constant memory on multi-hour recordings).
+    """
+
+    def __init__(self, sample_rate, threshold_db=-40.0, hysteresis_db=6.0,
+                 window_ms=20.0, attack_ms=60.0, release_ms=250.0,
+                 pad_ms=100.0, min_gap_ms=300.0, min_duration_ms=200.0):
+        self.sample_rate = int(sample_rate)
+        ms = self.sample_rate / 1000.0
+
+        self.window = max(1, int(round(window_ms * ms)))
+        # Compare mean-square power directly, no per-window log/sqrt
+        self.open_power = 10.0 ** (threshold_db / 10.0)
+        self.close_power = 10.0 ** ((threshold_db - hysteresis_db) / 10.0)
+        self.attack = max(1, int(math.ceil(attack_ms * ms / self.window)))
+        self.release = int(math.ceil(release_ms * ms / self.window))
+        self.pad = int(round(pad_ms * ms))
+        self.min_gap = int(round(min_gap_ms * ms))
+        self.min_duration = int(round(min_duration_ms * ms))
+
+        self.reset()
+
+    def reset(self):
+        self.total_samples = 0
+        self._tail = np.zeros(0, np.float32)   # Leftover samples (< 1 window)
+        self._win_idx = 0                      # Global index of the next window
+        self._voiced = False                   # Hysteresis state carried across blocks
+        self._run_start = 0                    # Window where the current voiced run began
+        self._run = None                       # Raw run [start_w, end_w] waiting for release
+        self._interval = None                  # Padded [start, end] waiting for gap merge
+
+    def feed(self, block):
+        """
+        Analyse one PCM block (frames x channels, or mono 1-D).
+        Returns the (start_sample, end_sample) intervals that became final.
+        """
+        mono = block if block.ndim == 1 else block.mean(axis=1, dtype=np.float32)
+        self.total_samples += len(mono)
+        if self._tail.size:
+            mono = np.concatenate((self._tail, mono))
+
+        n = len(mono) // self.window
+        self._tail = mono[n * self.window:].copy()
+        out = []
+        if n:
+            frames = mono[:n * self.window].reshape(n, self.window)
+            power = np.einsum("ij,ij->i", frames, frames) / self.window
+            self._scan(power, out)
+        return out
+
+    def finish(self):
+        """ Flush the partial window and pending intervals at end of stream """
+        out = []
+        if self._tail.size:
+            power = np.array([np.dot(self._tail, self._tail) / self._tail.size])
+            self._tail = np.zeros(0, np.float32)
+            self._scan(power, out)
+        if self._voiced:
+            self._end_run(self._win_idx, out)
+            self._voiced = False
+        if self._run is not None:
+            self._emit_run(out)
+        if self._interval is not None:
+            self._emit_interval(out)
+        return out
+
+    # --- Internals ---
+    def _scan(self, power, out):
+        n = len(power)
+        # 1 = above open level, 0 = below close level, -1 = in the hysteresis band
+        decision = np.full(n, -1, np.int8)
+        decision[power >= self.open_power] = 1
+        decision[power < self.close_power] = 0
+
+        # Forward-fill the band with the last decision (vectorised hysteresis)
+        last = np.where(decision >= 0, np.arange(n), -1)
+        np.maximum.accumulate(last, out=last)
+        voiced = np.full(n, self._voiced, bool)
+        known = last >= 0
+        voiced[known] = decision[last[known]] == 1
+
+        # Only state changes go through Python
+        prev = np.concatenate(([self._voiced], voiced[:-1]))
+        for j in np.flatnonzero(voiced != prev):
+            w = self._win_idx + int(j)
+            if voiced[j]:
+                self._run_start = w
+            else:
+                self._end_run(w, out)
+
+        self._voiced = bool(voiced[-1])
+        self._win_idx += n
+
+    def _end_run(self, end_w, out):
+        start_w = self._run_start
+        if end_w - start_w < self.attack:
+            return # Click / breath, not speech
+        if self._run is not None and start_w - self._run[1] <= self.release:
+            self._run[1] = end_w # Short dip: still the same phrase
+            return
+        if self._run is not None:
+            self._emit_run(out)
+        self._run = [start_w, end_w]
+
+    def _emit_run(self, out):
+        start = max(0, self._run[0] * self.window - self.pad)
+        end = self._run[1] * self.window + self.pad
+        self._run = None
+        if self._interval is not None and start - self._interval[1] < self.min_gap:
+            self._interval[1] = end
+            return
+        if self._interval is not None:
+            self._emit_interval(out)
+        self._interval = [start, end]
+
+    def _emit_interval(self, out):
+        start, end = self._interval
+        self._interval = None
+        end = min(end, self.total_samples)
+        if end - start >= self.min_duration:
+            out.append((start, end))
+
+def detect_speech(path, threshold_db=-40.0, block_frames=BLOCK_FRAMES, **options):
+    """
+    Streams `path` through a SpeechDetector.
+    Returns [(start, end)] of active speech in seconds, computed from
+    exact sample indices. Extra keyword options go to SpeechDetector.
+    """
+    sample_rate, _, blocks = open_pcm_stream(path, block_frames)
+    detector = SpeechDetector(sample_rate, threshold_db=threshold_db, **options)
+    intervals = []
+    for block in blocks:
+        intervals.extend(detector.feed(block))
+    intervals.extend(detector.finish())
+    return [(s / sample_rate, e / sample_rate) for s, e in intervals]
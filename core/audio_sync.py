@@ -0,0 +1,239 @@
+# core/audio_sync.py
+"""
+Auto-sync of clips that recorded the same event (multi-camera, external
+recorder) by audio cross-correlation.
+
+Coarse to fine, all with FFT correlation:
+  1. 100 Hz onset envelopes of the whole clips  -> offset to ~10 ms
+  2. 16 kHz mono around that offset (20 s)       -> offset to 1/16000 s
+  3. native-rate audio, +-2 samples (5 s)        -> sample accurate
+Audio comes from the PCM cache (decoded once, memory-mapped), so workers
+only read the windows they need. Envelopes and every clip pair run in a
+process pool; offsets are then chained from the reference clip through
+the most confident pairs, so clips that never overlap the reference can
+still be placed through another camera.
+"""
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core import tracing
+from core.pcm_cache import CachedPcm, MONO_16K, NATIVE, get_pcm_cache
+
+MONO_RATE = 16000
+COARSE_HOP = 160        # 16 kHz / 160 = 100 Hz envelope
+FINE_SEGMENT = 20.0     # Seconds of audio used by the 16 kHz refinement
+NATIVE_SEGMENT = 5.0    # Seconds used by the native-rate refinement
+MIN_OVERLAP = 300       # Envelope frames (3 s) two clips must share to count as a match
+ENVELOPE_CHUNK = 1 << 14 # Envelope frames per read (bounds memory on 2 h files)
+
+class SyncResult:
+    """ Where `path` starts relative to the reference clip (seconds), or offset None """
+    __slots__ = ("path", "offset", "confidence", "duration")
+
+    def __init__(self, path, offset, confidence, duration):
+        self.path = path
+        self.offset = offset
+        self.confidence = confidence
+        self.duration = duration
+
+    def __repr__(self):
+        off = "unsynced" if self.offset is None else f"{self.offset:+.6f}s"
+        return f"SyncResult({os.path.basename(self.path)}, {off}, conf={self.confidence:.2f})"
+
+# ------------------------------------------
+#  SIGNAL HELPERS
+# ------------------------------------------
+def onset_envelope(mono, hop=COARSE_HOP):
+    """ Positive changes of log RMS per `hop` samples, zero mean (what claps and words look like) """
+    n = len(mono) // hop
+    rms = np.empty(n, np.float32)
+    for i in range(0, n, ENVELOPE_CHUNK):
+        m = min(ENVELOPE_CHUNK, n - i)
+        seg = np.asarray(mono[i * hop:(i + m) * hop], np.float32).reshape(m, hop)
+        rms[i:i + m] = np.sqrt(np.mean(seg * seg, axis=1))
+    env = np.log1p(100.0 * rms)
+    onset = np.maximum(0.0, np.diff(env, prepend=env[:1]))
+    return (onset - onset.mean()).astype(np.float32)
+
+def xcorr(a, b):
+    """
+    Full cross-correlation by FFT: result[k + len(b) - 1] = sum_n a[n + k] * b[n]
+    for lags k in [-(len(b) - 1), len(a) - 1].
+    """
+    n = len(a) + len(b) - 1
+    nfft = 1 << (n - 1).bit_length()
+    c = np.fft.irfft(np.fft.rfft(a, nfft) * np.conj(np.fft.rfft(b, nfft)), nfft)
+    return np.concatenate((c[nfft - (len(b) - 1):], c[:len(a)])) if len(b) > 1 else c[:len(a)]
+
+def _parabolic(c, i):
+    """ Sub-sample peak position from the neighbours of c[i] """
+    if 0 < i < len(c) - 1:
+        denom = c[i - 1] - 2 * c[i] + c[i + 1]
+        if denom < 0:
+            return i + 0.5 * (c[i - 1] - c[i + 1]) / denom
+    return float(i)
+
+def _overlap_energy(x, starts, ends):
+    cum = np.concatenate(([0.0], np.cumsum(np.asarray(x, np.float64) ** 2)))
+    return cum[ends] - cum[starts]
+
+def coarse_offset(env_a, env_b, exclusion=100, min_overlap=MIN_OVERLAP):
+    """
+    (lag in envelope frames, confidence 0-1) of env_b inside env_a.
+    Correlation is normalised by the energy of the overlapping parts, so a
+    clip that only shares a few seconds with the other still peaks clearly.
+    """
+    len_a, len_b = len(env_a), len(env_b)
+    lags = np.arange(-(len_b - 1), len_a)
+    overlap = np.minimum(len_a, lags + len_b) - np.maximum(0, lags)
+    energy_a = _overlap_energy(env_a, np.maximum(0, lags), np.minimum(len_a, lags + len_b))
+    energy_b = _overlap_energy(env_b, np.maximum(0, -lags), np.minimum(len_b, len_a - lags))
+    c = xcorr(env_a, env_b) / np.sqrt(np.maximum(energy_a * energy_b, 1e-12))
+    c[overlap < min(min_overlap, len_a, len_b)] = 0.0
+    best = int(np.argmax(c))
+    peak = c[best]
+    if peak <= 0:
+        return 0, 0.0
+    masked = c.copy()
+    masked[max(0, best - exclusion):best + exclusion + 1] = -np.inf
+    second = masked.max() if np.isfinite(masked).any() else 0.0
+    return best - (len(env_b) - 1), float(np.clip(1.0 - max(second, 0.0) / peak, 0.0, 1.0))
+
+def refine_offset(a, b, lag, search, b_start, length):
+    """
+    Best lag within lag +- search samples, matching b[b_start:b_start+length]
+    against a (energy-normalised, parabolic sub-sample peak).
+    """
+    b_seg = np.asarray(b[b_start:b_start + length], np.float64)
+    if len(b_seg) < 16:
+        return float(lag)
+    a0 = b_start + lag - search
+    want = len(b_seg) + 2 * search
+    lo, hi = max(0, a0), max(0, min(len(a), a0 + want))
+    a_seg = np.zeros(want)
+    if hi > lo:
+        a_seg[lo - a0:hi - a0] = a[lo:hi]
+
+    valid = xcorr(a_seg, b_seg)[len(b_seg) - 1:len(b_seg) - 1 + 2 * search + 1]
+    energy = np.concatenate(([0.0], np.cumsum(a_seg * a_seg)))
+    window = np.sqrt(np.maximum(energy[len(b_seg):len(b_seg) + len(valid)] - energy[:len(valid)], 1e-12))
+    score = valid / window
+    return lag - search + _parabolic(score, int(np.argmax(score)))
+
+def _best_window(env_b, lag, len_a, width):
+    """ Start (envelope frames) of the busiest `width` window of b that overlaps a """
+    lo, hi = max(0, -lag), min(len(env_b), len_a - lag)
+    if hi - lo <= width:
+        return lo, max(0, hi - lo)
+    activity = np.concatenate(([0.0], np.cumsum(np.maximum(env_b[lo:hi], 0))))
+    sums = activity[width:] - activity[:-width]
+    return lo + int(np.argmax(sums)), width
+
+def _native_window(pcm, start, length):
+    """ Mono float window of a native cache (frames [start, start+length), zero padded) """
+    out = np.zeros(length)
+    lo, hi = max(0, start), min(pcm.frames, start + length)
+    if hi > lo:
+        out[lo - start:hi - start] = pcm.data[lo:hi].astype(np.float64).mean(axis=1)
+    return out
+
+# ------------------------------------------
+#  POOL JOBS
+# ------------------------------------------
+def _prepare(media_path):
+    """ Decode (once, into the PCM cache) and build the coarse envelope """
+    cache = get_pcm_cache()
+    mono = cache.get(media_path, MONO_16K)
+    native = cache.get(media_path, NATIVE)
+    return {"path": media_path, "mono": mono.path, "native": native.path,
+            "rate": native.sample_rate, "duration": native.duration,
+            "env": onset_envelope(mono.data[:, 0])}
+
+def sync_pair(a, b):
+    """ (offset of b's start in a's time in seconds, confidence) for two _prepare() results """
+    lag, confidence = coarse_offset(a["env"], b["env"])
+    if confidence <= 0:
+        return 0.0, 0.0
+
+    # 2. 16 kHz around the coarse lag
+    mono_a, mono_b = CachedPcm(a["mono"]).data[:, 0], CachedPcm(b["mono"]).data[:, 0]
+    width = int(FINE_SEGMENT * MONO_RATE / COARSE_HOP)
+    start, length = _best_window(b["env"], lag, len(a["env"]), width)
+    fine = refine_offset(mono_a, mono_b, lag * COARSE_HOP, 2 * COARSE_HOP,
+                         start * COARSE_HOP, length * COARSE_HOP)
+    offset = fine / MONO_RATE
+
+    # 3. Native rate (only when both clips share it)
+    if a["rate"] == b["rate"]:
+        rate = a["rate"]
+        pa, pb = CachedPcm(a["native"]), CachedPcm(b["native"])
+        seg = int(NATIVE_SEGMENT * rate)
+        b0 = int(start * COARSE_HOP * rate / MONO_RATE)
+        guess = int(round(offset * rate))
+        search = int(math.ceil(2 * rate / MONO_RATE)) + 2
+        a_win = _native_window(pa, b0 + guess - search, seg + 2 * search)
+        b_win = _native_window(pb, b0, seg)
+        # Both windows already start at the right places: refine in local coordinates
+        local = refine_offset(a_win, b_win, search, search, 0, seg)
+        offset = (guess + local - search) / rate
+    return float(offset), confidence
+
+def _pair_job(args):
+    i, j, a, b = args
+    return i, j, sync_pair(a, b)
+
+def solve_offsets(count, pairs, reference, min_confidence):
+    """
+    Chains pair offsets out from `reference`, always taking the most
+    confident pair that reaches a new clip (a maximum spanning tree).
+    pairs: {(i, j): (offset of j in i's time, confidence)}
+    Returns ({clip: offset}, {clip: confidence}).
+    """
+    offsets, confidence = {reference: 0.0}, {reference: 1.0}
+    while len(offsets) < count:
+        best = None
+        for (i, j), (off, conf) in pairs.items():
+            if conf < min_confidence:
+                continue
+            if i in offsets and j not in offsets:
+                candidate = (conf, j, offsets[i] + off, min(conf, confidence[i]))
+            elif j in offsets and i not in offsets:
+                candidate = (conf, i, offsets[j] - off, min(conf, confidence[j]))
+            else:
+                continue
+            if best is None or candidate[0] > best[0]:
+                best = candidate
+        if best is None:
+            break
+        _, clip, off, conf = best
+        offsets[clip] = off
+        confidence[clip] = conf
+    return offsets, confidence
+
+def sync_clips(paths, reference=None, max_workers=None, min_confidence=0.2):
+    """
+    Syncs every clip in `paths` (e.g. a whole bin) by audio.
+    reference: path whose start is offset 0 (default: the longest clip).
+    Returns [SyncResult] in the order of `paths`.
+    """
+    paths = list(paths)
+    if len(paths) < 2:
+        return [SyncResult(p, 0.0, 1.0, 0.0) for p in paths]
+
+    with tracing.span("sync.clips", "audio", clips=len(paths)):
+        # spawn: forking a process that runs Qt and decoder threads is not safe
+        with ProcessPoolExecutor(max_workers, multiprocessing.get_context("spawn")) as pool:
+            with tracing.span("sync.prepare", "audio"):
+                infos = list(pool.map(_prepare, paths))
+            jobs = [(i, j, infos[i], infos[j]) for i in range(len(paths)) for j in range(i + 1, len(paths))]
+            with tracing.span("sync.pairs", "audio", pairs=len(jobs)):
+                pairs = {(i, j): result for i, j, result in pool.map(_pair_job, jobs)}
+
+    ref = paths.index(reference) if reference in paths else max(range(len(paths)), key=lambda i: infos[i]["duration"])
+    offsets, confidence = solve_offsets(len(paths), pairs, ref, min_confidence)
+    return [SyncResult(p, offsets.get(i), confidence.get(i, 0.0), infos[i]["duration"])
+            for i, p in enumerate(paths)]
@@ -0,0 +1,200 @@
+# core/jump_cut.py
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from core.audio_engine import probe_fps
+from core import tracing
+from core.mixer import popen_with_binary_stdin
+from core.pcm_cache import get_pcm_cache
+from utils.timebase import FrameRate, seconds_to_frames
+
+# ------------------------------------------
+#  EDIT DECISION LIST
+# ------------------------------------------
+def build_edit_list(intervals, duration, pad=0.0, min_gap=0.0, fps=None):
+    """
+    Turns speech intervals [(start, end)] into the list of kept source
+    ranges [(src_in, src_out)]: padded, clamped to [0, duration], merged
+    when closer than `min_gap`. With `fps` (a FrameRate or number), cut
+    points are snapped to the frame grid so video frames and audio samples stay in sync after
+    hundreds of cuts.
+    """
+    rate = FrameRate.from_any(fps) if fps else None
+    edits = []
+    for start, end in sorted(intervals):
+        start, end = max(0.0, start - pad), min(duration, end + pad)
+        if rate:
+            start, end = rate.snap(start), min(duration, rate.snap(end))
+        if end <= start:
+            continue
+        if edits and start - edits[-1][1] <= min_gap:
+            edits[-1][1] = max(edits[-1][1], end)
+        else:
+            edits.append([start, end])
+    return [tuple(e) for e in edits]
+
+def record_times(edit_list):
+    """ Output-timeline start of every kept range """
+    lengths = np.array([b - a for a, b in edit_list], np.float64)
+    return np.concatenate(([0.0], np.cumsum(lengths)[:-1])) if len(lengths) else lengths
+
+def remap_time(times, edit_list):
+    """
+    Maps source times to output times (vectorised).
+    Times that fall in removed ranges snap to the next cut point.
+    """
+    times = np.asarray(times, np.float64)
+    if not edit_list:
+        return np.zeros_like(times)
+    src_in = np.array([a for a, _ in edit_list])
+    lengths = np.array([b - a for a, b in edit_list])
+    rec_in = record_times(edit_list)
+    idx = np.clip(np.searchsorted(src_in, times, side="right") - 1, 0, len(src_in) - 1)
+    return rec_in[idx] + np.clip(times - src_in[idx], 0.0, lengths[idx])
+
+def remap_subtitles(segments, edit_list):
+    """ Moves subtitle dicts onto the cut timeline, dropping ones that were cut away """
+    if not segments:
+        return []
+    starts = remap_time([s['start'] for s in segments], edit_list)
+    ends = remap_time([s['end'] for s in segments], edit_list)
+    out = []
+    for s, start, end in zip(segments, starts, ends):
+        if end > start:
+            out.append({**s, 'start': float(start), 'end': float(end)})
+    return out
+
+# ------------------------------------------
+#  AUDIO (true crossfades, streamed)
+# ------------------------------------------
+def jump_cut_audio(pcm, edit_list, crossfade=0.02, block_frames=65536):
+    """
+    Yields the cut audio as int16 blocks.
+    Each cut gets an equal-power crossfade centred on the cut point, taken
+    from the audio either side of it, so the result is exactly as long as
+    the kept video and memory stays at one block.
+    """
+    sr = pcm.sample_rate
+    ranges = [(pcm.frame_at(a), pcm.frame_at(b)) for a, b in edit_list]
+    half = max(0, int(round(crossfade * sr / 2)))
+
+    def halves(i):
+        """ Crossfade half-width at the cut after range i """
+        if i + 1 >= len(ranges) or not half:
+            return 0
+        (a0, b0), (a1, b1) = ranges[i], ranges[i + 1]
+        return min(half, (b0 - a0) // 2, (b1 - a1) // 2, a1, pcm.frames - b0)
+
+    def body(a, b):
+        for pos in range(a, b, block_frames):
+            yield pcm.data[pos:min(b, pos + block_frames)]
+
+    h_prev = 0
+    for i, (a, b) in enumerate(ranges):
+        h_next = halves(i)
+        yield from body(a + h_prev, b - h_next)
+        if h_next:
+            a1 = ranges[i + 1][0]
+            theta = np.linspace(0.0, np.pi / 2, 2 * h_next, dtype=np.float32)[:, None]
+            out_side = pcm.data[b - h_next:b + h_next].astype(np.float32)
+            in_side = pcm.data[a1 - h_next:a1 + h_next].astype(np.float32)
+            mixed = out_side * np.cos(theta) + in_side * np.sin(theta)
+            yield np.clip(mixed, -32768, 32767).astype(np.int16)
+        h_prev = h_next
+
+def _feed_stdin(proc, blocks, script=None):
+    """ Pipes the audio blocks, then deletes the filter script once FFmpeg has exited """
+    try:
+        with tracing.span("jump_cut.audio_feed", "export") as sp:
+            count = 0
+            for block in blocks:
+                proc.stdin.write(np.ascontiguousarray(block, "<i2").tobytes())
+                count += 1
+            sp.set(blocks=count)
+    except (BrokenPipeError, OSError):
+        pass # FFmpeg exited, its output tells the caller why
+    finally:
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        if script:
+            proc.wait()
+            try:
+                os.remove(script)
+            except OSError:
+                pass
+
+# ------------------------------------------
+#  RENDER (single FFmpeg pass)
+# ------------------------------------------
+def frame_ranges(edit_list, rate):
+    """ [(first, last)] frame indices (inclusive) of the frames starting inside each kept range """
+    if not edit_list:
+        return []
+    firsts = seconds_to_frames([a for a, _ in edit_list], rate, "ceil")
+    lasts = seconds_to_frames([b for _, b in edit_list], rate, "ceil") - 1
+    return [(int(f), int(l)) for f, l in zip(firsts, lasts) if l >= f]
+
+def render_jump_cut(video_path, edit_list, output_path, ass_path=None, crossfade=0.02, fps=None):
+    """
+    Renders every kept range in ONE encode.
+    Video: a select filter keeps only frames inside the edit list and
+    re-times them. Audio: the crossfaded track is generated from the PCM
+    cache and piped in as raw PCM. Returns the Popen like
+    export_video_with_ffmpeg (stdout carries FFmpeg's log).
+    fps: the source's FrameRate if already known (probed otherwise).
+    """
+    pcm = get_pcm_cache().get(video_path)
+    rate = FrameRate.from_any(fps) if fps else probe_fps(video_path)
+    # Selected by frame index: printed timestamps round past NTSC frame starts and drop them
+    frames = frame_ranges(edit_list, rate)
+    terms = "+".join(f"between(n,{first},{last})" for first, last in frames) or "0"
+    vf = f"select='{terms}',setpts=N/FRAME_RATE/TB"
+    if ass_path:
+        sub_arg = ass_path.replace("\\", "/").replace(":", "\\\\:")
+        vf += f",subtitles='{sub_arg}'"
+
+    # Long cut lists overflow the Windows command line, so the filter goes in a script file
+    fd, script = tempfile.mkstemp(suffix=".txt", prefix="kanha_jumpcut_")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(vf)
+
+    cmd = [
+        "ffmpeg", "-y",
+        "-i", video_path,
+        "-f", "s16le", "-ar", str(pcm.sample_rate), "-ac", str(pcm.channels), "-i", "pipe:0",
+        "-filter_script:v", script,
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c:v", "libx264", "-preset", "medium",
+        "-c:a", "aac", "-b:a", "192k",
+        output_path
+    ]
+    process = popen_with_binary_stdin(cmd)
+
+    feeder = threading.Thread(target=_feed_stdin, daemon=True,
+                              args=(process, jump_cut_audio(pcm, edit_list, crossfade), script))
+    feeder.start()
+    if tracing.ENABLED:
+        tracing.trace_process(process, "export.jump_cut", frames=sum(l - f + 1 for f, l in frames))
+    return process
+
+def jump_cut(video_path, intervals, output_path, subtitles=None, font_settings=None,
+             pad=0.0, min_gap=0.0, crossfade=0.02):
+    """
+    Convenience wrapper: speech intervals -> EDL -> remapped captions -> render.
+    Returns (process, edit_list).
+    """
+    from core.render_engine import generate_ass_file
+
+    pcm = get_pcm_cache().get(video_path)
+    rate = probe_fps(video_path)
+    edit_list = build_edit_list(intervals, pcm.duration, pad, min_gap, rate)
+    ass_path = None
+    if subtitles and font_settings:
+        ass_path = generate_ass_file(remap_subtitles(subtitles, edit_list), font_settings,
+                                     path="temp_jumpcut_subtitles.ass")
+    return render_jump_cut(video_path, edit_list, output_path, ass_path, crossfade, rate), edit_list
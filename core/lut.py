@@ -0,0 +1,214 @@
+# core/lut.py
+"""
+3D LUT colour grading from .cube files.
+
+A LUT is parsed once into a compact float32 table (N x N x N x 3, indexed
+[r][g][b]) and kept in a cache keyed by file identity. Frames (uint8 RGB)
+are graded tile by tile so the temporaries stay in cache:
+  * trilinear: the 8 surrounding lattice points per pixel, with the
+    per-channel index/weight for every possible 8-bit value looked up from
+    256-entry tables instead of computed per pixel;
+  * baked: the LUT evaluated once for all 2^24 colours into a dense
+    8-bit table (48 MB), after which grading is one gather per pixel.
+For FFmpeg exports the same file goes straight to FFmpeg's lut3d filter
+(see ffmpeg_filter()), so grading runs inside the encoder's filter graph.
+"""
+import os
+import threading
+
+import numpy as np
+
+from core import tracing
+
+TILE_PIXELS = 1 << 15 # Pixels per tile (~100 KB of uint8 RGB)
+
+class Lut3D:
+    """ One 3D LUT: table[r, g, b] -> (r, g, b) floats, inputs mapped from [domain_min, domain_max] """
+    def __init__(self, table, title="", domain_min=(0.0, 0.0, 0.0), domain_max=(1.0, 1.0, 1.0)):
+        self.table = np.ascontiguousarray(table, np.float32)
+        self.size = self.table.shape[0]
+        if self.table.shape != (self.size, self.size, self.size, 3) or self.size < 2:
+            raise ValueError(f"LUT table must be N x N x N x 3, got {self.table.shape}")
+        self.title = title
+        self.domain_min = np.asarray(domain_min, np.float64)
+        self.domain_max = np.asarray(domain_max, np.float64)
+        # Lattice points padded to 16 bytes and viewed as complex128, so every
+        # corner lookup is a 1-D take() of whole RGB triples (several times
+        # faster than fancy-indexing rows of an (M, 3) array)
+        padded = np.zeros((self.size ** 3, 4), np.float32)
+        padded[:, :3] = self.table.reshape(-1, 3)
+        self._points = padded.view(np.complex128).ravel()
+        self._index, weight = self._input_tables()
+        # Weights repeated to 4 lanes and packed like the points: one take() per channel
+        self._weight = np.ascontiguousarray(np.repeat(weight[:, :, None], 4, axis=2)).view(np.complex128)[:, :, 0]
+        self._baked = None
+        self._bake_lock = threading.Lock()
+
+    @classmethod
+    def from_cube(cls, path):
+        """ Parses a .cube file (Resolve/Adobe format, 3D only) """
+        size, title = None, ""
+        domain_min, domain_max = (0.0, 0.0, 0.0), (1.0, 1.0, 1.0)
+        numbers = []
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line[0] == "#":
+                    continue
+                if line[0].isdigit() or line[0] in "-.+":
+                    numbers.append(line)
+                    continue
+                key, _, value = line.partition(" ")
+                if key == "LUT_3D_SIZE":
+                    size = int(value)
+                elif key == "LUT_1D_SIZE":
+                    raise ValueError(f"{path}: 1D LUTs are not supported")
+                elif key == "TITLE":
+                    title = value.strip().strip('"')
+                elif key == "DOMAIN_MIN":
+                    domain_min = tuple(float(v) for v in value.split())
+                elif key == "DOMAIN_MAX":
+                    domain_max = tuple(float(v) for v in value.split())
+        if size is None:
+            raise ValueError(f"{path}: missing LUT_3D_SIZE")
+        data = np.array(" ".join(numbers).split(), np.float32)
+        if data.size != size ** 3 * 3:
+            raise ValueError(f"{path}: expected {size ** 3} entries, found {data.size // 3}")
+        # .cube order: red changes fastest, so the raw reshape is [b][g][r]
+        table = data.reshape(size, size, size, 3).transpose(2, 1, 0, 3)
+        return cls(table, title, domain_min, domain_max)
+
+    def _input_tables(self):
+        """
+        For each channel and 8-bit value: flat-index contribution of the
+        lower lattice point and the interpolation weight towards the upper one.
+        """
+        n = self.size
+        values = np.arange(256, dtype=np.float64) / 255.0
+        index = np.empty((3, 256), np.intp)
+        weight = np.empty((3, 256), np.float32)
+        strides = (n * n, n, 1)
+        for c in range(3):
+            span = self.domain_max[c] - self.domain_min[c]
+            x = np.clip((values - self.domain_min[c]) / span, 0.0, 1.0) * (n - 1)
+            lower = np.minimum(x.astype(np.int32), n - 2)
+            index[c] = lower * strides[c]
+            weight[c] = x - lower
+        return index, weight
+
+    # --- Trilinear ---
+    def _grade_tile(self, rgb, out):
+        """ rgb: (n, 3) uint8 -> out: (n, 3) uint8 """
+        n = self.size
+        r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+        base = self._index[0].take(r)
+        base += self._index[1].take(g)
+        base += self._index[2].take(b)
+        wr, wg, wb = (self._weight[c].take(v).view(np.float32).reshape(-1, 4) for c, v in enumerate((r, g, b)))
+        points = self._points
+
+        def corner(offset):
+            return points.take(base + offset if offset else base).view(np.float32).reshape(-1, 4)
+
+        def lerp(lo, hi, w):
+            hi -= lo
+            hi *= w
+            hi += lo
+            return hi
+
+        # Along b, then g, then r (each take() is a fresh array, so in-place is safe)
+        c00 = lerp(corner(0), corner(1), wb)
+        c01 = lerp(corner(n), corner(n + 1), wb)
+        c10 = lerp(corner(n * n), corner(n * n + 1), wb)
+        c11 = lerp(corner(n * n + n), corner(n * n + n + 1), wb)
+        result = lerp(lerp(c00, c01, wg), lerp(c10, c11, wg), wr)
+        result *= 255.0
+        result += 0.5
+        np.clip(result, 0.0, 255.0, out=result) # All on contiguous 4-lane rows, one strided copy at the end
+        out[:] = result.astype(np.uint8)[:, :3]
+
+    # --- Baked 8-bit table ---
+    def bake(self):
+        """ Graded RGB for every 24-bit colour (index r | g << 8 | b << 16, 3-byte items); built once """
+        with self._bake_lock:
+            if self._baked is None:
+                with tracing.span("lut.bake", "video", size=self.size):
+                    colours = np.arange(1 << 24, dtype=np.uint32).view(np.uint8).reshape(-1, 4) # r, g, b, 0
+                    rgb = np.empty((1 << 24, 3), np.uint8)
+                    for i in range(0, 1 << 24, TILE_PIXELS * 8):
+                        self._grade_tile(colours[i:i + TILE_PIXELS * 8, :3], rgb[i:i + TILE_PIXELS * 8])
+                    self._baked = rgb.view("V3").ravel()
+        return self._baked
+
+    @property
+    def is_baked(self):
+        return self._baked is not None
+
+    def _lookup(self, raw, out, start, count):
+        """
+        One gather per pixel for pixels [start, start + count) of the packed
+        RGB bytes `raw`: reading 4 bytes at every 3-byte step and masking
+        off the 4th gives the table index without unpacking channels.
+        """
+        index = np.ndarray((count,), "<u4", raw, 3 * start, (3,)) & 0xFFFFFF
+        self._baked.take(index, out=out[start:start + count], mode="clip")
+
+    # --- Frames ---
+    def apply(self, frame, out=None, baked=None):
+        """
+        Grades a uint8 RGB frame (h, w, 3) into `out` (allocated if None,
+        may be `frame` itself). baked: True forces the 48 MB table, False
+        the trilinear path, None uses the table once it exists.
+        """
+        if out is None:
+            out = np.empty(frame.shape, np.uint8) # C order whatever the input's layout
+        # Grading writes through flat views: a strided `out` (a crop) gets a contiguous copy back
+        target = out if out.flags.c_contiguous else np.empty(out.shape, np.uint8)
+        if baked:
+            self.bake()
+        use_table = self._baked is not None and baked is not False
+        src = np.ascontiguousarray(frame).reshape(-1, 3)
+        total = len(src)
+        with tracing.span("lut.apply", "video", baked=use_table):
+            if use_table and total:
+                raw = src.ravel()
+                dst = target.reshape(-1, 3).view("V3").ravel()
+                for i in range(0, total - 1, TILE_PIXELS):
+                    self._lookup(raw, dst, i, min(TILE_PIXELS, total - 1 - i))
+                # The last pixel has no 4th byte after it to read
+                r, g, b = (int(v) for v in src[-1])
+                dst[-1] = self._baked[r | g << 8 | b << 16]
+            else:
+                dst = target.reshape(-1, 3)
+                for i in range(0, total, TILE_PIXELS):
+                    self._grade_tile(src[i:i + TILE_PIXELS], dst[i:i + TILE_PIXELS])
+        if target is not out:
+            np.copyto(out, target)
+        return out
+
+# ------------------------------------------
+#  CACHE
+# ------------------------------------------
+_luts = {}
+_luts_lock = threading.Lock()
+
+def load_cube(path):
+    """ Cached Lut3D for a .cube file (reloaded if the file changes) """
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _luts_lock:
+        lut = _luts.get(key)
+        if lut is None:
+            for old in [k for k in _luts if k[0] == key[0]]:
+                del _luts[old]
+            with tracing.span("lut.load", "video", path=path):
+                lut = _luts[key] = Lut3D.from_cube(path)
+    return lut
+
+def apply_lut(frame, path, out=None, baked=None):
+    return load_cube(path).apply(frame, out, baked)
+
+def ffmpeg_filter(path):
+    """ FFmpeg filter applying the same .cube file (trilinear like apply(), inside the encoder's filter graph) """
+    arg = path.replace("\\", "/").replace(":", "\\\\:")
+    return f"lut3d=file='{arg}':interp=trilinear"
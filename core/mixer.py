@@ -0,0 +1,282 @@
+# core/mixer.py
+"""
+Block-based audio mixer for the sequence's audio tracks (A1-A3).
+
+The timeline is rendered in fixed-size blocks: for each block only the
+clips under it are looked up (interval index, two binary searches per
+track), their samples are read straight from the PCM cache memmaps, and
+gain, pan and fade envelopes are applied as array ops before summing into
+one preallocated output buffer. Memory stays at one block whatever the
+sequence length; the blocks are streamed to FFmpeg as raw float PCM.
+
+Clip effects understood here (clip effect dicts, JSON-able):
+  {"name": "Amplitude", "gain_db": -6.0}
+  {"name": "Pan", "pan": -0.5}                      # -1 left .. +1 right
+  {"name": "Constant Power", "edge": "in", "duration": 1.0}
+  {"name": "Exponential Fade", "edge": "out", "duration": 0.5}
+A crossfade is an "out" transition on one clip overlapping an "in"
+transition of the same length on the next (see crossfade()).
+"""
+import io
+import subprocess
+import threading
+
+import numpy as np
+
+from core import tracing
+from core.audio_engine import hidden_startupinfo
+from core.pcm_cache import get_pcm_cache
+
+MIX_RATE = 48000
+MIX_CHANNELS = 2
+BLOCK_FRAMES = 8192
+EXP_RANGE_DB = 60.0 # Exponential fades run from -60 dB to unity
+
+# ------------------------------------------
+#  CURVES / PARAMETERS
+# ------------------------------------------
+def _linear(x):
+    return x
+
+def _constant_power(x):
+    # sin^2 + cos^2 = 1: a crossfade keeps the summed power flat
+    return np.sin(x * (np.pi / 2))
+
+def _exponential(x):
+    floor = 10.0 ** (-EXP_RANGE_DB / 20.0)
+    return (10.0 ** ((x - 1.0) * (EXP_RANGE_DB / 20.0)) - floor) / (1.0 - floor)
+
+FADE_CURVES = {"Linear": _linear, "Constant Power": _constant_power, "Exponential Fade": _exponential}
+
+def db_to_gain(db):
+    return 10.0 ** (db / 20.0)
+
+def pan_gains(pan, channels=MIX_CHANNELS):
+    """ Constant-power pan law, unity at centre: (left, right) gains for pan in [-1, 1] """
+    if channels == 1:
+        return (1.0,)
+    angle = (min(1.0, max(-1.0, pan)) + 1.0) * (np.pi / 4)
+    return (float(np.cos(angle) * np.sqrt(2)), float(np.sin(angle) * np.sqrt(2)))
+
+def crossfade(duration, curve="Constant Power"):
+    """ (out effect for the left clip, in effect for the right clip) """
+    return ({"name": curve, "edge": "out", "duration": duration},
+            {"name": curve, "edge": "in", "duration": duration})
+
+class ClipMix:
+    """ Gain, pan and fades of one clip, parsed once from its effect list """
+    __slots__ = ("gain", "pan", "pans", "fades")
+
+    def __init__(self, effects=None, gain_db=0.0, pan=0.0):
+        self.gain = db_to_gain(gain_db)
+        self.pan = pan
+        self.pans = None # Per output channel, set by the mixer
+        self.fades = [] # (edge, duration, curve)
+        for fx in effects or ():
+            name = fx.get("name")
+            if name == "Amplitude":
+                self.gain *= db_to_gain(fx.get("gain_db", 0.0))
+            elif name == "Pan":
+                self.pan = fx.get("pan", 0.0)
+            elif name in FADE_CURVES and fx.get("duration", 0) > 0:
+                self.fades.append((fx.get("edge", "in"), float(fx["duration"]), FADE_CURVES[name]))
+
+    def envelope(self, first, count, sample_rate, length, out):
+        """
+        Gain per sample into `out` for `count` samples starting `first`
+        samples into a clip `length` s long (curves only where fades are).
+        """
+        out[:] = self.gain
+        t0, t1 = first / sample_rate, (first + count) / sample_rate
+        for edge, duration, curve in self.fades:
+            d = min(duration, length)
+            if edge == "in" and t0 < d:
+                local = (first + np.arange(count)) / sample_rate
+                out *= curve(np.clip(local / d, 0.0, 1.0))
+            elif edge == "out" and t1 > length - d:
+                local = (first + np.arange(count)) / sample_rate
+                out *= curve(np.clip((length - local) / d, 0.0, 1.0))
+        return out
+
+# ------------------------------------------
+#  MIXER
+# ------------------------------------------
+class AudioMixer:
+    """
+    Renders the audio tracks of a Sequence block by block.
+    track_mix: {"A1": {"gain_db": -3, "pan": 0.2, "mute": False}}, per track.
+    """
+    def __init__(self, sequence, sample_rate=MIX_RATE, channels=MIX_CHANNELS,
+                 block_frames=BLOCK_FRAMES, track_mix=None, master_db=0.0, cache=None):
+        self.sequence = sequence
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_frames = block_frames
+        self.track_mix = track_mix or {}
+        self.master = db_to_gain(master_db)
+        self.cache = cache or get_pcm_cache()
+        # Preallocated: the output block, one envelope and the per-clip scratch
+        self._out = np.zeros((block_frames, channels), np.float32)
+        self._env = np.empty(block_frames, np.float32)
+        self._tmp = np.empty(block_frames, np.float32)
+        self._scratch = np.empty((block_frames, channels), np.float32)
+        self._sources = {}  # source_id -> CachedPcm
+        self._clips = {}    # (track, clip_id) -> ClipMix
+
+    @property
+    def tracks(self):
+        return [t for t in self.sequence.tracks
+                if t.kind == "audio" and not self.track_mix.get(t.name, {}).get("mute")]
+
+    @property
+    def duration(self):
+        ends = [float(t.ends.max()) for t in self.tracks if len(t)]
+        return max(ends) if ends else 0.0
+
+    def _source(self, source_id):
+        pcm = self._sources.get(source_id)
+        if pcm is None:
+            pcm = self._sources[source_id] = self.cache.get(self.sequence.sources[source_id])
+        return pcm
+
+    def _clip_mix(self, track, pos):
+        clip_id = int(track.ids[pos])
+        key = (track.name, clip_id)
+        mix = self._clips.get(key)
+        if mix is None:
+            settings = self.track_mix.get(track.name, {})
+            mix = ClipMix(track.effects.get(clip_id))
+            mix.gain *= db_to_gain(settings.get("gain_db", 0.0))
+            mix.pan = min(1.0, max(-1.0, mix.pan + settings.get("pan", 0.0)))
+            mix.pans = np.array(pan_gains(mix.pan, self.channels), np.float32)
+            self._clips[key] = mix
+        return mix
+
+    def _read(self, pcm, first, ratio, count):
+        """ (count, channels) samples of `pcm` from fractional frame `first`, `ratio` source frames per output frame """
+        if ratio == 1.0:
+            f0 = int(round(first))
+            return pcm.data[max(0, f0):max(0, min(pcm.frames, f0 + count))]
+        pos = first + np.arange(count) * ratio
+        i0 = int(pos[0])
+        chunk = pcm.data[i0:min(pcm.frames, int(pos[-1]) + 2)].astype(np.float32)
+        if len(chunk) < 2:
+            return chunk[:0]
+        valid = int(np.searchsorted(pos, i0 + len(chunk) - 1, side="right"))
+        grid = np.arange(len(chunk))
+        return np.stack([np.interp(pos[:valid] - i0, grid, chunk[:, c]) for c in range(chunk.shape[1])], axis=1)
+
+    def _mix_clip(self, track, pos, frame0, count, out):
+        sr = self.sample_rate
+        start = int(round(track.starts[pos] * sr))
+        length = float(track.outs[pos] - track.ins[pos])
+        end = start + int(round(length * sr))
+        s0, s1 = max(frame0, start), min(frame0 + count, end)
+        if s1 <= s0:
+            return
+        pcm = self._source(int(track.sources[pos]))
+        ratio = pcm.sample_rate / sr
+        src = self._read(pcm, track.ins[pos] * pcm.sample_rate + (s0 - start) * ratio, ratio, s1 - s0)
+        n = len(src)
+        if n == 0:
+            return
+
+        mix = self._clip_mix(track, pos)
+        env = mix.envelope(s0 - start, n, sr, length, self._env[:n])
+        if pcm.dtype == np.int16:
+            env *= 1.0 / 32768.0 # Resampled reads are float but still int16-scaled
+        scratch = self._scratch[:n]
+        src_channels = src.shape[1]
+        if src_channels == 1:
+            np.multiply(src[:, 0], env, out=self._tmp[:n])
+            np.multiply(self._tmp[:n, None], mix.pans, out=scratch)
+        else:
+            if self.channels == 1:
+                np.multiply(src.mean(axis=1, keepdims=True), env[:, None], out=scratch)
+            else:
+                np.multiply(src[:, :self.channels], env[:, None], out=scratch)
+            scratch *= mix.pans
+        out[s0 - frame0:s0 - frame0 + n] += scratch
+
+    def mix_block(self, frame0, count=None):
+        """ Mixes output frames [frame0, frame0 + count) into the shared buffer and returns it (a view) """
+        count = min(count or self.block_frames, self.block_frames)
+        out = self._out[:count]
+        out.fill(0.0)
+        t0 = frame0 / self.sample_rate
+        t1 = (frame0 + count) / self.sample_rate
+        for track in self.tracks:
+            for pos in track.indices_in(t0, t1):
+                self._mix_clip(track, int(pos), frame0, count, out)
+        if self.master != 1.0:
+            out *= self.master
+        np.clip(out, -1.0, 1.0, out=out)
+        return out
+
+    def blocks(self, t0=0.0, t1=None):
+        """
+        Yields float32 (frames, channels) blocks covering [t0, t1) (default:
+        the whole mix). Every block is the SAME buffer: consume (write, copy)
+        it before asking for the next.
+        """
+        sr = self.sample_rate
+        first = int(round(t0 * sr))
+        last = int(round((self.duration if t1 is None else t1) * sr))
+        with tracing.span("mixer.render", "audio", seconds=(last - first) / sr):
+            for frame0 in range(first, last, self.block_frames):
+                yield self.mix_block(frame0, min(self.block_frames, last - frame0))
+
+    def render(self, t0=0.0, t1=None):
+        """ Whole range as one array (previews, short ranges; exports should stream blocks()) """
+        parts = [block.copy() for block in self.blocks(t0, t1)]
+        return np.concatenate(parts) if parts else np.zeros((0, self.channels), np.float32)
+
+# ------------------------------------------
+#  STREAMING TO FFMPEG
+# ------------------------------------------
+def ffmpeg_input_args(mixer):
+    """ FFmpeg input options for the mix fed on stdin """
+    return ["-f", "f32le", "-ar", str(mixer.sample_rate), "-ac", str(mixer.channels), "-i", "pipe:0"]
+
+def popen_with_binary_stdin(cmd):
+    """
+    Starts an FFmpeg that is fed raw audio on stdin. stdin stays binary;
+    stdout (the log, stderr merged in) is read as text like the other exports.
+    """
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, startupinfo=hidden_startupinfo())
+    process.stdout = io.TextIOWrapper(process.stdout)
+    return process
+
+def _feed_mix(proc, mixer, duration=None):
+    """ Writes the mix into the process stdin (buffer views, no copies) """
+    try:
+        for block in mixer.blocks(0.0, duration):
+            proc.stdin.write(memoryview(block).cast("B"))
+    except (BrokenPipeError, OSError):
+        pass # FFmpeg exited, its output tells the caller why
+    finally:
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+
+def start_feed(process, mixer, duration=None):
+    """
+    Streams `mixer` into a Popen started with ffmpeg_input_args() on a
+    daemon thread. `duration` (default: the mix's own) is the length sent:
+    exports pass the video's, so the mix is cut or padded with silence to
+    match it instead of relying on -shortest.
+    """
+    feeder = threading.Thread(target=_feed_mix, args=(process, mixer, duration), daemon=True, name="mixer-feed")
+    feeder.start()
+    return feeder
+
+def export_mix(sequence, output_path, codec_args=("-c:a", "pcm_s16le"), **mixer_options):
+    """ Mixdown of the audio tracks to an audio file. Returns the Popen (stdout carries FFmpeg's log). """
+    mixer = AudioMixer(sequence, **mixer_options)
+    cmd = ["ffmpeg", "-y", *ffmpeg_input_args(mixer), *codec_args, output_path]
+    process = popen_with_binary_stdin(cmd)
+    start_feed(process, mixer)
+    tracing.trace_process(process, "export.mixdown")
+    return process
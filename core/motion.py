@@ -0,0 +1,135 @@
+# core/motion.py
+"""
+Effect Controls "Motion" (Position, Scale, Rotation) applied to one frame.
+
+Positions are in sequence pixels (SEQUENCE_SIZE, the centre is the
+default). The canvas has the sequence's aspect (sequence_canvas) and at
+100 % the source fits inside it, letterboxed or pillarboxed at its own
+pixel size, so the defaults reproduce any frame exactly. A render is the
+inverse mapping canvas pixel -> source pixel (nearest neighbour) done as
+one gather: the frame is kept as a flat table of 3-byte pixels with one
+black pixel appended, so anything that maps outside the source is just an
+index into the pad. Without rotation the index is a row + column sum (two
+1-D maps); with rotation it is the full affine map. Renders can be done in
+row bands so a long full-resolution pass can be abandoned between bands.
+"""
+import math
+import subprocess
+
+import numpy as np
+
+from core import tracing
+from core.audio_engine import RUST_AVAILABLE, kanha_core, hidden_startupinfo, probe_size
+
+SEQUENCE_SIZE = (1920, 1080) # Motion coordinates (ProjectState.motion defaults to the centre)
+DRAFT_FACTOR = 4             # Interactive previews: quarter resolution
+BAND_ROWS = 128
+
+# ------------------------------------------
+#  DECODE
+# ------------------------------------------
+def decode_frame(path, seconds, size=None):
+    """ RGB frame (h, w, 3) uint8 at `seconds`, at native size unless `size` """
+    w, h = size or probe_size(path)
+    with tracing.span("motion.decode", "video", width=w, height=h):
+        if RUST_AVAILABLE:
+            raw = kanha_core.VideoClip(path).get_exact_frame(seconds, w, h)
+        else:
+            cmd = ["ffmpeg", "-v", "error", "-ss", f"{max(0.0, seconds):.6f}", "-i", path,
+                   "-frames:v", "1", "-an", "-sn", "-s", f"{w}x{h}",
+                   "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1"]
+            raw = subprocess.run(cmd, capture_output=True, startupinfo=hidden_startupinfo()).stdout
+    if len(raw) < w * h * 3:
+        raise IOError(f"Could not decode a frame of {path} at {seconds:.3f}s")
+    return np.frombuffer(raw, np.uint8, w * h * 3).reshape(h, w, 3)
+
+def downsample(frame, factor):
+    """ Box-filtered 1/factor copy (the draft proxy; built once per decoded frame) """
+    h, w = frame.shape[0] // factor, frame.shape[1] // factor
+    blocks = frame[:h * factor, :w * factor].reshape(h, factor, w, factor, 3)
+    acc = np.zeros((h, w, 3), np.uint16)
+    for i in range(factor): # factor^2 strided adds: much faster than sum() over two axes
+        for j in range(factor):
+            acc += blocks[:, i, :, j]
+    acc //= factor * factor
+    return acc.astype(np.uint8)
+
+# ------------------------------------------
+#  RENDER
+# ------------------------------------------
+def inverse_map(motion, canvas, source):
+    """
+    (a, b, c, d, e, g) taking canvas pixel (x, y) to source coordinates
+    sx = a x + b y + c, sy = d x + e y + g (pixel i covers [i, i + 1)).
+    """
+    cw, ch = canvas
+    sw, sh = source
+    # Canvas pixels per motion unit, per axis: the centre stays exact when rounding bends the aspect
+    px = motion.get("pos_x", SEQUENCE_SIZE[0] / 2) * cw / SEQUENCE_SIZE[0]
+    py = motion.get("pos_y", SEQUENCE_SIZE[1] / 2) * ch / SEQUENCE_SIZE[1]
+    s = max(motion.get("scale", 100), 0.1) / 100.0 * min(cw / sw, ch / sh) # Canvas pixels per source pixel
+    theta = math.radians(motion.get("rotation", 0) % 360) # Clockwise on screen (y down)
+    # Rounded so whole turns and 180 degrees keep b = d = 0 (the separable path, no float drift)
+    cos, sin = round(math.cos(theta), 15) / s, round(math.sin(theta), 15) / s
+    ox, oy = 0.5 - px, 0.5 - py # Pixel centres, relative to the anchor
+    return (cos, sin, cos * ox + sin * oy + sw / 2,
+            -sin, cos, -sin * ox + cos * oy + sh / 2)
+
+class MotionFrame:
+    """ One decoded frame prepared for repeated Motion renders """
+    def __init__(self, frame):
+        self.height, self.width = frame.shape[:2]
+        self.pad = self.width * self.height # Index of the black pixel
+        self.pixels = np.zeros(self.pad + 1, "V3")
+        self.pixels[:-1] = np.ascontiguousarray(frame).reshape(-1, 3).view("V3").ravel()
+
+    def _band_index(self, m, canvas_w, r0, r1):
+        a, b, c, d, e, g = m
+        sw, sh = self.width, self.height
+        xs = np.arange(canvas_w, dtype=np.float64)
+        ys = np.arange(r0, r1, dtype=np.float64)
+        if b == 0.0 and d == 0.0:
+            # No rotation: column and row maps are independent, invalid ones point past the pad
+            cols = np.floor(a * xs + c).astype(np.int64)
+            rows = np.floor(e * ys + g).astype(np.int64)
+            cols[(cols < 0) | (cols >= sw)] = self.pad
+            rows = np.where((rows < 0) | (rows >= sh), self.pad, rows * sw)
+            return np.add.outer(rows, cols) # Sums involving the pad are >= pad: clipped onto it by take()
+        sx = np.add.outer(b * ys + c, (a * xs).astype(np.float32), dtype=np.float32)
+        sy = np.add.outer(e * ys + g, (d * xs).astype(np.float32), dtype=np.float32)
+        ix = np.floor(sx, out=sx).astype(np.int32)
+        iy = np.floor(sy, out=sy).astype(np.int32)
+        outside = ix.view(np.uint32) >= sw # Negatives wrap to huge unsigned values
+        outside |= iy.view(np.uint32) >= sh
+        index = iy.astype(np.int64)
+        index *= sw
+        index += ix
+        index[outside] = self.pad
+        return index
+
+    def render(self, motion, canvas, out=None, rows=None):
+        """
+        Rows [r0, r1) (default all) of the canvas (width, height) into
+        `out` (height, width, 3) uint8, allocated if None. Returns out.
+        """
+        cw, ch = canvas
+        if out is None:
+            out = np.empty((ch, cw, 3), np.uint8)
+        r0, r1 = rows or (0, ch)
+        m = inverse_map(motion, canvas, (self.width, self.height))
+        dst = out.reshape(-1, 3).view("V3").ravel()
+        for y in range(r0, r1, BAND_ROWS):
+            y1 = min(r1, y + BAND_ROWS)
+            index = self._band_index(m, cw, y, y1)
+            self.pixels.take(index.ravel(), out=dst[y * cw:y1 * cw], mode="clip")
+        return out
+
+def sequence_canvas(width, height):
+    """ Canvas with the sequence's aspect holding a width x height source at its own pixel size """
+    seq_w, seq_h = SEQUENCE_SIZE
+    if width * seq_h >= height * seq_w:
+        return width, max(1, round(width * seq_h / seq_w))
+    return max(1, round(height * seq_w / seq_h)), height
+
+def draft_canvas(width, height, factor=DRAFT_FACTOR):
+    return max(1, width // factor), max(1, height // factor)
@@ -0,0 +1,231 @@
+# core/pcm_cache.py
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+
+import numpy as np
+
+from core.audio_analysis import Analyser, MonoResampler, analyze_audio
+
+# File layout: 32-byte header, then interleaved samples (frames x channels)
+# magic, version, dtype code, sample rate, channels, frames, reserved
+HEADER = struct.Struct("<4sHHIIQ8x")
+MAGIC = b"KPCM"
+VERSION = 1
+DTYPES = {1: np.dtype("<i2"), 2: np.dtype("<f4")}
+DTYPE_CODES = {v: k for k, v in DTYPES.items()}
+
+NATIVE = "native"   # Source rate/channels, int16
+MONO_16K = "16k"    # 16 kHz mono downmix, float32 (what speech models want)
+
+class CachedPcm:
+    """
+    Read-only memory-mapped view of one cached stream.
+    slice(t0, t1) returns a zero-copy NumPy view of frames [t0, t1).
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, code, sr, ch, frames = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or code not in DTYPES:
+            raise ValueError(f"Not a PCM cache file: {path}")
+        self.sample_rate = sr
+        self.channels = ch
+        self.frames = frames
+        self.dtype = DTYPES[code]
+        if frames:
+            self.data = np.memmap(path, self.dtype, "r", offset=HEADER.size, shape=(frames, ch))
+        else:
+            self.data = np.zeros((0, ch), self.dtype)
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    def frame_at(self, t):
+        """ Seconds -> frame index, clamped to the stream """
+        return min(self.frames, max(0, int(round(t * self.sample_rate))))
+
+    def slice(self, t0, t1):
+        return self.data[self.frame_at(t0):self.frame_at(t1)]
+
+    def slice_float(self, t0, t1):
+        """ Same range as slice(), converted to float32 -1.0..1.0 (copies for int16) """
+        view = self.slice(t0, t1)
+        if self.dtype == np.float32:
+            return view
+        return view.astype(np.float32) / 32768.0
+
+class _PcmWriter:
+    """ Streams samples into a cache file, patching the frame count on close """
+    def __init__(self, path, dtype, sample_rate, channels):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = 0
+        self.file = open(path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, DTYPE_CODES[self.dtype],
+                                    self.sample_rate, self.channels, self.frames))
+
+    def write(self, samples):
+        if self.dtype == np.int16:
+            samples = np.clip(samples * 32767.0, -32768, 32767)
+        self.file.write(np.ascontiguousarray(samples, self.dtype).tobytes())
+        self.frames += len(samples)
+
+    def close(self):
+        self._write_header()
+        self.file.close()
+
+class _NativeCacheWriter(Analyser):
+    name = NATIVE
+
+    def __init__(self, path):
+        self.path = path
+
+    def start(self, sample_rate, channels):
+        super().start(sample_rate, channels)
+        self.writer = _PcmWriter(self.path, "<i2", sample_rate, channels)
+
+    def feed(self, block):
+        self.writer.write(block)
+
+    def finish(self):
+        self.writer.close()
+        return self.path
+
+class _MonoCacheWriter(MonoResampler):
+    name = MONO_16K
+
+    def __init__(self, path, rate=16000):
+        super().__init__(rate, sink=self._write)
+        self.path = path
+
+    def start(self, sample_rate, channels):
+        super().start(sample_rate, channels)
+        self.writer = _PcmWriter(self.path, "<f4", self.rate, 1)
+
+    def _write(self, out):
+        self.writer.write(out[:, None])
+
+    def finish(self):
+        super().finish()
+        self.writer.close()
+        return self.path
+
+class PcmCache:
+    """
+    Decoded-PCM cache shared by every subsystem that needs samples
+    (waveforms, speech detection, transcription chunks, mixing).
+
+    Each media file is decoded once into two memory-mapped files: native
+    int16 and a 16 kHz mono float32 downmix. Total size on disk is kept
+    under `budget_bytes` by evicting the least recently used entries.
+    """
+    def __init__(self, cache_dir=None, budget_bytes=4 * 1024 ** 3):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "kanha_pcm_cache")
+        self.budget_bytes = budget_bytes
+        self._open = {}  # file path -> CachedPcm
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, media_path):
+        """ Entries are invalidated when the source file changes """
+        st = os.stat(media_path)
+        raw = f"{os.path.abspath(media_path)}|{st.st_size}|{st.st_mtime_ns}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key, kind):
+        return os.path.join(self.cache_dir, f"{key}.{kind}.pcm")
+
+    def contains(self, media_path):
+        key = self.key(media_path)
+        return all(os.path.exists(self._entry_path(key, k)) for k in (NATIVE, MONO_16K))
+
+    def get(self, media_path, kind=NATIVE):
+        """ Returns the CachedPcm for `media_path`, decoding it on first use """
+        key = self.key(media_path)
+        path = self._entry_path(key, kind)
+        with self._lock:
+            if path not in self._open:
+                if not os.path.exists(path):
+                    self._build(media_path, key)
+                self._open[path] = CachedPcm(path)
+            # Refresh mtime: it is our LRU clock
+            self._touch(path)
+            return self._open[path]
+
+    def slice(self, media_path, t0, t1, kind=NATIVE):
+        return self.get(media_path, kind).slice(t0, t1)
+
+    def _build(self, media_path, key):
+        """ One decode fills both representations """
+        native, mono = self._entry_path(key, NATIVE), self._entry_path(key, MONO_16K)
+        tmp_native, tmp_mono = native + ".part", mono + ".part"
+        try:
+            analyze_audio(media_path, [_NativeCacheWriter(tmp_native), _MonoCacheWriter(tmp_mono)])
+        except Exception:
+            for p in (tmp_native, tmp_mono):
+                if os.path.exists(p):
+                    os.remove(p)
+            raise
+        os.replace(tmp_native, native)
+        os.replace(tmp_mono, mono)
+        self._enforce_budget(keep=(native, mono))
+
+    def _touch(self, path):
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def _enforce_budget(self, keep=()):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pcm"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.budget_bytes:
+                break
+            if path in keep:
+                continue
+            self._open.pop(path, None)
+            try:
+                os.remove(path)
+            except OSError:
+                continue # Still mapped somewhere (Windows), try next time
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._open.clear()
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".pcm"):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
+
+_default_cache = None
+
+def get_pcm_cache():
+    """ Process-wide cache, so the disk budget is shared by every subsystem """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PcmCache()
+    return _default_cache
@@ -1,7 +1,10 @@
 # core/project.py
+import threading
 from dataclasses import dataclass, field
 from typing import List, Dict
 
+from core.timeline import Sequence
+
 @dataclass
 class Subtitle:
     start: float
@@ -9,15 +12,86 @@ class Subtitle:
     text: str
 
 class ProjectState:
+    # Heavy payloads: stored in their own sections of the project file and
+    # only loaded when first touched (see core/project_file.py)
+    LAZY_SECTIONS = ("subtitles", "waveform_points", "analysis", "sequence")
+    # Small values that live in the project header
+    FIELDS = ("video_path", "duration", "media", "motion", "font_settings")
+
     def __init__(self):
         self.video_path: str = None
         self.duration: float = 0.0
+        self.media: List[str] = []  # Paths of everything imported into the bin
+        # Effect Controls values (PropertiesPanel); font_settings feeds generate_ass_file
+        self.motion: Dict = {"pos_x": 960, "pos_y": 540, "scale": 100, "rotation": 0}
+        self.font_settings: Dict = {"font": "Arial", "size": 40, "color": "#FFFFFF", "y_pos": 50}
         self.subtitles: List[Dict] = [] # Stores dictionaries of subtitles
         self.waveform_points: List[float] = []
+        self.analysis: Dict = {} # Results of core.audio_analysis (speech, stats, waveform)
+        self.sequence = Sequence() # Timeline tracks and clips
         self.video_clip = None # Store MoviePy clip ref if needed (optional)
 
+        self.project_file = None # ProjectFile we were opened from (lazy sections)
+        self.autosaver = None    # Autosaver receiving our edit deltas
+        self.lock = threading.RLock()
+        self.seq = 0             # Number of deltas applied (journal ordering)
+        self.subtitles_rev = 0   # Bumped by every subtitle edit (caption preview caches)
+        self._pending = {}       # Section -> journal deltas waiting for a lazy load
+
+    def __getattr__(self, name):
+        # Only called when normal lookup fails: a lazy section not loaded yet
+        if name in ProjectState.LAZY_SECTIONS and self.__dict__.get("project_file") is not None:
+            from core.project_file import apply_delta
+            value = self.project_file.load_section(name)
+            self.__dict__[name] = value
+            for delta in self._pending.pop(name, []):
+                apply_delta(self, delta)
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+    def is_loaded(self, section):
+        return section in self.__dict__
+
     def clear(self):
         self.video_path = None
         self.duration = 0.0
+        self.media = []
+        self.motion = {"pos_x": 960, "pos_y": 540, "scale": 100, "rotation": 0}
+        self.font_settings = {"font": "Arial", "size": 40, "color": "#FFFFFF", "y_pos": 50}
         self.subtitles = []
-        self.waveform_points = []
\ No newline at end of file
+        self.subtitles_rev += 1
+        self.waveform_points = []
+        self.analysis = {}
+        self.sequence = Sequence()
+        self.project_file = None
+        self._pending = {}
+
+    # ------------------------------------------
+    #  EDITS (every change goes through here so it can be journaled)
+    # ------------------------------------------
+    def apply(self, delta):
+        """ Applies one edit delta and forwards it to the autosave journal """
+        from core.project_file import apply_delta
+        with self.lock:
+            apply_delta(self, delta)
+            self.seq += 1
+            if delta["op"].startswith("sub_") or delta.get("key") == "subtitles":
+                self.subtitles_rev += 1
+            if self.autosaver is not None:
+                self.autosaver.record(self.seq, delta)
+
+    def set_field(self, key, value):
+        self.apply({"op": "set", "key": key, "value": value})
+
+    def set_subtitle(self, index, segment):
+        self.apply({"op": "sub_set", "i": index, "value": dict(segment)})
+
+    def insert_subtitle(self, index, segment):
+        self.apply({"op": "sub_insert", "i": index, "value": dict(segment)})
+
+    def delete_subtitle(self, index):
+        self.apply({"op": "sub_delete", "i": index})
+
+    def edit_timeline(self, method, *args):
+        """ Runs a Sequence edit (add_clip, ripple, roll...) as a journaled delta """
+        self.apply({"op": "tl", "method": method, "args": list(args)})
@@ -0,0 +1,345 @@
+# core/project_file.py
+"""
+Kanha project format (.kproj)
+
+    [header 20B][section][section]...[index JSON]
+
+The header points at the index, which holds the small project fields and
+the offset/size of every heavy section (subtitles, waveform, analysis).
+Opening a project reads only header + index; sections are decoded the
+first time ProjectState touches them.
+
+Edits are not written into the project file. They are appended as JSON
+deltas to "<project>.journal" by a background Autosaver, and folded back
+into a fresh project file (compaction) once the journal grows.
+"""
+import io
+import json
+import os
+import queue
+import struct
+import threading
+import uuid
+import zlib
+
+import numpy as np
+
+from core import tracing
+from core.project import ProjectState
+from core.timeline import Sequence
+
+MAGIC = b"KPRJ"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQI") # magic, version, reserved, index offset, index size
+JOURNAL_SUFFIX = ".journal"
+
+# ------------------------------------------
+#  SECTION CODECS
+# ------------------------------------------
+def _encode_json(value):
+    return json.dumps(value).encode("utf-8")
+
+def _decode_json(raw):
+    return json.loads(raw.decode("utf-8"))
+
+def _encode_points(value):
+    buf = io.BytesIO()
+    np.save(buf, np.asarray(value, np.float32))
+    return buf.getvalue()
+
+def _decode_points(raw):
+    return np.load(io.BytesIO(raw)).tolist()
+
+def _encode_analysis(value):
+    """ Waveform pyramid levels go in as arrays, everything else as JSON """
+    from core.audio_analysis import WaveformPyramid
+    arrays, meta = {}, {}
+    for key, result in value.items():
+        if isinstance(result, WaveformPyramid):
+            meta[key] = {"pyramid": len(result.levels), "bin_frames": result.bin_frames,
+                         "sample_rate": result.sample_rate}
+            for i, level in enumerate(result.levels):
+                arrays[f"{key}_{i}"] = level
+        else:
+            meta[key] = {"json": result}
+    buf = io.BytesIO()
+    np.savez(buf, meta=np.array(json.dumps(meta)), **arrays)
+    return buf.getvalue()
+
+def _decode_analysis(raw):
+    from core.audio_analysis import WaveformPyramid
+    data = np.load(io.BytesIO(raw))
+    out = {}
+    for key, info in json.loads(str(data["meta"])).items():
+        if "pyramid" in info:
+            levels = [data[f"{key}_{i}"] for i in range(info["pyramid"])]
+            out[key] = WaveformPyramid(levels, info["bin_frames"], info["sample_rate"])
+        else:
+            out[key] = info["json"]
+    return out
+
+# name -> (encode, decode, empty value factory)
+SECTION_CODECS = {
+    "subtitles": (_encode_json, _decode_json, list),
+    "waveform_points": (_encode_points, _decode_points, list),
+    "analysis": (_encode_analysis, _decode_analysis, dict),
+    "sequence": (Sequence.to_bytes, Sequence.from_bytes, Sequence),
+}
+
+# Lazy section each delta op works on
+DELTA_SECTIONS = {"sub_set": "subtitles", "sub_insert": "subtitles",
+                  "sub_delete": "subtitles", "tl": "sequence"}
+
+# ------------------------------------------
+#  DELTAS
+# ------------------------------------------
+def apply_delta(state, delta):
+    """
+    Applies one journal delta to a ProjectState.
+    Deltas for a lazy section that is not loaded yet are queued and
+    replayed when the section loads, so opening never forces a decode.
+    """
+    op = delta["op"]
+    if op == "set":
+        state._pending.pop(delta["key"], None)
+        setattr(state, delta["key"], delta["value"])
+        return
+
+    section = DELTA_SECTIONS.get(op)
+    if section is None:
+        raise ValueError(f"Unknown project delta: {op}")
+    if not state.is_loaded(section) and state.project_file is not None:
+        state._pending.setdefault(section, []).append(delta)
+        return
+
+    if op == "tl":
+        getattr(state.sequence, delta["method"])(*delta["args"])
+        return
+
+    subs = state.subtitles
+    if op == "sub_set":
+        subs[delta["i"]] = delta["value"]
+    elif op == "sub_insert":
+        subs.insert(delta["i"], delta["value"])
+    elif op == "sub_delete":
+        del subs[delta["i"]]
+
+# ------------------------------------------
+#  FILE
+# ------------------------------------------
+class ProjectFile:
+    """ Read side of a .kproj: header + index now, sections on demand """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, _, offset, size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a Kanha project: {path}")
+            if version > VERSION:
+                raise ValueError(f"Project version {version} is newer than this editor")
+            f.seek(offset)
+            self.index = json.loads(f.read(size).decode("utf-8"))
+        self.id = self.index["id"]
+
+    def read_raw(self, name):
+        """ Stored (compressed) bytes of a section """
+        entry = self.index["sections"][name]
+        with open(self.path, "rb") as f:
+            f.seek(entry["offset"])
+            return f.read(entry["size"])
+
+    def load_section(self, name):
+        _, decode, empty = SECTION_CODECS[name]
+        if name not in self.index["sections"]:
+            return empty()
+        return decode(zlib.decompress(self.read_raw(name)))
+
+def _snapshot(state):
+    """
+    Captures what save_project needs while holding the state lock.
+    Only references are copied here (subtitle dicts are replaced, never
+    mutated, by deltas), so the UI is blocked for microseconds.
+    """
+    with state.lock:
+        fields = {k: getattr(state, k) for k in ProjectState.FIELDS}
+        sections = {}
+        for name in ProjectState.LAZY_SECTIONS:
+            if state.is_loaded(name):
+                value = state.__dict__[name]
+                if isinstance(value, Sequence):
+                    # Columns are edited in place, so encode while we hold the lock
+                    sections[name] = ("encoded", value.to_bytes())
+                else:
+                    sections[name] = ("value", list(value) if isinstance(value, list) else dict(value))
+            elif name in state._pending:
+                sections[name] = ("value", getattr(state, name)) # Replays pending deltas
+            elif state.project_file is not None and name in state.project_file.index["sections"]:
+                sections[name] = ("raw", state.project_file)
+        return fields, sections, state.seq
+
+def save_project(state, path):
+    """
+    Writes a complete project file (atomic replace) and starts a fresh
+    journal. Sections that were never loaded are copied as raw bytes.
+    Returns the state sequence number the file reflects.
+    """
+    fields, sections, seq = _snapshot(state)
+    project_id = uuid.uuid4().hex
+    index = {"id": project_id, "fields": fields, "sections": {}}
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        for name, (kind, payload) in sections.items():
+            if kind == "raw":
+                data = payload.read_raw(name)
+            elif kind == "encoded":
+                data = zlib.compress(payload, 1)
+            else:
+                encode = SECTION_CODECS[name][0]
+                data = zlib.compress(encode(payload), 1)
+            index["sections"][name] = {"offset": f.tell(), "size": len(data)}
+            f.write(data)
+
+        raw_index = json.dumps(index).encode("utf-8")
+        index_offset = f.tell()
+        f.write(raw_index)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, index_offset, len(raw_index)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    with state.lock:
+        state.project_file = ProjectFile(path)
+    _reset_journal(path, project_id)
+    return seq
+
+def _reset_journal(path, project_id):
+    with open(path + JOURNAL_SUFFIX, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"op": "base", "id": project_id}) + "\n")
+
+def _read_journal(path, project_id):
+    """ Deltas recorded since the last compaction (a torn last line is ignored) """
+    try:
+        with open(path + JOURNAL_SUFFIX, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return []
+    deltas = []
+    for i, line in enumerate(lines):
+        try:
+            delta = json.loads(line)
+        except ValueError:
+            break
+        if i == 0:
+            if delta.get("op") != "base" or delta.get("id") != project_id:
+                return [] # Journal belongs to an older version of the file
+            continue
+        deltas.append(delta)
+    return deltas
+
+def open_project(path):
+    """ Constant-time open: header, index and journal only """
+    pf = ProjectFile(path)
+    state = ProjectState()
+    for key, value in pf.index["fields"].items():
+        setattr(state, key, value)
+    for name in ProjectState.LAZY_SECTIONS:
+        del state.__dict__[name] # Loaded on first access via __getattr__
+    state.project_file = pf
+
+    deltas = _read_journal(path, pf.id)
+    for delta in deltas:
+        apply_delta(state, delta)
+    state.seq = len(deltas)
+    return state
+
+# ------------------------------------------
+#  AUTOSAVE
+# ------------------------------------------
+class Autosaver:
+    """
+    Appends edit deltas to the journal from a background thread.
+    The UI thread only does a queue.put() per edit. Once the journal
+    passes `compact_bytes` the project file is rewritten and the journal
+    restarted, all off the UI thread.
+    """
+    def __init__(self, state, path, interval=1.0, compact_bytes=4 * 1024 * 1024):
+        self.state = state
+        self.path = path
+        self.interval = interval
+        self.compact_bytes = compact_bytes
+        self.queue = queue.Queue()
+        self._base_seq = state.seq # Deltas up to here are already in the project file
+        self._stop = threading.Event()
+
+        if state.project_file is None or os.path.abspath(state.project_file.path) != os.path.abspath(path):
+            self._base_seq = save_project(state, path)
+        state.autosaver = self
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def record(self, seq, delta):
+        self.queue.put((seq, delta))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._flush_safely()
+        self._flush_safely()
+
+    def _flush_safely(self):
+        # A failed write must not end the thread: later edits still need journaling
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Autosave failed: {e}")
+
+    def flush(self):
+        tracing.counter("autosave.queue", self.queue.qsize(), "io")
+        lines = []
+        needs_compact = False
+        while True:
+            try:
+                seq, delta = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if seq <= self._base_seq:
+                continue
+            try:
+                lines.append(json.dumps(delta))
+            except (TypeError, ValueError):
+                # Not JSON (e.g. a waveform pyramid): the next compaction stores it
+                needs_compact = True
+        if needs_compact:
+            self.compact()
+            return
+        if not lines:
+            return
+
+        journal = self.path + JOURNAL_SUFFIX
+        try:
+            with tracing.span("autosave.append", "io", deltas=len(lines)), open(journal, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"Autosave journal write failed: {e}") # The deltas are gone from the queue: save them in full
+            self.compact()
+            return
+        if os.path.getsize(journal) > self.compact_bytes:
+            self.compact()
+
+    def compact(self):
+        try:
+            with tracing.span("autosave.compact", "io"):
+                self._base_seq = save_project(self.state, self.path)
+        except Exception as e:
+            # OSError (disk), or TypeError/ValueError from a value a section can't encode
+            print(f"Autosave compaction failed: {e}") # Journal is still intact
+
+    def stop(self):
+        """ Final flush; call before exit. Blocks until the last journal write or compaction is done. """
+        self._stop.set()
+        self.thread.join()
+        self.state.autosaver = None
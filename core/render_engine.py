@@ -1,8 +1,11 @@
 # core/render_engine.py
 import subprocess
-import os
 import sys
-from utils.time_utils import seconds_to_ass_time
+from core import tracing
+from core.audio_engine import hidden_startupinfo, probe_duration
+from core.lut import ffmpeg_filter as lut_ffmpeg_filter
+from core.mixer import ffmpeg_input_args, popen_with_binary_stdin, start_feed
+from utils.timebase import format_ass
 
 def generate_ass_file(segments, font_settings, path="temp_subtitles.ass"):
     # Construct .ass file logic (copied from your previous code)
@@ -20,35 +23,48 @@ Style: Default,{font_settings['font']},{font_settings['size']},{bgr_color},2,0,2
 [Events]
 Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
 """
-    with open(path, "w", encoding="utf-8") as f:
+    with tracing.span("generate_ass_file", "export", lines=len(segments)), \
+            open(path, "w", encoding="utf-8") as f:
         f.write(header)
-        for s in segments:
-            start = seconds_to_ass_time(s['start'])
-            end = seconds_to_ass_time(s['end'])
+        # Timestamps for every line in two array ops
+        starts = format_ass([s['start'] for s in segments])
+        ends = format_ass([s['end'] for s in segments])
+        for s, start, end in zip(segments, starts, ends):
             text = s['text'].replace("\n", "\\N")
             f.write(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}\n")
     return path
 
-def export_video_with_ffmpeg(video_path, ass_path, output_path):
+def export_video_with_ffmpeg(video_path, ass_path, output_path, mixer=None, lut_path=None):
     """
-    Calls the system FFmpeg to burn subtitles via .ass file
+    Calls the system FFmpeg to burn subtitles via .ass file.
+    With a core.mixer.AudioMixer the audio is the streamed A1-A3 mix
+    instead of a copy of the source's own track. lut_path: a .cube show
+    LUT graded inside FFmpeg's filter graph, before the subtitles.
     """
     sub_arg = ass_path.replace("\\", "/").replace(":", "\\\\:")
+    vf = f"subtitles='{sub_arg}'"
+    if lut_path:
+        vf = f"{lut_ffmpeg_filter(lut_path)},{vf}"
+    audio_in, audio_out = [], ["-c:a", "copy"]
+    if mixer is not None:
+        audio_in = ffmpeg_input_args(mixer)
+        audio_out = ["-map", "0:v:0", "-map", "1:a:0", "-c:a", "aac", "-b:a", "192k"]
+        mix_duration = probe_duration(video_path) # The mix is padded/cut to the video's length
     cmd = [
         "ffmpeg", "-y",
         "-i", video_path,
-        "-vf", f"subtitles='{sub_arg}'",
+        *audio_in,
+        "-vf", vf,
         "-c:v", "libx264", "-preset", "medium",
-        "-c:a", "copy",
+        *audio_out,
         output_path
     ]
-    
-    # Windows process handling to hide console
-    startupinfo = None
-    if os.name == 'nt':
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
 
-    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, 
-                               startupinfo=startupinfo, universal_newlines=True)
+    if mixer is None:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   startupinfo=hidden_startupinfo(), universal_newlines=True)
+    else:
+        process = popen_with_binary_stdin(cmd)
+        start_feed(process, mixer, mix_duration)
+    tracing.trace_process(process, "export.burn_subtitles")
     return process
\ No newline at end of file
@@ -0,0 +1,502 @@
+# core/render_farm.py
+"""
+Distributed export: a coordinator splits the video into frame ranges and
+hands them to worker agents on other machines over TCP.
+
+  coordinator (RenderFarm, in the editor)        worker agents (LAN boxes)
+      listens on PORT  <-------- connect + hello -------  python -m core.render_farm worker --connect host:port
+      job {range, filters} ------------------------------> ffmpeg -ss .. -frames:v .. segment.mp4
+      <------------------------------ progress heartbeats / segment bytes / failed
+
+Media is shared by path (same mount, or rewritten with --map on the worker);
+only the small .ass text and the encoded segments travel over the socket.
+Every segment starts on its own keyframe, so the coordinator joins them
+with FFmpeg's concat demuxer (stream copy) and adds the audio in the same
+pass: the source's track, or the streamed core.mixer mix. A range that
+fails, or whose worker drops or goes silent, is queued again and handed to
+a different worker; after MAX_ATTEMPTS the export fails.
+
+Wire format: 8-byte header (JSON length, payload length, big-endian
+uint32), the JSON message, then the raw payload (segment bytes).
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+from core import tracing
+from core.audio_engine import hidden_startupinfo, probe_duration, probe_fps
+from core.lut import ffmpeg_filter as lut_ffmpeg_filter
+from core.mixer import ffmpeg_input_args, start_feed
+
+DEFAULT_PORT = 47100
+SEGMENT_SECONDS = 20.0 # ~360 ranges for a 2 h export: fine-grained enough to balance and retry cheaply
+HEARTBEAT = 5.0        # Workers report while encoding; silence for 4 beats means the box is gone
+MAX_ATTEMPTS = 3
+_HEADER = struct.Struct(">II")
+_CHUNK = 1 << 20
+
+# ------------------------------------------
+#  WIRE PROTOCOL
+# ------------------------------------------
+def _send(sock, message, payload_size=0):
+    data = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data), payload_size) + data)
+
+def _recv_exact(sock, size):
+    buf = bytearray(size)
+    view = memoryview(buf)
+    got = 0
+    while got < size:
+        n = sock.recv_into(view[got:])
+        if n == 0:
+            raise ConnectionError("Connection closed")
+        got += n
+    return buf
+
+def _recv(sock):
+    """ (message, payload_size); the payload, if any, is still on the socket """
+    size, payload_size = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, size)), payload_size
+
+def _recv_file(sock, size, path):
+    buf = bytearray(min(size, _CHUNK))
+    view = memoryview(buf)
+    with open(path, "wb") as f:
+        left = size
+        while left:
+            n = sock.recv_into(view[:min(left, len(buf))])
+            if n == 0:
+                raise ConnectionError("Connection closed mid-segment")
+            f.write(view[:n])
+            left -= n
+
+# ------------------------------------------
+#  JOBS
+# ------------------------------------------
+def split_frames(total_frames, fps, segment_seconds=SEGMENT_SECONDS):
+    """ [(first_frame, frame_count)] covering the export in ranges of about `segment_seconds` """
+    step = max(1, int(round(segment_seconds * fps)))
+    return [(f, min(step, total_frames - f)) for f in range(0, total_frames, step)]
+
+class Segment:
+    """ One frame range of an export and its retry bookkeeping """
+    __slots__ = ("index", "first", "frames", "attempts", "failed_on", "path", "worker", "started")
+
+    def __init__(self, index, first, frames):
+        self.index = index
+        self.first = first
+        self.frames = frames
+        self.attempts = 0
+        self.failed_on = set() # Worker names that failed this range
+        self.path = None
+        self.worker = None
+        self.started = 0.0
+
+class FarmError(RuntimeError):
+    pass
+
+def segment_command(job, output_path, ass_path=None):
+    """ FFmpeg command a worker runs for one job message """
+    start = job["first"] * job["fps_den"] / job["fps_num"]
+    # Timestamps are moved back to source time for the subtitles, then restarted at 0 for the segment
+    filters = [f"setpts=PTS-STARTPTS+{start:.6f}/TB"]
+    if job.get("lut"):
+        filters.append(lut_ffmpeg_filter(job["lut"]))
+    if ass_path:
+        sub_arg = ass_path.replace("\\", "/").replace(":", "\\\\:")
+        filters.append(f"subtitles='{sub_arg}'")
+    filters.append("setpts=PTS-STARTPTS")
+    return [
+        "ffmpeg", "-y", "-nostdin",
+        "-ss", f"{start:.6f}", "-i", job["input"],
+        "-frames:v", str(job["frames"]), "-an",
+        "-vf", ",".join(filters),
+        "-c:v", "libx264", "-preset", job.get("preset", "medium"), "-crf", str(job.get("crf", 20)),
+        "-r", f"{job['fps_num']}/{job['fps_den']}",
+        output_path
+    ]
+
+# ------------------------------------------
+#  COORDINATOR
+# ------------------------------------------
+class _Connection:
+    __slots__ = ("box", "name", "sock", "address", "segments")
+
+    def __init__(self, box, sock, address):
+        self.box = box # Machine name: retries go to a different box, not just another slot
+        self.name = f"{box}#{address[1]}"
+        self.sock = sock
+        self.address = address
+        self.segments = 0
+
+class RenderFarm:
+    """
+    Coordinator: accepts worker agents and farms out exports.
+    Workers stay connected between exports; render() blocks until the
+    output is written (run it on a worker thread from the UI).
+    """
+    def __init__(self, host="0.0.0.0", port=DEFAULT_PORT, max_attempts=MAX_ATTEMPTS, heartbeat=HEARTBEAT):
+        self.host = host
+        self.port = port
+        self.max_attempts = max_attempts
+        self.heartbeat = heartbeat
+        self._server = None
+        self._cond = threading.Condition()
+        self._workers = []
+        self._closed = False
+        # Current export
+        self._job = None
+        self._pending = deque()
+        self._segments = []
+        self._done = 0
+        self._total = 0
+        self._error = None
+        self._workdir = None
+
+    # --- Connections ---
+    def start(self):
+        self._server = socket.create_server((self.host, self.port))
+        self.port = self._server.getsockname()[1] # port=0 picks a free one
+        threading.Thread(target=self._accept, daemon=True, name="farm-accept").start()
+        print(f"🖧 Render farm listening on {self.host}:{self.port}")
+        return self
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._server:
+            self._server.close()
+        for w in list(self._workers):
+            try:
+                w.sock.close()
+            except OSError:
+                pass
+
+    @property
+    def workers(self):
+        with self._cond:
+            return [w.name for w in self._workers]
+
+    def wait_for_workers(self, count, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while len(self._workers) < count:
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._cond.wait(left)
+        return True
+
+    def _accept(self):
+        while True:
+            try:
+                sock, address = self._server.accept()
+            except OSError:
+                return # Closed
+            threading.Thread(target=self._serve, args=(sock, address), daemon=True, name="farm-worker").start()
+
+    def _serve(self, sock, address):
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(self.heartbeat * 4)
+            hello, _ = _recv(sock)
+            if hello.get("type") != "hello":
+                raise ConnectionError("Expected hello")
+        except (OSError, ValueError) as e:
+            print(f"❌ Render farm: rejected {address[0]} ({e})")
+            sock.close()
+            return
+        conn = _Connection(hello.get("name") or address[0], sock, address)
+        with self._cond:
+            self._workers.append(conn)
+            self._cond.notify_all()
+        print(f"✅ Render farm: worker {conn.name} joined")
+        try:
+            while True:
+                segment = self._take(conn)
+                if segment is None:
+                    break
+                try:
+                    self._dispatch(conn, segment)
+                except (OSError, ValueError) as e: # Dropped, timed out or garbled: this box is out
+                    self._failed(segment, conn, f"connection lost ({e})")
+                    break
+        finally:
+            with self._cond:
+                self._workers.remove(conn)
+                self._cond.notify_all()
+            sock.close()
+            print(f"⚠️ Render farm: worker {conn.name} left after {conn.segments} segment(s)")
+
+    # --- Scheduling ---
+    def _take(self, conn):
+        """ Next range for this worker, preferring ranges that have not already failed on it """
+        with self._cond:
+            while not self._closed:
+                if self._job is not None and self._error is None and self._pending:
+                    for segment in self._pending:
+                        # A range that failed on this box waits for another one, unless all have failed it
+                        if conn.box not in segment.failed_on or \
+                                all(w.box in segment.failed_on for w in self._workers):
+                            self._pending.remove(segment)
+                            segment.attempts += 1
+                            segment.worker = conn.name
+                            segment.started = time.monotonic()
+                            return segment
+                self._cond.wait(1.0)
+            return None
+
+    def _dispatch(self, conn, segment):
+        job = dict(self._job, type="job", id=segment.index, first=segment.first, frames=segment.frames)
+        _send(conn.sock, job)
+        while True:
+            message, payload = _recv(conn.sock)
+            kind = message.get("type")
+            if kind == "progress":
+                continue
+            if message.get("id") != segment.index:
+                raise ValueError(f"Reply for range {message.get('id')}, expected {segment.index}")
+            if kind == "failed":
+                self._failed(segment, conn, message.get("error", "unknown error"))
+                return
+            if kind == "segment":
+                # A range that arrives after its export was abandoned is drained and dropped
+                current = segment in self._segments
+                path = os.path.join(self._workdir, f"segment_{segment.index:05d}.mp4") if current else os.devnull
+                _recv_file(conn.sock, payload, path)
+                conn.segments += 1
+                self._finished(segment, path)
+                return
+            raise ValueError(f"Unexpected message: {kind}")
+
+    def _finished(self, segment, path):
+        tracing.complete("farm.segment", segment.started, time.monotonic(), "export",
+                         worker=segment.worker, range=segment.index, frames=segment.frames)
+        with self._cond:
+            if segment not in self._segments:
+                return
+            segment.path = path
+            self._done += 1
+            self._cond.notify_all()
+
+    def _failed(self, segment, conn, error):
+        print(f"⚠️ Render farm: range {segment.index} failed on {conn.name}: {error}")
+        with self._cond:
+            if segment not in self._segments:
+                return
+            segment.failed_on.add(conn.box)
+            if segment.attempts >= self.max_attempts:
+                self._error = f"Range {segment.index} failed {segment.attempts} times; last error: {error}"
+            else:
+                self._pending.appendleft(segment) # Retried first, elsewhere
+            self._cond.notify_all()
+
+    # --- Export ---
+    def render(self, video_path, output_path, ass_path=None, lut_path=None, mixer=None,
+               segment_seconds=SEGMENT_SECONDS, preset="medium", crf=20, on_progress=None):
+        """
+        Farmed equivalent of render_engine.export_video_with_ffmpeg: encodes
+        the ranges on the workers, then joins them and adds the audio
+        locally. on_progress(done, total) is called from this thread.
+        Raises FarmError when a range runs out of attempts or no worker is left.
+        """
+        if self._server is None:
+            self.start()
+        fps = probe_fps(video_path)
+        total_frames = int(round(probe_duration(video_path) * fps.fps))
+        duration = total_frames / fps.fps # What the joined segments last
+        segments = [Segment(i, first, count) for i, (first, count)
+                    in enumerate(split_frames(total_frames, fps.fps, segment_seconds))]
+        ass_text = None
+        if ass_path:
+            with open(ass_path, "r", encoding="utf-8") as f:
+                ass_text = f.read()
+
+        self._workdir = tempfile.mkdtemp(prefix="kanha_farm_")
+        try:
+            with tracing.span("farm.render", "export", ranges=len(segments), frames=total_frames):
+                with self._cond:
+                    self._job = {"input": os.path.abspath(video_path), "fps_num": fps.num, "fps_den": fps.den,
+                                 "lut": os.path.abspath(lut_path) if lut_path else None,
+                                 "ass": ass_text, "preset": preset, "crf": crf}
+                    self._segments = segments
+                    self._pending = deque(segments)
+                    self._done, self._total, self._error = 0, len(segments), None
+                    self._cond.notify_all()
+                error = self._wait(on_progress)
+                if error:
+                    raise FarmError(error)
+                with tracing.span("farm.concat", "export", ranges=len(segments)):
+                    self._concat(segments, video_path, output_path, mixer, duration)
+        finally:
+            shutil.rmtree(self._workdir, ignore_errors=True)
+        return output_path
+
+    def _wait(self, on_progress):
+        """ Blocks until every range is in or the export failed; returns the error, if any """
+        reported, idle_since = -1, None
+        while True:
+            with self._cond:
+                self._cond.wait(1.0)
+                done, total, error = self._done, self._total, self._error
+                # Nobody connected (all boxes dropped) for a while: give up rather than hang
+                if self._workers:
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = time.monotonic()
+                elif time.monotonic() - idle_since > self.heartbeat * 12:
+                    error = self._error = "No render workers connected"
+                if error or done == total:
+                    self._job = None
+                    self._segments = []
+                    self._pending.clear()
+            if on_progress and done != reported:
+                on_progress(done, total)
+                reported = done
+            if error or done == total:
+                return error
+
+    def _concat(self, segments, video_path, output_path, mixer, duration):
+        """ Joins the segments (stream copy) and muxes the audio in one FFmpeg pass (a mix is streamed for `duration` s) """
+        list_path = os.path.join(self._workdir, "segments.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            for s in segments:
+                f.write(f"file '{os.path.basename(s.path)}'\n")
+        if mixer is not None:
+            audio_in = ffmpeg_input_args(mixer)
+            audio_out = ["-map", "1:a:0", "-c:a", "aac", "-b:a", "192k"]
+        else:
+            audio_in = ["-i", video_path]
+            audio_out = ["-map", "1:a:0?", "-c:a", "copy"]
+        cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_path, *audio_in,
+               "-map", "0:v:0", "-c:v", "copy", *audio_out, output_path]
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE if mixer is not None else subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   startupinfo=hidden_startupinfo())
+        if mixer is not None:
+            start_feed(process, mixer, duration)
+        log = process.stdout.read().decode("utf-8", "replace")
+        if process.wait() != 0:
+            raise FarmError(f"Joining segments failed: {log[-2000:]}")
+
+# ------------------------------------------
+#  WORKER AGENT
+# ------------------------------------------
+class RenderWorker:
+    """
+    Agent on a render box: connects to the coordinator and encodes the
+    ranges it is given, one at a time per connection. path_map rewrites
+    media paths for this machine: [("/mnt/media", "Z:/media")].
+    """
+    def __init__(self, host, port=DEFAULT_PORT, name=None, path_map=(), heartbeat=HEARTBEAT):
+        self.host = host
+        self.port = port
+        self.name = name or socket.gethostname()
+        self.path_map = list(path_map)
+        self.heartbeat = heartbeat
+
+    def _local(self, path):
+        for remote, local in self.path_map:
+            if path and path.startswith(remote):
+                return local + path[len(remote):]
+        return path
+
+    def run(self, retry=True):
+        """ Serves jobs until the coordinator closes; reconnects when `retry` """
+        while True:
+            try:
+                with socket.create_connection((self.host, self.port)) as sock:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    _send(sock, {"type": "hello", "name": self.name, "cores": os.cpu_count()})
+                    print(f"✅ Worker {self.name}: connected to {self.host}:{self.port}")
+                    while True:
+                        job, _ = _recv(sock)
+                        if job.get("type") == "job":
+                            self._encode(sock, job)
+            except (OSError, ValueError) as e:
+                if not retry:
+                    return
+                print(f"⚠️ Worker {self.name}: {e}; reconnecting")
+                time.sleep(self.heartbeat)
+
+    def _encode(self, sock, job):
+        workdir = tempfile.mkdtemp(prefix="kanha_worker_")
+        try:
+            job = dict(job, input=self._local(job["input"]), lut=self._local(job.get("lut")))
+            ass_path = None
+            if job.get("ass"):
+                ass_path = os.path.join(workdir, "subtitles.ass")
+                with open(ass_path, "w", encoding="utf-8") as f:
+                    f.write(job["ass"])
+            output = os.path.join(workdir, "segment.mp4")
+            log_path = os.path.join(workdir, "ffmpeg.log")
+            with open(log_path, "wb") as log:
+                process = subprocess.Popen(segment_command(job, output, ass_path), stdin=subprocess.DEVNULL,
+                                           stdout=log, stderr=subprocess.STDOUT,
+                                           startupinfo=hidden_startupinfo())
+                while True:
+                    try:
+                        code = process.wait(self.heartbeat)
+                        break
+                    except subprocess.TimeoutExpired:
+                        _send(sock, {"type": "progress", "id": job["id"]})
+            if code != 0 or not os.path.exists(output):
+                with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+                    _send(sock, {"type": "failed", "id": job["id"], "error": f.read()[-2000:].strip()})
+                return
+            size = os.path.getsize(output)
+            _send(sock, {"type": "segment", "id": job["id"]}, size)
+            with open(output, "rb") as f:
+                sock.sendfile(f)
+        except OSError as e:
+            if isinstance(e, (ConnectionError, socket.timeout)):
+                raise
+            _send(sock, {"type": "failed", "id": job["id"], "error": str(e)})
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def spawn_local_workers(count, port, host="127.0.0.1"):
+    """ `count` worker agent processes on this machine (testing, or one box with spare cores) """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return [subprocess.Popen([sys.executable, "-m", "core.render_farm", "worker",
+                              "--connect", f"{host}:{port}", "--name", f"local{i}", "--once"],
+                             cwd=root, startupinfo=hidden_startupinfo())
+            for i in range(count)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.render_farm")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="Run a worker agent on this machine")
+    worker.add_argument("--connect", required=True, help="Coordinator host[:port]")
+    worker.add_argument("--name", help="Shown in the coordinator's log (default: host name)")
+    worker.add_argument("--slots", type=int, default=1, help="Ranges encoded at once on this box")
+    worker.add_argument("--map", action="append", default=[], metavar="REMOTE=LOCAL",
+                        help="Rewrite a media path prefix for this machine")
+    worker.add_argument("--once", action="store_true", help="Exit when the coordinator goes away")
+    args = parser.parse_args(argv)
+
+    host, _, port = args.connect.partition(":")
+    path_map = [tuple(m.split("=", 1)) for m in args.map]
+    agents = [RenderWorker(host, int(port or DEFAULT_PORT), args.name, path_map) for _ in range(args.slots)]
+    threads = [threading.Thread(target=a.run, args=(not args.once,), daemon=True) for a in agents]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            t.join()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
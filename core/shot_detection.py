@@ -0,0 +1,230 @@
+# core/shot_detection.py
+"""
+Shot-boundary detection from tiny frames.
+
+Frames are decoded straight to 64x36 RGB at a few samples per second
+(Rust VideoFrameStream, or an FFmpeg pipe with an fps+scale filter), so
+the cost is the decoder itself and indexing runs far faster than real
+time. Each batch of frames is reduced to colour histograms and a luma
+thumbnail with array ops; cuts are samples whose histogram + luma change
+stands out from the local median, with flash and min-shot-length
+suppression. Results are cached per file like the PCM cache.
+"""
+import hashlib
+import os
+import subprocess
+import tempfile
+
+import numpy as np
+
+from core import tracing
+from core.audio_engine import RUST_AVAILABLE, kanha_core, hidden_startupinfo
+
+FRAME_W, FRAME_H = 64, 36
+SAMPLE_FPS = 6.0
+BATCH = 256
+HIST_BINS = 16
+
+# ------------------------------------------
+#  TINY FRAME DECODE
+# ------------------------------------------
+def _rust_batches(stream, w, h):
+    for raw, times in stream:
+        frames = np.frombuffer(raw, np.uint8).reshape(-1, h, w, 3)
+        yield frames, np.asarray(times, np.float64)
+
+def _ffmpeg_batches(proc, w, h, sample_fps, batch):
+    frame_bytes = w * h * 3
+    index = 0
+    try:
+        while True:
+            raw = proc.stdout.read(frame_bytes * batch)
+            n = len(raw) // frame_bytes
+            if n == 0:
+                break
+            frames = np.frombuffer(raw[:n * frame_bytes], np.uint8).reshape(n, h, w, 3)
+            yield frames, (index + np.arange(n)) / sample_fps
+            index += n
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+def open_frame_stream(path, width=FRAME_W, height=FRAME_H, sample_fps=SAMPLE_FPS, batch=BATCH):
+    """ Iterator of (frames uint8 [n, h, w, 3], times [n]) batches. Rust first, FFmpeg pipe fallback. """
+    if RUST_AVAILABLE and hasattr(kanha_core, "VideoFrameStream"):
+        try:
+            stream = kanha_core.VideoFrameStream(path, width, height, sample_fps, batch)
+            return _rust_batches(stream, width, height)
+        except Exception as e:
+            print(f"Rust frame stream failed ({e}), falling back to FFmpeg")
+
+    cmd = ["ffmpeg", "-v", "error",
+           "-skip_loop_filter", "all", "-flags2", "+fast", # Cheap decode: we only need 64x36
+           "-i", path, "-an", "-sn", "-dn",
+           "-vf", f"fps={sample_fps},scale={width}:{height}:flags=fast_bilinear",
+           "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            startupinfo=hidden_startupinfo())
+    return _ffmpeg_batches(proc, width, height, sample_fps, batch)
+
+# ------------------------------------------
+#  FEATURES (vectorised per batch)
+# ------------------------------------------
+def frame_features(frames):
+    """
+    Per frame: normalised RGB histograms (n, 3 * HIST_BINS) and a luma
+    thumbnail (n, h * w) in 0-1.
+    """
+    n = len(frames)
+    pixels = frames.reshape(n, -1, 3)
+    bins = (pixels >> (8 - int(np.log2(HIST_BINS)))).astype(np.int64)  # 0..HIST_BINS-1
+    offsets = (np.arange(n)[:, None, None] * 3 + np.arange(3)) * HIST_BINS
+    counts = np.bincount((bins + offsets).ravel(), minlength=n * 3 * HIST_BINS)
+    hist = counts.reshape(n, 3 * HIST_BINS).astype(np.float32) / pixels.shape[1]
+    luma = (pixels.astype(np.float32) @ np.array([0.299, 0.587, 0.114], np.float32)) / 255.0
+    return hist, luma
+
+def _hist_distance(a, b):
+    """ Total-variation distance averaged over the 3 channels: 0 same, 1 disjoint """
+    return np.abs(a - b).sum(axis=1) / 6.0
+
+class ShotIndex:
+    """ Shot boundaries (seconds) with confidence 0-1, plus the raw change score per sample """
+    def __init__(self, boundaries, confidence, times=None, scores=None, duration=0.0):
+        self.boundaries = np.asarray(boundaries, np.float64)
+        self.confidence = np.asarray(confidence, np.float32)
+        self.times = np.zeros(0) if times is None else np.asarray(times, np.float64)
+        self.scores = np.zeros(0, np.float32) if scores is None else np.asarray(scores, np.float32)
+        self.duration = duration
+
+    def __len__(self):
+        return len(self.boundaries)
+
+    def shots(self):
+        """ [(start, end)] of every shot """
+        edges = np.concatenate(([0.0], self.boundaries, [self.duration]))
+        return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, boundaries=self.boundaries, confidence=self.confidence,
+                     times=self.times, scores=self.scores, duration=np.float64(self.duration))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as d:
+            return cls(d["boundaries"], d["confidence"], d["times"], d["scores"], float(d["duration"]))
+
+class ShotDetector:
+    """
+    Streaming detector: feed() batches of tiny frames, finish() -> ShotIndex.
+    threshold: minimum change score for a cut; sensitivity: how far above
+    the local median (over `window` samples) a score must be, so handheld
+    or fast-motion stretches do not turn into strings of cuts.
+    """
+    def __init__(self, threshold=0.35, sensitivity=2.5, window=12, min_shot=0.5, flash_ratio=0.5):
+        self.threshold = threshold
+        self.sensitivity = sensitivity
+        self.window = window
+        self.min_shot = min_shot
+        self.flash_ratio = flash_ratio
+        self._hist, self._luma_diff, self._times = [], [], []
+        self._last_luma = None # Only one luma thumbnail is kept between batches
+
+    def feed(self, frames, times):
+        hist, luma = frame_features(frames)
+        if self._last_luma is not None:
+            luma = np.concatenate((self._last_luma[None], luma))
+        self._luma_diff.append(np.abs(luma[1:] - luma[:-1]).mean(axis=1))
+        self._last_luma = luma[-1]
+        self._hist.append(hist)
+        self._times.append(np.asarray(times, np.float64))
+
+    def finish(self, duration=None):
+        if not self._times:
+            return ShotIndex([], [], duration=duration or 0.0)
+        hist = np.concatenate(self._hist)
+        luma_diff = np.concatenate(self._luma_diff)
+        times = np.concatenate(self._times)
+        duration = duration or (float(times[-1]) if len(times) else 0.0)
+        if len(times) < 2:
+            return ShotIndex([], [], times, np.zeros(len(times)), duration)
+
+        # Change between consecutive samples: colour distribution + structure
+        h_diff = _hist_distance(hist[1:], hist[:-1])
+        l_diff = np.minimum(1.0, luma_diff * 4.0)
+        score = np.concatenate(([0.0], 0.6 * h_diff + 0.4 * l_diff)).astype(np.float32)
+
+        # Flashes: sample i differs from i-1 but i+1 looks like i-1 again
+        # (the flash itself), or i looks like i-2 (the return from it)
+        ahead = np.ones(len(score), np.float32)
+        ahead[1:-1] = _hist_distance(hist[2:], hist[:-2])
+        back = np.ones(len(score), np.float32)
+        back[2:] = ahead[1:-1]
+        flash = (ahead < score * self.flash_ratio) | (back < score * self.flash_ratio)
+
+        # Adaptive threshold from the local median (sliding window, edge padded)
+        half = self.window // 2
+        padded = np.pad(score, half, mode="edge")
+        local = np.median(np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1), axis=1)
+        limit = np.maximum(self.threshold, local * self.sensitivity)
+        candidates = np.flatnonzero((score > limit) & ~flash)
+
+        # Non-maximum suppression: strongest cut wins inside min_shot
+        keep = []
+        for i in candidates[np.argsort(-score[candidates], kind="stable")]:
+            if all(abs(times[i] - times[j]) >= self.min_shot for j in keep):
+                keep.append(i)
+        keep = np.sort(np.asarray(keep, np.int64))
+
+        confidence = np.clip((score[keep] - limit[keep]) / np.maximum(1.0 - limit[keep], 1e-6) * 0.5 + 0.5, 0, 1)
+        return ShotIndex(times[keep], confidence, times, score, duration)
+
+def detect_shots(path, sample_fps=SAMPLE_FPS, width=FRAME_W, height=FRAME_H, **options):
+    """ Full pass over `path` -> ShotIndex (uncached, see ShotCache) """
+    detector = ShotDetector(**options)
+    with tracing.span("shots.detect", "video", path=path) as sp:
+        samples = 0
+        for frames, times in open_frame_stream(path, width, height, sample_fps):
+            detector.feed(frames, times)
+            samples += len(frames)
+        index = detector.finish()
+        sp.set(samples=samples, shots=len(index) + 1)
+    return index
+
+# ------------------------------------------
+#  CACHE
+# ------------------------------------------
+class ShotCache:
+    """ Shot indexes on disk, keyed by file identity + detector settings """
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "kanha_shot_cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, media_path, options):
+        st = os.stat(media_path)
+        settings = ",".join(f"{k}={options[k]}" for k in sorted(options))
+        raw = f"{os.path.abspath(media_path)}|{st.st_size}|{st.st_mtime_ns}|{settings}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, media_path, **options):
+        """ Cached ShotIndex for `media_path`, detected on first use """
+        path = os.path.join(self.cache_dir, f"{self.key(media_path, options)}.shots.npz")
+        if os.path.exists(path):
+            try:
+                return ShotIndex.load(path)
+            except (OSError, ValueError, KeyError):
+                pass # Corrupt entry: detect again
+        index = detect_shots(media_path, **options)
+        tmp = path + ".tmp"
+        index.save(tmp)
+        os.replace(tmp, path)
+        return index
+
+_default_cache = None
+
+def get_shot_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ShotCache()
+    return _default_cache
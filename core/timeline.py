@@ -0,0 +1,336 @@
+# core/timeline.py
+import io
+import json
+
+import numpy as np
+
+class Clip:
+    """ Compact clip record handed out by Track queries (a copy, not a live view) """
+    __slots__ = ("clip_id", "source_id", "in_point", "out_point", "start", "effects")
+
+    def __init__(self, clip_id, source_id, in_point, out_point, start, effects=None):
+        self.clip_id = clip_id
+        self.source_id = source_id
+        self.in_point = in_point    # Seconds into the source media
+        self.out_point = out_point
+        self.start = start          # Seconds on the sequence
+        self.effects = effects or []
+
+    @property
+    def duration(self):
+        return self.out_point - self.in_point
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+    def __repr__(self):
+        return f"Clip({self.clip_id}, src={self.source_id}, {self.start:.3f}-{self.end:.3f})"
+
+# Column layout of a track (one NumPy array each, sorted by start)
+_COLUMNS = (("ids", np.int64), ("sources", np.int32), ("ins", np.float64),
+            ("outs", np.float64), ("starts", np.float64))
+
+class Track:
+    """
+    One timeline track stored as parallel NumPy columns sorted by start.
+
+    Interval index: `ends` plus its running maximum. Every clip before
+    searchsorted(end_max, t) has already ended by t, and every clip after
+    searchsorted(starts, t) has not begun, so "active at t" and "visible
+    in [t0, t1)" are two binary searches plus a scan of the candidates
+    between them (the result itself on tracks without overlaps).
+    Ripple edits are one vectorised add on the start column (plus a stable
+    re-sort when a negative shift carries clips past earlier ones).
+    """
+    def __init__(self, name, kind="video"):
+        self.name = name
+        self.kind = kind
+        for col, dtype in _COLUMNS:
+            setattr(self, col, np.zeros(0, dtype))
+        self.effects = {} # clip_id -> list, only for clips that have any
+        self._index = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- Index ---
+    @property
+    def ends(self):
+        return self._build_index()[0]
+
+    def _build_index(self):
+        if self._index is None:
+            ends = self.starts + (self.outs - self.ins)
+            end_max = np.maximum.accumulate(ends) if len(ends) else ends
+            self._index = (ends, end_max)
+        return self._index
+
+    def _invalidate(self):
+        self._index = None
+
+    def _position(self, clip_id):
+        pos = np.flatnonzero(self.ids == clip_id)
+        if not len(pos):
+            raise KeyError(f"No clip {clip_id} on track {self.name}")
+        return int(pos[0])
+
+    def _range(self, t0, t1):
+        """ Candidate slice [lo, hi) for clips overlapping [t0, t1) """
+        ends, end_max = self._build_index()
+        lo = int(np.searchsorted(end_max, t0, side="right"))
+        hi = int(np.searchsorted(self.starts, t1, side="left"))
+        return lo, hi, ends
+
+    # --- Queries ---
+    def record(self, pos):
+        clip_id = int(self.ids[pos])
+        return Clip(clip_id, int(self.sources[pos]), float(self.ins[pos]), float(self.outs[pos]),
+                    float(self.starts[pos]), self.effects.get(clip_id))
+
+    def indices_in(self, t0, t1):
+        """ Row indices of clips overlapping [t0, t1) (for renderers that read columns) """
+        lo, hi, ends = self._range(t0, t1)
+        if hi <= lo:
+            return np.zeros(0, np.int64)
+        return lo + np.flatnonzero(ends[lo:hi] > t0)
+
+    def clips_in(self, t0, t1):
+        return [self.record(i) for i in self.indices_in(t0, t1)]
+
+    def clips_at(self, t):
+        lo, hi, ends = self._range(t, np.nextafter(t, np.inf))
+        return [self.record(lo + i) for i in np.flatnonzero(ends[lo:hi] > t)]
+
+    def clip_at(self, t):
+        """ Clip under the cursor (latest-starting one if clips overlap) """
+        hits = self.indices_in(t, np.nextafter(t, np.inf))
+        return self.record(int(hits[-1])) if len(hits) else None
+
+    # --- Edits ---
+    def insert(self, clip_id, source_id, in_point, out_point, start, effects=None):
+        pos = int(np.searchsorted(self.starts, start, side="right"))
+        for col, value in zip((c for c, _ in _COLUMNS), (clip_id, source_id, in_point, out_point, start)):
+            setattr(self, col, np.insert(getattr(self, col), pos, value))
+        if effects:
+            self.effects[clip_id] = effects
+        self._invalidate()
+
+    def remove(self, clip_id):
+        pos = self._position(clip_id)
+        removed = self.record(pos)
+        for col, _ in _COLUMNS:
+            setattr(self, col, np.delete(getattr(self, col), pos))
+        self.effects.pop(clip_id, None)
+        self._invalidate()
+        return removed
+
+    def move(self, clip_id, start):
+        clip = self.remove(clip_id)
+        self.insert(clip.clip_id, clip.source_id, clip.in_point, clip.out_point, start, clip.effects)
+
+    def rippled_ids(self, at):
+        """ Ids of the clips a ripple at `at` shifts (those starting at/after it) """
+        pos = int(np.searchsorted(self.starts, at, side="left"))
+        return [int(i) for i in self.ids[pos:]]
+
+    def ripple(self, at, delta):
+        """ Shifts every clip starting at/after `at` by `delta` (one vectorised add) """
+        pos = int(np.searchsorted(self.starts, at, side="left"))
+        if pos < len(self.starts):
+            self.starts[pos:] += delta
+            self._resort()
+
+    def shift(self, clip_ids, delta):
+        """ Shifts exactly the given clips by `delta` (how ripples are undone) """
+        mask = np.isin(self.ids, np.asarray(clip_ids, np.int64))
+        if mask.any():
+            self.starts[mask] += delta
+            self._resort()
+
+    def _resort(self):
+        """ Restores start order after a shift carried clips past others (stable: ties keep their order) """
+        if len(self.starts) > 1 and (self.starts[1:] < self.starts[:-1]).any():
+            order = np.argsort(self.starts, kind="stable")
+            for col, _ in _COLUMNS:
+                setattr(self, col, getattr(self, col)[order])
+        self._invalidate()
+
+    def roll(self, clip_id, edit_point):
+        """
+        Moves the cut between `clip_id` and the clip right after it:
+        the left clip's out and the right clip's in/start move together.
+        The right clip's start must stay before its own end (caller checks).
+        """
+        pos = self._position(clip_id)
+        old_end = self.starts[pos] + self.outs[pos] - self.ins[pos]
+        delta = edit_point - old_end
+        self.outs[pos] += delta
+        # Only an adjacent neighbour shares the cut; across a gap this is a plain trim
+        if pos + 1 < len(self.ids) and abs(self.starts[pos + 1] - old_end) < 1e-9:
+            self.ins[pos + 1] += delta
+            self.starts[pos + 1] += delta
+        self._invalidate()
+
+    def bulk_load(self, ids, sources, ins, outs, starts):
+        """ Replaces all clips at once (one argsort instead of N inserts) """
+        order = np.argsort(np.asarray(starts, np.float64), kind="stable")
+        for (col, dtype), values in zip(_COLUMNS, (ids, sources, ins, outs, starts)):
+            setattr(self, col, np.asarray(values, dtype)[order])
+        self._invalidate()
+
+class Sequence:
+    """
+    Multi-track timeline (V1-V3 / A1-A3 by default).
+    Edit methods take only JSON-able arguments so they can travel as
+    project deltas ({"op": "tl", "method": ..., "args": [...]}), which
+    gives journaling and undo for free (see inverse()).
+    """
+    DEFAULT_TRACKS = (("V1", "video"), ("V2", "video"), ("V3", "video"),
+                      ("A1", "audio"), ("A2", "audio"), ("A3", "audio"))
+
+    def __init__(self, tracks=DEFAULT_TRACKS):
+        self.tracks = [Track(name, kind) for name, kind in tracks]
+        self.sources = []  # source_id -> media path
+        self.next_id = 1
+
+    def track(self, name_or_index):
+        if isinstance(name_or_index, int):
+            return self.tracks[name_or_index]
+        for t in self.tracks:
+            if t.name == name_or_index:
+                return t
+        raise KeyError(f"No track {name_or_index}")
+
+    def source_id(self, path):
+        """ Registers a media path, returns its id """
+        if path not in self.sources:
+            self.sources.append(path)
+        return self.sources.index(path)
+
+    def add_source(self, path):
+        """ Journaled form of source_id() (sources are never unregistered) """
+        self.source_id(path)
+
+    def new_clip_id(self):
+        clip_id = self.next_id
+        self.next_id += 1
+        return clip_id
+
+    @property
+    def duration(self):
+        ends = [float(t.ends.max()) for t in self.tracks if len(t)]
+        return max(ends) if ends else 0.0
+
+    # --- Queries across tracks ---
+    def clips_at(self, t):
+        return {track.name: track.clips_at(t) for track in self.tracks}
+
+    def clips_in(self, t0, t1):
+        return {track.name: track.clips_in(t0, t1) for track in self.tracks}
+
+    # --- Edits (JSON-able args) ---
+    def add_clip(self, track, clip_id, source_id, in_point, out_point, start, effects=None):
+        self.track(track).insert(clip_id, source_id, in_point, out_point, start, effects)
+        self.next_id = max(self.next_id, clip_id + 1)
+
+    def remove_clip(self, track, clip_id):
+        self.track(track).remove(clip_id)
+
+    def move_clip(self, track, clip_id, start):
+        self.track(track).move(clip_id, start)
+
+    def roll(self, track, clip_id, edit_point):
+        self.track(track).roll(clip_id, edit_point)
+
+    def _ripple_tracks(self, tracks):
+        return self.tracks if tracks is None else [self.track(n) for n in tracks]
+
+    def rippled_ids(self, at, tracks=None):
+        """ {track name: clip ids} a ripple at `at` would shift """
+        return {t.name: t.rippled_ids(at) for t in self._ripple_tracks(tracks)}
+
+    def ripple(self, at, delta, tracks=None):
+        """ Sync-locked ripple: shifts everything after `at` on all (or the given) tracks """
+        for t in self._ripple_tracks(tracks):
+            t.ripple(at, delta)
+
+    def shift_clips(self, shifted, delta):
+        """ Shifts the clips listed in {track name: clip ids} by `delta` """
+        for name, clip_ids in shifted.items():
+            self.track(name).shift(clip_ids, delta)
+
+    def ripple_delete(self, track, clip_id, tracks=None):
+        """ Removes a clip and closes the gap it leaves """
+        clip = self.track(track).remove(clip_id)
+        self.ripple(clip.end, -clip.duration, tracks)
+
+    def inverse(self, method, args):
+        """ Delta args that undo `method(*args)`, computed BEFORE it runs """
+        if method == "add_source":
+            return "add_source", list(args) # Registration stays, nothing to undo
+        if method == "add_clip":
+            return "remove_clip", [args[0], args[1]]
+        if method in ("remove_clip", "ripple_delete"):
+            track, clip_id = args[0], args[1]
+            c = self.track(track).record(self.track(track)._position(clip_id))
+            add = [track, c.clip_id, c.source_id, c.in_point, c.out_point, c.start, c.effects]
+            if method == "remove_clip":
+                return "add_clip", add
+            tracks = args[2] if len(args) > 2 else None
+            # The clip itself starts before its end, so it is never in the shifted set
+            return "unripple_insert", add + [tracks, self.rippled_ids(c.end, tracks)]
+        if method == "move_clip":
+            track, clip_id = args[0], args[1]
+            t = self.track(track)
+            return "move_clip", [track, clip_id, float(t.starts[t._position(clip_id)])]
+        if method == "roll":
+            track, clip_id = args[0], args[1]
+            t = self.track(track)
+            return "roll", [track, clip_id, float(t.ends[t._position(clip_id)])]
+        if method == "ripple":
+            # Undo by clip ids, not by time: a negative ripple can land clips before `at`
+            return "shift_clips", [self.rippled_ids(args[0], args[2] if len(args) > 2 else None), -args[1]]
+        if method == "shift_clips":
+            return "shift_clips", [args[0], -args[1]]
+        if method == "unripple_insert":
+            return "ripple_delete", [args[0], args[1], args[7]]
+        raise ValueError(f"Cannot invert timeline edit: {method}")
+
+    def unripple_insert(self, track, clip_id, source_id, in_point, out_point, start, effects,
+                        tracks=None, shifted=None):
+        """
+        Inverse of ripple_delete: moves the clips it shifted (`shifted`,
+        {track name: clip ids}) back, then puts the clip back. Without
+        `shifted` (older journals) the gap is reopened by a ripple at `start`.
+        """
+        if shifted is None:
+            self.ripple(start, out_point - in_point, tracks)
+        else:
+            self.shift_clips(shifted, out_point - in_point)
+        self.add_clip(track, clip_id, source_id, in_point, out_point, start, effects)
+
+    # --- Persistence (project file section) ---
+    def to_bytes(self):
+        arrays = {}
+        meta = {"sources": self.sources, "next_id": self.next_id, "tracks": []}
+        for i, t in enumerate(self.tracks):
+            meta["tracks"].append({"name": t.name, "kind": t.kind,
+                                   "effects": {str(k): v for k, v in t.effects.items()}})
+            for col, _ in _COLUMNS:
+                arrays[f"{i}_{col}"] = getattr(t, col)
+        buf = io.BytesIO()
+        np.savez(buf, meta=np.array(json.dumps(meta)), **arrays)
+        return buf.getvalue()
+
+    @classmethod
+    def from_bytes(cls, raw):
+        data = np.load(io.BytesIO(raw))
+        meta = json.loads(str(data["meta"]))
+        seq = cls([(t["name"], t["kind"]) for t in meta["tracks"]])
+        seq.sources = meta["sources"]
+        seq.next_id = meta["next_id"]
+        for i, (t, info) in enumerate(zip(seq.tracks, meta["tracks"])):
+            t.bulk_load(*(data[f"{i}_{col}"] for col, _ in _COLUMNS))
+            t.effects = {int(k): v for k, v in info["effects"].items()}
+        return seq
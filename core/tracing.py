@@ -0,0 +1,191 @@
+# core/tracing.py
+"""
+Lightweight instrumentation: spans, counters and instant events from the
+workers, exports and UI, exported as Chrome trace-event JSON (open in
+chrome://tracing or ui.perfetto.dev).
+
+Disabled by default (enable() or KANHA_TRACE=1). While disabled, span()
+hands back one shared no-op context manager and counter()/instant()
+return on their first line, so instrumented code pays one call.
+Hot loops can also check `tracing.ENABLED` before timing anything.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+ENABLED = os.environ.get("KANHA_TRACE", "") not in ("", "0")
+MAX_EVENTS = 1_000_000 # Oldest events are dropped past this
+SERIES_LEN = 600       # Points kept per live series (Performance dock)
+
+_lock = threading.Lock()
+_events = deque(maxlen=MAX_EVENTS)
+_series = {}           # name -> deque of (seconds, value) for live graphs
+_thread_names = {}     # tid -> name
+_t0 = time.perf_counter()
+_pid = os.getpid()
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = bool(on)
+
+def is_enabled():
+    return ENABLED
+
+def clear():
+    with _lock:
+        _events.clear()
+        _series.clear()
+
+def _now_us():
+    return (time.perf_counter() - _t0) * 1e6
+
+def _tid():
+    tid = threading.get_ident()
+    if tid not in _thread_names:
+        _thread_names[tid] = threading.current_thread().name
+    return tid
+
+def _record(event, series_name=None, value=None):
+    with _lock:
+        _events.append(event)
+        if series_name is not None:
+            points = _series.get(series_name)
+            if points is None:
+                points = _series[series_name] = deque(maxlen=SERIES_LEN)
+            points.append((event["ts"] / 1e6, value))
+
+# ------------------------------------------
+#  SPANS
+# ------------------------------------------
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+class Span:
+    """ Complete ("X") event; its duration also feeds the live series `name` (ms) """
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, *exc):
+        end = _now_us()
+        event = {"name": self.name, "cat": self.cat, "ph": "X", "ts": self.start,
+                 "dur": end - self.start, "pid": _pid, "tid": _tid()}
+        if self.args:
+            event["args"] = self.args
+        _record(event, self.name, (end - self.start) / 1000.0)
+        return False
+
+    def set(self, **args):
+        """ Attach results known only at the end (frame counts, sizes...) """
+        self.args.update(args)
+
+def span(name, cat="app", **args):
+    """ with tracing.span("decode", path=p): ... """
+    if not ENABLED:
+        return NULL_SPAN
+    return Span(name, cat, args)
+
+def traced(name=None, cat="app"):
+    """ Decorator form of span() """
+    def wrap(fn):
+        label = name or fn.__qualname__
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with Span(label, cat, {}):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def complete(name, start_s, end_s, cat="app", **args):
+    """ Records a span measured by the caller (perf_counter seconds) """
+    if not ENABLED:
+        return
+    ts = (start_s - _t0) * 1e6
+    dur = (end_s - start_s) * 1e6
+    event = {"name": name, "cat": cat, "ph": "X", "ts": ts, "dur": dur, "pid": _pid, "tid": _tid()}
+    if args:
+        event["args"] = args
+    _record(event, name, dur / 1000.0)
+
+# ------------------------------------------
+#  COUNTERS / INSTANTS
+# ------------------------------------------
+def counter(name, value, cat="app"):
+    """ Queue depths, fps, cache sizes: one graph per name """
+    if not ENABLED:
+        return
+    _record({"name": name, "cat": cat, "ph": "C", "ts": _now_us(), "pid": _pid,
+             "tid": _tid(), "args": {"value": value}}, name, value)
+
+def instant(name, cat="app", **args):
+    if not ENABLED:
+        return
+    _record({"name": name, "cat": cat, "ph": "i", "s": "t", "ts": _now_us(), "pid": _pid,
+             "tid": _tid(), "args": args})
+
+def trace_process(process, name, cat="export", frames=None):
+    """
+    Records an export subprocess as one span from now until it exits, plus
+    its average fps when the frame count is known. Waits on a daemon thread,
+    never touches the process pipes.
+    """
+    if not ENABLED:
+        return
+    start = time.perf_counter()
+
+    def wait():
+        code = process.wait()
+        end = time.perf_counter()
+        args = {"returncode": code}
+        if frames:
+            args["fps"] = frames / max(end - start, 1e-9)
+            counter(f"{name}.fps", round(args["fps"], 2), cat)
+        complete(name, start, end, cat, **args)
+    threading.Thread(target=wait, daemon=True, name=f"trace:{name}").start()
+
+# ------------------------------------------
+#  READ / EXPORT
+# ------------------------------------------
+def series():
+    """ {name: [(seconds, value)]} snapshot for live graphs """
+    with _lock:
+        return {name: list(points) for name, points in _series.items()}
+
+def event_count():
+    return len(_events)
+
+def events():
+    with _lock:
+        return list(_events)
+
+def export_chrome_trace(path):
+    """ Writes the Chrome trace-event JSON; returns the number of events """
+    evs = events()
+    meta = [{"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid, "args": {"name": tname}}
+            for tid, tname in list(_thread_names.items())]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": meta + evs, "displayTimeUnit": "ms"}, f)
+    return len(evs)
@@ -0,0 +1,234 @@
+# core/transitions.py
+"""
+A -> B video transitions on RGB frame buffers (uint8, height x width x 3).
+
+Everything is whole-frame array work, no per-pixel Python:
+  * Dissolve: integer blend, out = (A * (256 - a) + B * a) >> 8, in
+    uint16 scratch buffers.
+  * Iris, Wipe: a cached matte per progress step (row spans where B is
+    fully in, copied as slices, plus the soft-edge pixels, blended with
+    the same integer formula).
+  * Slide: two slice copies.
+  * Zoom: B scaled by cached row/column gathers over A.
+  * Page Peel: B where the page has lifted, plus the folded-back flap
+    (shaded paper) over the flat part, both as cached row spans.
+Progress is quantised to STEPS levels; mattes, gathers and distance fields
+are cached per (resolution, step, options) in a byte-bounded LRU, so a
+transition that is previewed again costs only the blend. Output goes into
+one buffer owned by the renderer (the returned frame is reused).
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from core import tracing
+
+STEPS = 120                      # Progress levels (1 s at 120 fps, 4 s at 30 fps)
+FEATHER = 0.02                   # Soft edge of iris/wipe masks (fraction of the travel)
+CACHE_BYTES = 256 * 1024 * 1024  # Masks + gathers kept across frames
+TRANSITIONS = ("Dissolve", "Iris", "Page Peel", "Slide", "Zoom", "Wipe")
+
+def _spans(full):
+    """ (rows, x0, x1) of the one True run in every row that has one """
+    rows = np.flatnonzero(full.any(axis=1))
+    hit = full[rows]
+    x0 = np.argmax(hit, axis=1)
+    x1 = full.shape[1] - np.argmax(hit[:, ::-1], axis=1)
+    return rows.astype(np.int32), x0.astype(np.int32), x1.astype(np.int32)
+
+class TransitionRenderer:
+    """ Renders transitions at one resolution into a reusable output frame """
+    def __init__(self, width, height, steps=STEPS, cache_bytes=CACHE_BYTES):
+        self.width = width
+        self.height = height
+        self.steps = steps
+        self.cache_bytes = cache_bytes
+        self.out = np.empty((height, width, 3), np.uint8)
+        self._acc = np.empty((height, width, 3), np.uint16)  # Blend accumulators
+        self._tmp = np.empty((height, width, 3), np.uint16)
+        self._cache = OrderedDict() # key -> arrays, LRU
+        self._cached_bytes = 0
+        self._fields = {}           # Distance fields, one per shape (small, never evicted)
+
+    # --- Cache ---
+    def step(self, progress):
+        return int(round(min(1.0, max(0.0, progress)) * (self.steps - 1)))
+
+    def _cached(self, key, build):
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+            return value
+        value = build()
+        size = sum(a.nbytes for a in value) if isinstance(value, tuple) else value.nbytes
+        self._cache[key] = value
+        self._cached_bytes += size
+        while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            _, old = self._cache.popitem(last=False)
+            self._cached_bytes -= sum(a.nbytes for a in old) if isinstance(old, tuple) else old.nbytes
+        return value
+
+    def clear_cache(self):
+        self._cache.clear()
+        self._cached_bytes = 0
+
+    def _field(self, shape):
+        """ 0-1 distance of every pixel from where the shape starts (float32, h x w) """
+        field = self._fields.get(shape)
+        if field is None:
+            h, w = self.height, self.width
+            y = (np.arange(h, dtype=np.float32) + 0.5)[:, None] / h
+            x = (np.arange(w, dtype=np.float32) + 0.5)[None, :] / w
+            if shape == "iris":
+                # Aspect-correct circle, 1 at the corners
+                dx, dy = (x - 0.5) * w, (y - 0.5) * h
+                field = np.sqrt(dx * dx + dy * dy) / np.hypot(w / 2, h / 2)
+            elif shape == "left":   # Wipe towards the right edge
+                field = np.broadcast_to(x, (h, w))
+            elif shape == "right":
+                field = np.broadcast_to(1.0 - x, (h, w))
+            elif shape == "up":
+                field = np.broadcast_to(1.0 - y, (h, w))
+            elif shape == "down":
+                field = np.broadcast_to(y, (h, w))
+            else:
+                raise ValueError(f"Unknown mask shape: {shape}")
+            field = self._fields[shape] = np.ascontiguousarray(field, np.float32)
+        return field
+
+    def matte(self, shape, progress, feather=FEATHER):
+        """
+        Cached matte of a mask shape at one progress step: per-row spans
+        where B fully shows (rows, x0, x1) plus the soft-edge pixels (flat
+        indices, alpha 1-255 of 256). The shapes are convex, so one span per row.
+        """
+        step = self.step(progress)
+
+        def build():
+            front = step / (self.steps - 1) * (1.0 + feather)
+            alpha = np.rint(np.clip((front - self._field(shape)) / feather, 0.0, 1.0) * 256).astype(np.uint16)
+            rows, x0, x1 = _spans(alpha == 256)
+            band = np.flatnonzero((alpha > 0) & (alpha < 256))
+            return rows, x0, x1, band, alpha.ravel()[band][:, None]
+        return self._cached(("matte", shape, step, feather), build)
+
+    # --- Blending ---
+    def blend(self, a, b, alpha):
+        """ out = (a * (256 - alpha) + b * alpha) >> 8 for a constant alpha 0-256 """
+        acc, tmp = self._acc, self._tmp
+        np.multiply(a, np.uint16(256 - alpha), out=acc)
+        np.multiply(b, np.uint16(alpha), out=tmp)
+        acc += tmp
+        acc >>= 8
+        np.copyto(self.out, acc, casting="unsafe")
+        return self.out
+
+    def composite(self, a, b, matte):
+        """ A, with B copied over the matte's spans and blended on its soft edge """
+        rows, x0, x1, band, alpha = matte
+        out = self.out
+        np.copyto(out, a)
+        for y, s, e in zip(rows.tolist(), x0.tolist(), x1.tolist()):
+            out[y, s:e] = b[y, s:e]
+        if len(band):
+            flat_a, flat_b = a.reshape(-1, 3)[band], b.reshape(-1, 3)[band]
+            mixed = flat_a * (256 - alpha)
+            mixed += flat_b * alpha
+            mixed >>= 8
+            out.reshape(-1, 3)[band] = mixed
+        return out
+
+    # --- Transitions ---
+    def dissolve(self, a, b, progress):
+        return self.blend(a, b, int(round(self.step(progress) * 256 / (self.steps - 1))))
+
+    def iris(self, a, b, progress, feather=FEATHER):
+        return self.composite(a, b, self.matte("iris", progress, feather))
+
+    def wipe(self, a, b, progress, direction="left", feather=FEATHER):
+        return self.composite(a, b, self.matte(direction, progress, feather))
+
+    def slide(self, a, b, progress, direction="left"):
+        """ B slides in from `direction` over a still A """
+        h, w = self.height, self.width
+        out = self.out
+        if direction in ("left", "right"):
+            n = int(round(self.step(progress) * w / (self.steps - 1)))
+            if direction == "left":
+                out[:, :n] = b[:, w - n:]
+                out[:, n:] = a[:, n:]
+            else:
+                out[:, w - n:] = b[:, :n]
+                out[:, :w - n] = a[:, :w - n]
+        else:
+            n = int(round(self.step(progress) * h / (self.steps - 1)))
+            if direction == "up":
+                out[:n] = b[h - n:]
+                out[n:] = a[n:]
+            else:
+                out[h - n:] = b[:n]
+                out[:h - n] = a[:h - n]
+        return out
+
+    def zoom(self, a, b, progress):
+        """ B grows from the centre over A """
+        step = self.step(progress)
+        h, w = self.height, self.width
+
+        def build():
+            scale = max(step / (self.steps - 1), 1e-6)
+            bh, bw = int(round(h * scale)), int(round(w * scale))
+            y0, x0 = (h - bh) // 2, (w - bw) // 2
+            rows = np.minimum(((np.arange(bh) + 0.5) / scale).astype(np.intp), h - 1)
+            cols = np.minimum(((np.arange(bw) + 0.5) / scale).astype(np.intp), w - 1)
+            return np.array([y0, x0]), rows, cols
+        (y0, x0), rows, cols = self._cached(("zoom", step), build)
+        out = self.out
+        np.copyto(out, a)
+        out[y0:y0 + len(rows), x0:x0 + len(cols)] = b[rows[:, None], cols[None, :]]
+        return out
+
+    def page_peel(self, a, b, progress):
+        """
+        A peels off from the bottom-right corner along the diagonal: B shows
+        where the page has lifted, and the folded-back flap (the paper's
+        back, shaded darker towards the fold) lies over the still-flat part.
+        """
+        step = self.step(progress)
+        h, w = self.height, self.width
+
+        def build():
+            fold = 1.0 - step / (self.steps - 1)  # Fold line u + v = 2 * fold, u=x/w, v=y/h
+            v = (np.arange(h, dtype=np.float32) + 0.5)[:, None] / h
+            u = (np.arange(w, dtype=np.float32) + 0.5)[None, :] / w
+            depth = 2 * fold - (u + v)            # > 0 on the flat side, distance from the fold
+            lifted = depth < 0
+            # The flap is the lifted page reflected across the fold: it lands where u, v >= 2 * fold - 1
+            flap = ~lifted & (u >= 2 * fold - 1) & (v >= 2 * fold - 1)
+            paper = np.clip(150 + 400 * depth, 150, 235).astype(np.uint8)[:, :, None]
+            return _spans(lifted) + _spans(flap) + (paper,)
+        rows, x0, x1, f_rows, f_x0, f_x1, paper = self._cached(("peel", step), build)
+
+        out = self.out
+        np.copyto(out, a)
+        for y, s, e in zip(rows.tolist(), x0.tolist(), x1.tolist()):
+            out[y, s:e] = b[y, s:e]
+        for y, s, e in zip(f_rows.tolist(), f_x0.tolist(), f_x1.tolist()):
+            out[y, s:e] = paper[y, s:e]
+        return out
+
+    def render(self, name, a, b, progress, **options):
+        """ Transition by its Effects panel name; a and b are (h, w, 3) uint8 frames """
+        method = {"Dissolve": self.dissolve, "Iris": self.iris, "Page Peel": self.page_peel,
+                  "Slide": self.slide, "Zoom": self.zoom, "Wipe": self.wipe}.get(name)
+        if method is None:
+            raise ValueError(f"Unknown transition: {name}")
+        if tracing.ENABLED:
+            with tracing.span("transition.render", "video", name=name):
+                return method(a, b, progress, **options)
+        return method(a, b, progress, **options)
+
+def render_transition(name, a, b, progress, **options):
+    """ One-off render (builds a renderer; keep a TransitionRenderer for sequences of frames) """
+    h, w = a.shape[:2]
+    return TransitionRenderer(w, h).render(name, a, b, progress, **options).copy()
@@ -0,0 +1,204 @@
+# core/undo.py
+import sys
+import time
+from collections import deque
+
+def estimate_size(obj):
+    """ Rough byte size of a delta payload (dicts, lists, strings, numbers) """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(estimate_size(v) for v in obj)
+    return size
+
+class Command:
+    """
+    One undoable edit. Subclasses implement redo()/undo().
+    Commands with the same non-None `merge_key` pushed within the
+    stack's coalesce window are merged into one history entry.
+    """
+    merge_key = None
+
+    def redo(self):
+        raise NotImplementedError
+
+    def undo(self):
+        raise NotImplementedError
+
+    def merge(self, other):
+        """ Absorb a newer command of the same kind. Return True if merged. """
+        return False
+
+    @property
+    def size(self):
+        return sys.getsizeof(self)
+
+# ------------------------------------------
+#  PROJECT STATE COMMANDS
+# ------------------------------------------
+def invert_delta(state, delta):
+    """ Builds the delta that undoes `delta`, from the state BEFORE it is applied """
+    op = delta["op"]
+    if op == "set":
+        return {"op": "set", "key": delta["key"], "value": getattr(state, delta["key"])}
+    if op == "sub_set":
+        return {"op": "sub_set", "i": delta["i"], "value": state.subtitles[delta["i"]]}
+    if op == "sub_insert":
+        return {"op": "sub_delete", "i": delta["i"]}
+    if op == "sub_delete":
+        return {"op": "sub_insert", "i": delta["i"], "value": state.subtitles[delta["i"]]}
+    if op == "tl":
+        method, args = state.sequence.inverse(delta["method"], delta["args"])
+        return {"op": "tl", "method": method, "args": args}
+    raise ValueError(f"Cannot invert project delta: {op}")
+
+class DeltaCommand(Command):
+    """
+    Edit on ProjectState stored as forward + inverse deltas, never a
+    snapshot, so memory and undo/redo cost are O(size of change).
+    Goes through ProjectState.apply(), so undo/redo are journaled too.
+    """
+    def __init__(self, state, delta, text="", merge_key=None):
+        self.state = state
+        self.forward = delta
+        self.inverse = invert_delta(state, delta)
+        self.text = text
+        self.merge_key = merge_key
+        self._size = self._measure()
+
+    def _measure(self):
+        return sys.getsizeof(self) + estimate_size(self.forward) + estimate_size(self.inverse)
+
+    def redo(self):
+        self.state.apply(self.forward)
+
+    def undo(self):
+        self.state.apply(self.inverse)
+
+    def merge(self, other):
+        if not isinstance(other, DeltaCommand) or other.merge_key != self.merge_key:
+            return False
+        # Keep our original inverse, take the newest forward value
+        self.forward = other.forward
+        self._size = self._measure()
+        return True
+
+    @property
+    def size(self):
+        return self._size
+
+class MacroCommand(Command):
+    """ Several commands undone/redone as one entry (e.g. bulk caption edits) """
+    def __init__(self, commands, text=""):
+        self.commands = list(commands)
+        self.text = text
+
+    def redo(self):
+        for c in self.commands:
+            c.redo()
+
+    def undo(self):
+        for c in reversed(self.commands):
+            c.undo()
+
+    @property
+    def size(self):
+        return sys.getsizeof(self) + sum(c.size for c in self.commands)
+
+# ------------------------------------------
+#  STACK
+# ------------------------------------------
+class UndoStack:
+    """
+    Undo/redo history capped by memory, not entry count: once the
+    estimated size passes `budget_bytes`, the oldest entries are dropped.
+    Rapid edits with the same merge key (slider drags) are coalesced
+    while they arrive within `coalesce_window` seconds of each other and
+    no end_merge() call separates them.
+    """
+    def __init__(self, budget_bytes=32 * 1024 * 1024, coalesce_window=0.5):
+        self.budget_bytes = budget_bytes
+        self.coalesce_window = coalesce_window
+        self._undo = deque()  # Oldest on the left, evicted first
+        self._redo = []
+        self._bytes = 0
+        self._last_push = 0.0
+        self._merge_open = False
+        self.listeners = []   # Called with no args after every change
+
+    def push(self, command, done=False):
+        """ Runs `command` (unless `done`) and records it """
+        if not done:
+            command.redo()
+        self._redo.clear()
+        now = time.monotonic()
+
+        top = self._undo[-1] if self._undo else None
+        if (top is not None and self._merge_open and command.merge_key is not None
+                and now - self._last_push <= self.coalesce_window):
+            old = top.size
+            if top.merge(command):
+                self._bytes += top.size - old
+                self._last_push = now
+                self._notify()
+                return
+
+        self._undo.append(command)
+        self._bytes += command.size
+        self._last_push = now
+        self._merge_open = command.merge_key is not None
+        self._evict()
+        self._notify()
+
+    def end_merge(self):
+        """ Closes the current coalescing run (call on slider release) """
+        self._merge_open = False
+
+    def undo(self):
+        if not self._undo:
+            return False
+        command = self._undo.pop()
+        self._bytes -= command.size
+        command.undo()
+        self._redo.append(command)
+        self._merge_open = False
+        self._notify()
+        return True
+
+    def redo(self):
+        if not self._redo:
+            return False
+        command = self._redo.pop()
+        command.redo()
+        self._undo.append(command)
+        self._bytes += command.size
+        self._evict()
+        self._notify()
+        return True
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._bytes = 0
+        self._merge_open = False
+        self._notify()
+
+    @property
+    def memory_used(self):
+        return self._bytes + sum(c.size for c in self._redo)
+
+    def _evict(self):
+        # Always keep the newest entry, however large
+        while self._bytes > self.budget_bytes and len(self._undo) > 1:
+            self._bytes -= self._undo.popleft().size
+
+    def _notify(self):
+        for callback in self.listeners:
+            callback()
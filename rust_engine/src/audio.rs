@@ -1,4 +1,5 @@
 use pyo3::prelude::*;
+use pyo3::types::PyBytes;
 use crate::internal::{AudioReader, AudioResult};
 use symphonia::core::audio::{SampleBuffer, Signal}; // Signal trait is important
 use symphonia::core::errors::Error as SymphoniaError;
@@ -149,9 +150,10 @@ impl AudioClip {
         let mut intervals = Vec::new();
         
         let mut active = false;
-        let mut start_t = 0.0;
-        let mut curr_t = 0.0;
-        let step = 1.0 / self.sample_rate as f64;
+        let mut start_idx: u64 = 0;
+        let mut curr_idx: u64 = 0;
+        // Timestamps come from the frame counter, not an accumulated float step (no drift)
+        let sr = self.sample_rate.max(1) as f64;
 
         loop {
             let packet = match reader.format.next_packet() { Ok(p) => p, Err(_) => break };
@@ -169,19 +171,91 @@ impl AudioClip {
                     let val = sum / stride as f32;
 
                     if val > floor {
-                        if !active { active = true; start_t = curr_t; }
+                        if !active { active = true; start_idx = curr_idx; }
                     } else {
                         // Deactivate
                         if active {
-                             if curr_t - start_t > min_dur { intervals.push((start_t, curr_t)); }
+                             let (start_t, end_t) = (start_idx as f64 / sr, curr_idx as f64 / sr);
+                             if end_t - start_t > min_dur { intervals.push((start_t, end_t)); }
                              active = false;
                         }
                     }
-                    curr_t += step;
+                    curr_idx += 1;
                 }
             }
         }
-        if active && (curr_t - start_t > min_dur) { intervals.push((start_t, curr_t)); }
+        if active {
+            let (start_t, end_t) = (start_idx as f64 / sr, curr_idx as f64 / sr);
+            if end_t - start_t > min_dur { intervals.push((start_t, end_t)); }
+        }
         Ok(intervals)
     }
+}
+
+/// PCM STREAM
+/// Decodes the file lazily and yields interleaved little-endian f32 blocks
+/// (`block_frames` frames each, the last one may be shorter).
+/// Python analysers iterate over it, so memory stays O(block) for any file length.
+#[pyclass(unsendable)]
+pub struct AudioStream {
+    reader: AudioReader,
+    block_frames: usize,
+    pending: Vec<f32>,
+    finished: bool,
+    #[pyo3(get)]
+    sample_rate: u32,
+    #[pyo3(get)]
+    channels: u32,
+}
+
+#[pymethods]
+impl AudioStream {
+    #[new]
+    #[pyo3(signature = (path, block_frames=65536))]
+    pub fn new(path: String, block_frames: usize) -> PyResult<Self> {
+        let reader = AudioReader::new(&path)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+        let sample_rate = reader.sample_rate;
+        let channels = reader.channels.max(1);
+        Ok(AudioStream {
+            reader,
+            block_frames: block_frames.max(1),
+            pending: Vec::new(),
+            finished: false,
+            sample_rate,
+            channels,
+        })
+    }
+
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> { slf }
+
+    fn __next__(&mut self, py: Python<'_>) -> PyResult<Option<Py<PyBytes>>> {
+        let want = self.block_frames * self.channels as usize;
+
+        while !self.finished && self.pending.len() < want {
+            let packet = match self.reader.format.next_packet() {
+                Ok(p) => p,
+                Err(_) => { self.finished = true; break; }
+            };
+            if packet.track_id() != self.reader.track_id { continue; }
+            if let Ok(decoded) = self.reader.decoder.decode(&packet) {
+                let spec = *decoded.spec();
+                let cap = decoded.capacity() as u64;
+                let mut buf = SampleBuffer::<f32>::new(cap, spec);
+                buf.copy_interleaved_ref(decoded);
+                self.pending.extend_from_slice(buf.samples());
+            }
+        }
+
+        if self.pending.is_empty() { return Ok(None); }
+
+        // Only hand out whole frames
+        let stride = self.channels as usize;
+        let n = want.min(self.pending.len() / stride * stride);
+        if n == 0 { self.pending.clear(); return Ok(None); }
+
+        let mut bytes = Vec::with_capacity(n * 4);
+        for s in self.pending.drain(..n) { bytes.extend_from_slice(&s.to_le_bytes()); }
+        Ok(Some(PyBytes::new_bound(py, &bytes).into()))
+    }
 }
\ No newline at end of file
@@ -8,7 +8,9 @@ mod effects; // <--- Register Effects
 #[pymodule]
 fn kanha_core(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<audio::AudioClip>()?;
+    m.add_class::<audio::AudioStream>()?;
     m.add_class::<video::VideoClip>()?;
+    m.add_class::<video::VideoFrameStream>()?;
     m.add_class::<export::VideoExporter>()?;
     m.add_class::<effects::ImageProcessor>()?; // <--- Add Class
     Ok(())
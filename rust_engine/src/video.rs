@@ -206,4 +206,125 @@ impl VideoClip {
         }
         Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>("EOF/No Frame"))
     }
-}
\ No newline at end of file
+}
+/// FEATURE: ANALYSIS STREAM
+/// Sequential decode of tiny RGB24 frames sampled at `sample_fps`, for shot
+/// detection. Iterating yields (bytes, times): up to `batch` frames of
+/// width*height*3 bytes each, so Python never sees a full-size frame.
+#[pyclass(unsendable)]
+pub struct VideoFrameStream {
+    ictx: ffmpeg::format::context::Input,
+    decoder: ffmpeg::codec::decoder::Video,
+    scaler: Context,
+    stream_idx: usize,
+    time_base: f64,
+    interval: f64,
+    next_t: f64,
+    batch: usize,
+    eof_sent: bool,
+    finished: bool,
+    #[pyo3(get)]
+    width: u32,
+    #[pyo3(get)]
+    height: u32,
+    #[pyo3(get)]
+    fps: f64,
+    #[pyo3(get)]
+    duration: f64,
+}
+
+#[pymethods]
+impl VideoFrameStream {
+    #[new]
+    #[pyo3(signature = (path, width=64, height=36, sample_fps=6.0, batch=256))]
+    fn new(path: String, width: u32, height: u32, sample_fps: f64, batch: usize) -> PyResult<Self> {
+        ffmpeg::init().ok();
+        let ictx = input(&path).map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+
+        let (stream_idx, time_base, fps, duration, parameters) = {
+            let stream = ictx.streams().best(Type::Video).ok_or_else(|| {
+                PyErr::new::<pyo3::exceptions::PyRuntimeError, _>("No video stream found")
+            })?;
+            let time_base = f64::from(stream.time_base());
+            let ticks = stream.duration();
+            (stream.index(), time_base, f64::from(stream.avg_frame_rate()),
+             if ticks > 0 { ticks as f64 * time_base } else { 0.0 }, stream.parameters())
+        };
+
+        let mut context = ffmpeg::codec::context::Context::from_parameters(parameters)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
+        // Decoding is the whole cost here, so let FFmpeg use every core
+        context.set_threading(ffmpeg::threading::Config::kind(ffmpeg::threading::Type::Frame));
+        let decoder = context.decoder().video()
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
+
+        let scaler = Context::get(
+            decoder.format(), decoder.width(), decoder.height(),
+            Pixel::RGB24, width, height, Flags::FAST_BILINEAR
+        ).map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
+
+        Ok(VideoFrameStream {
+            ictx,
+            decoder,
+            scaler,
+            stream_idx,
+            time_base,
+            interval: if sample_fps > 0.0 { 1.0 / sample_fps } else { 0.0 },
+            next_t: f64::NEG_INFINITY,
+            batch: batch.max(1),
+            eof_sent: false,
+            finished: false,
+            width,
+            height,
+            fps: if fps > 0.0 { fps } else { 30.0 }, // Fallback
+            duration,
+        })
+    }
+
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> { slf }
+
+    fn __next__(&mut self, py: Python<'_>) -> PyResult<Option<(Py<PyBytes>, Vec<f64>)>> {
+        let row = self.width as usize * 3;
+        let mut buf: Vec<u8> = Vec::with_capacity(row * self.height as usize * self.batch);
+        let mut times: Vec<f64> = Vec::with_capacity(self.batch);
+        let mut decoded = Video::empty();
+        let mut rgb = Video::empty();
+
+        while times.len() < self.batch && !self.finished {
+            // Drain what the decoder already has (frames left over from the last batch too)
+            while times.len() < self.batch && self.decoder.receive_frame(&mut decoded).is_ok() {
+                let pts = decoded.timestamp().or(decoded.pts()).unwrap_or(0);
+                let t = pts as f64 * self.time_base;
+                // Frame skipping: only frames on the sample grid are scaled
+                if t + 1e-6 < self.next_t { continue; }
+                self.next_t = if self.next_t.is_finite() { self.next_t + self.interval } else { t + self.interval };
+                if self.next_t <= t { self.next_t = t + self.interval; } // Jumped a gap
+                if self.scaler.run(&decoded, &mut rgb).is_err() { continue; }
+
+                let data = rgb.data(0);
+                let stride = rgb.stride(0);
+                for y in 0..self.height as usize {
+                    let i = y * stride;
+                    if i + row <= data.len() { buf.extend_from_slice(&data[i..i + row]); }
+                    else { buf.extend(std::iter::repeat(0u8).take(row)); }
+                }
+                times.push(t);
+            }
+            if times.len() >= self.batch { break; }
+            if self.eof_sent { self.finished = true; break; }
+
+            match self.ictx.packets().next() {
+                Some((s, packet)) => {
+                    if s.index() == self.stream_idx { self.decoder.send_packet(&packet).ok(); }
+                }
+                None => {
+                    self.decoder.send_eof().ok();
+                    self.eof_sent = true;
+                }
+            }
+        }
+
+        if times.is_empty() { return Ok(None); }
+        Ok(Some((PyBytes::new_bound(py, &buf).into(), times)))
+    }
+}
@@ -0,0 +1,16 @@
+# Packs utils/assets/*.png into utils/assets/assets.kab (one file read at startup)
+# Run from the repo root after adding or changing icons:  python tools/build_assets.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.asset_loader import ASSET_DIR, BUNDLE_PATH, build_bundle
+
+def main():
+    names = build_bundle()
+    size = os.path.getsize(BUNDLE_PATH)
+    print(f"✅ Packed {len(names)} images from {ASSET_DIR} into {BUNDLE_PATH} ({size / 1024:.1f} KB)")
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,15 @@ import vlc # type: ignore
 from PySide6.QtWidgets import (QMainWindow, QDockWidget, QLabel, QWidget, 
                                QFileDialog, QApplication, QMessageBox)
 from PySide6.QtCore import Qt, QTimer, QSettings
+from PySide6.QtGui import QKeySequence
+
+from core import tracing
+from core.project import ProjectState
+from core.project_file import Autosaver, open_project
+from core.undo import DeltaCommand, MacroCommand, UndoStack
+from utils.asset_loader import AssetLoader
+from utils.time_utils import ms_to_timestamp
+from utils.timebase import DEFAULT_RATE, FrameRate
 
 # Import ALL your widgets
 from .styles import ADOBE_STYLESHEET
@@ -13,6 +22,8 @@ from .widgets.timeline import Timeline  # (The one with Rust Waveforms)
 from .widgets.tools import ToolStrip
 from .widgets.effects_panel import EffectsPanel
 from .widgets.properties_panel import PropertiesPanel
+from .widgets.performance_panel import PerformancePanel
+from .timeline import SyncWorker
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -24,9 +35,18 @@ class MainWindow(QMainWindow):
         # Persistent Settings (Layout Memory)
         self.settings = QSettings("KanhaStudios", "KanhaEditor")
 
+        # One bundle read + one report of missing icons, before any widget asks for them
+        AssetLoader.check_assets()
+
+        # Project Data (media, subtitles, analysis) + background autosave
+        self.project = ProjectState()
+        self.autosaver = None
+        self.undo_stack = UndoStack()
+
         # --- VLC ENGINE ---
         self.vlc_inst = vlc.Instance()
         self.player = self.vlc_inst.media_player_new()
+        self.frame_rate = DEFAULT_RATE # Replaced by the media's rate once VLC reports it
         
         # Playback Timer (50ms updates)
         self.timer = QTimer(self)
@@ -44,7 +64,9 @@ class MainWindow(QMainWindow):
         
         # 2. Instantiate All Panels
         self.create_docks()
-        
+        # The timeline shows the project's sequence from the start, not only after Open Project
+        self.timeline_widget.set_sequence(self.project.sequence)
+
         # 3. Build The Menu Bar
         self.create_menus()
         
@@ -95,6 +117,12 @@ class MainWindow(QMainWindow):
         self.monitor_widget = ProgramMonitor()
         self.dock_program = self.wrap_in_dock("Program Monitor", self.monitor_widget, "Program")
 
+        # H. Performance (optional, hidden until opened from the Window menu)
+        self.perf_widget = PerformancePanel()
+        self.dock_perf = self.wrap_in_dock("Performance", self.perf_widget, "Performance")
+        self.addDockWidget(Qt.RightDockWidgetArea, self.dock_perf)
+        self.dock_perf.hide()
+
     def wrap_in_dock(self, title, widget, obj_name):
         dock = QDockWidget(title, self)
         dock.setWidget(widget)
@@ -109,6 +137,9 @@ class MainWindow(QMainWindow):
         
         # FILE
         file = bar.addMenu("File")
+        file.addAction("Open Project...", self.open_project_file)
+        file.addAction("Save Project As...", self.save_project_as)
+        file.addSeparator()
         file.addAction("Import Media...", self.import_file)
         file.addSeparator()
         file.addAction("Save Workspace", self.save_layout_state)
@@ -116,8 +147,15 @@ class MainWindow(QMainWindow):
         
         # EDIT
         edit = bar.addMenu("Edit")
-        edit.addAction("Undo")
-        edit.addAction("Redo")
+        self.act_undo = edit.addAction("Undo", self.undo_stack.undo)
+        self.act_undo.setShortcut(QKeySequence.Undo)
+        self.act_redo = edit.addAction("Redo", self.undo_stack.redo)
+        self.act_redo.setShortcut(QKeySequence.Redo)
+        self.undo_stack.listeners.append(self.on_history_changed)
+        self.undo_stack.listeners.append(self.timeline_widget.view.update)
+        self.on_history_changed()
+        edit.addSeparator()
+        edit.addAction("Synchronize Clips by Audio", self.sync_clips_by_audio)
         edit.addSeparator()
         edit.addAction("Preferences")
 
@@ -155,7 +193,7 @@ class MainWindow(QMainWindow):
         self.tabifyDockWidget(self.dock_source, self.dock_props)
         
         # Ensure everything is visible
-        for dock in self.docks_list.values(): dock.setVisible(True)
+        for dock in self.docks_list.values(): dock.setVisible(dock is not self.dock_perf)
         self.dock_project.raise_() # Bring Bin to front
         self.dock_source.raise_()  # Bring Source to front
 
@@ -186,9 +224,39 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, e):
         self.player.stop()
+        self.monitor_widget.preview.stop()
         self.save_layout_state()
+        if self.autosaver: self.autosaver.stop()
         super().closeEvent(e)
 
+    # ------------------------------------------
+    #  PROJECT FILES
+    # ------------------------------------------
+    def open_project_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Project", "", "Kanha Project (*.kproj)")
+        if not path: return
+        if self.autosaver: self.autosaver.stop()
+
+        # Only header + index are read here; heavy sections load on demand
+        self.project = open_project(path)
+        self.autosaver = Autosaver(self.project, path)
+        self.undo_stack.clear()
+        self.props_widget.set_values(self.project.motion, self.project.font_settings)
+        self.timeline_widget.set_sequence(self.project.sequence)
+        self.monitor_widget.captions.set_project(self.project)
+        self.bin_widget.clear()
+        for media in self.project.media:
+            self.bin_widget.add_item(os.path.basename(media), "Video", media)
+        if self.project.video_path:
+            self.load_media(self.project.video_path)
+
+    def save_project_as(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Project", "", "Kanha Project (*.kproj)")
+        if not path: return
+        if self.autosaver: self.autosaver.stop()
+        # Writes the full project once, then only journals edits
+        self.autosaver = Autosaver(self.project, path)
+
     # ------------------------------------------
     #  CORE LOGIC (Loading, Playing, Updating)
     # ------------------------------------------
@@ -200,12 +268,46 @@ class MainWindow(QMainWindow):
         self.monitor_widget.btn_play.clicked.connect(self.toggle_play)
         self.monitor_widget.slider.sliderPressed.connect(self.pause_user_seek)
         self.monitor_widget.slider.sliderReleased.connect(self.perform_seek)
+        self.timeline_widget.view.playheadMoved.connect(self.seek_to_time)
+
+        # 3. Effect Controls -> undoable project edits (a drag = one undo step)
+        for key, slider in self.props_widget.motion_sliders.items():
+            slider.valueChanged.connect(lambda v, k=key: self.edit_project_dict("motion", k, v))
+            slider.valueChanged.connect(self.preview_motion)
+            slider.sliderReleased.connect(self.undo_stack.end_merge)
+            slider.sliderReleased.connect(self.preview_motion)
+        self.props_widget.font_size.valueChanged.connect(
+            lambda v: self.edit_project_dict("font_settings", "size", v))
+        self.props_widget.font_face.currentFontChanged.connect(
+            lambda f: self.edit_project_dict("font_settings", "font", f.family()))
+
+        # 4. Caption preview over the Program Monitor
+        self.monitor_widget.captions.set_project(self.project)
+
+    # ------------------------------------------
+    #  UNDO / REDO
+    # ------------------------------------------
+    def edit_project_dict(self, field, key, value):
+        """ Undoable change of one entry in a project dict (motion, font_settings) """
+        current = getattr(self.project, field)
+        if current.get(key) == value: return
+        delta = {"op": "set", "key": field, "value": {**current, key: value}}
+        self.undo_stack.push(DeltaCommand(self.project, delta, f"Change {key}", merge_key=(field, key)))
+
+    def on_history_changed(self):
+        self.act_undo.setEnabled(self.undo_stack.can_undo())
+        self.act_redo.setEnabled(self.undo_stack.can_redo())
+        self.props_widget.set_values(self.project.motion, self.project.font_settings)
+        self.monitor_widget.captions.refresh()
+        if self.monitor_widget.preview.active: # Undo/redo while previewing
+            self.preview_motion()
 
     def import_file(self):
         path, _ = QFileDialog.getOpenFileName(self, "Import Video", "", "Video (*.mp4 *.mov *.mkv *.avi)")
         if path:
             filename = os.path.basename(path)
             self.bin_widget.add_item(filename, "Video", path)
+            self.project.set_field("media", self.project.media + [path])
             # Auto-Load
             self.load_media(path)
 
@@ -216,6 +318,9 @@ class MainWindow(QMainWindow):
     def load_media(self, path):
         # Reset Logic
         self.player.stop()
+        self.monitor_widget.preview.hide_preview()
+        if path != self.project.video_path:
+            self.project.set_field("video_path", path)
         
         # Load VLC Media
         media = self.vlc_inst.media_new(path)
@@ -236,10 +341,77 @@ class MainWindow(QMainWindow):
         # This sends the file path to the Timeline widget, 
         # which starts the background Rust thread.
         self.timeline_widget.load_waveform(path)
+        self.timeline_widget.load_filmstrip(path)
+        self.timeline_widget.load_shots(path)
+        self.timeline_widget.worker.analysed.connect(lambda results: self.on_analysis_ready(path, results))
+
+    def on_analysis_ready(self, path, results):
+        self.project.set_field("analysis", results)
+
+        # First import of this file: lay it on V1/A1 at the end of the sequence
+        seq = self.project.sequence
+        if path in seq.sources: return
+        duration = results.get("stats", {}).get("duration", 0.0)
+        if duration <= 0: return
+        start = seq.duration
+        self.project.edit_timeline("add_source", path)
+        sid = seq.source_id(path)
+        commands = [DeltaCommand(self.project, {"op": "tl", "method": "add_clip",
+                                                "args": [name, seq.new_clip_id(), sid, 0.0, duration, start, None]})
+                    for name in ("V1", "A1")]
+        self.undo_stack.push(MacroCommand(commands, "Add clip"))
+        self.timeline_widget.view.update()
+
+    # --- AUDIO SYNC ---
+    def sync_clips_by_audio(self):
+        """ Selected bin clips (or the whole bin) -> synced stack at the end of the sequence """
+        selected = [item.data(0, Qt.UserRole) for item in self.bin_widget.selectedItems()]
+        paths = [p for p in (selected if len(selected) > 1 else self.project.media) if p]
+        if len(paths) < 2:
+            QMessageBox.information(self, "Synchronize Clips", "Import at least two clips that share audio.")
+            return
+        print(f"🔊 Syncing {len(paths)} clips by audio...")
+        self.sync_worker = SyncWorker(paths)
+        self.sync_worker.finished.connect(self.place_synced_clips)
+        self.sync_worker.start()
+
+    def place_synced_clips(self, results):
+        synced = [r for r in results if r.offset is not None and r.duration > 0]
+        for r in results:
+            if r.offset is None:
+                print(f"⚠️ No audio match for {os.path.basename(r.path)}")
+        if len(synced) < 2: return
+
+        # One clip per track pair (V1/A1, V2/A2...), all relative to the earliest start
+        seq = self.project.sequence
+        video = [t.name for t in seq.tracks if t.kind == "video"]
+        audio = [t.name for t in seq.tracks if t.kind == "audio"]
+        base = seq.duration - min(r.offset for r in synced)
+        commands = []
+        for i, r in enumerate(synced):
+            self.project.edit_timeline("add_source", r.path)
+            sid = seq.source_id(r.path)
+            for names in (video, audio):
+                commands.append(DeltaCommand(self.project, {"op": "tl", "method": "add_clip",
+                    "args": [names[min(i, len(names) - 1)], seq.new_clip_id(), sid, 0.0, r.duration, base + r.offset, None]}))
+            print(f"🔊 {os.path.basename(r.path)}: {r.offset:+.4f}s (confidence {r.confidence:.2f})")
+        self.undo_stack.push(MacroCommand(commands, "Sync clips"))
+        self.timeline_widget.view.update()
+
+    # --- MOTION PREVIEW ---
+    def preview_motion(self, *_):
+        """ Current frame with the Motion values: quarter-res while a slider is held, then full res """
+        if not self.project.video_path: return
+        if self.player.is_playing(): self.player.pause()
+        dragging = any(s.isSliderDown() for s in self.props_widget.motion_sliders.values())
+        self.monitor_widget.preview.request(self.project.video_path, max(0, self.player.get_time()) / 1000.0,
+                                            self.project.motion, refine=not dragging)
 
     def toggle_play(self):
         if self.player.is_playing(): self.player.pause()
-        else: self.player.play()
+        else:
+            self.monitor_widget.preview.hide_preview()
+            self.player.play()
 
     def pause_user_seek(self):
         """ Pause video when dragging slider so it doesn't stutter """
@@ -248,9 +420,22 @@ class MainWindow(QMainWindow):
     def perform_seek(self):
         pos = self.monitor_widget.slider.value()
         target = pos / 1000.0
+        self.monitor_widget.preview.hide_preview()
         self.player.set_position(target)
         self.player.play()
+        self.monitor_widget.captions.set_time(target * self.player.get_length() / 1000.0)
+
+    def seek_to_time(self, seconds):
+        """ Timeline click: moves the player there, keeping play/pause as it is """
+        length = self.player.get_length()
+        if length <= 0: return
+        ms = min(int(seconds * 1000), length)
+        self.monitor_widget.preview.hide_preview()
+        self.player.set_time(ms)
+        self.monitor_widget.slider.setValue(int(ms * 1000 / length))
+        self.monitor_widget.captions.set_time(ms / 1000.0)
 
+    @tracing.traced("player.tick", "ui")
     def update_ui_from_player(self):
         """ Called every 50ms to sync UI with Video State """
         if self.player.is_playing() and not self.monitor_widget.slider.isSliderDown():
@@ -258,12 +443,12 @@ class MainWindow(QMainWindow):
             pos = self.player.get_position()
             self.monitor_widget.slider.setValue(int(pos * 1000))
             
-            # Update Timecode
+            # Update Timecode (frames counted at the media's real rate)
             ms = self.player.get_time()
-            seconds = max(0, ms // 1000)
-            m, s = divmod(seconds, 60)
-            # Simple Frame fake logic (assuming 30fps)
-            f = int((ms % 1000) / 33.33)
-            
-            time_str = f"{m:02}:{s:02}:{f:02}"
-            self.monitor_widget.lbl_time.setText(time_str)
\ No newline at end of file
+            fps = self.player.get_fps()
+            if fps and fps > 0:
+                self.frame_rate = FrameRate.from_any(fps)
+            self.monitor_widget.lbl_time.setText(ms_to_timestamp(ms, self.frame_rate))
+            self.timeline_widget.view.set_playhead(max(0, ms) / 1000.0)
+            self.monitor_widget.captions.set_video_size(*(self.player.video_get_size(0) or (0, 0)))
+            self.monitor_widget.captions.set_time(max(0, ms) / 1000.0)
\ No newline at end of file
@@ -1,38 +1,77 @@
 from PySide6.QtWidgets import QFrame, QVBoxLayout, QLabel, QSizePolicy
 from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtGui import QPainter, QColor, QBrush, QPen
-import sys
 
-# Try to import our custom Rust engine
-try:
-    import kanha_core # type: ignore
-    RUST_AVAILABLE = True
-except ImportError:
-    RUST_AVAILABLE = False
-    print("⚠️ Kanha Core (Rust) not found. Waveforms disabled.")
+from core import tracing
+from core.audio_analysis import analyze_audio
+from core.audio_sync import sync_clips
+from core.shot_detection import get_shot_cache
 
 # --- WORKER THREAD (Keep GUI Smooth) ---
 class WaveformWorker(QThread):
+    """
+    Decodes the file ONCE and runs every import-time analysis on that pass
+    (waveform pyramid, speech intervals, level stats).
+    """
     finished = Signal(list)
+    analysed = Signal(dict)
 
-    def __init__(self, file_path, width):
+    def __init__(self, file_path, width, analyses=("waveform", "speech", "stats")):
         super().__init__()
         self.path = file_path
         self.width = width
+        self.analyses = analyses
 
     def run(self):
-        if not RUST_AVAILABLE:
+        try:
+            with tracing.span("waveform_worker", "worker", path=self.path):
+                results = analyze_audio(self.path, self.analyses)
+        except Exception as e:
+            print(f"Audio Analysis Error: {e}")
             self.finished.emit([])
             return
 
+        self.analysed.emit(results)
+        pyramid = results.get("waveform")
+        self.finished.emit(pyramid.resample(self.width) if pyramid else [])
+
+class ShotWorker(QThread):
+    """ Builds (or loads the cached) shot-boundary index of a video file """
+    finished = Signal(object) # ShotIndex
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.path = file_path
+
+    def run(self):
+        try:
+            with tracing.span("shot_worker", "worker", path=self.path):
+                index = get_shot_cache().get(self.path)
+        except Exception as e:
+            print(f"Shot Detection Error: {e}")
+            return
+        if len(index):
+            print(f"🎬 {len(index) + 1} shots found in {self.path}")
+        self.finished.emit(index)
+
+class SyncWorker(QThread):
+    """ Audio-syncs a batch of clips (every pair in a process pool) """
+    finished = Signal(list) # [SyncResult]
+
+    def __init__(self, paths, reference=None):
+        super().__init__()
+        self.paths = paths
+        self.reference = reference
+
+    def run(self):
         try:
-            # CALLING RUST HERE
-            # This is 100x faster than reading samples in Python
-            data = kanha_core.get_waveform(self.path, self.width)
-            self.finished.emit(data)
+            with tracing.span("sync_worker", "worker", clips=len(self.paths)):
+                results = sync_clips(self.paths, self.reference)
         except Exception as e:
-            print(f"Rust Error: {e}")
+            print(f"Audio Sync Error: {e}")
             self.finished.emit([])
+            return
+        self.finished.emit(results)
 
 # --- THE WIDGET ---
 class Timeline(QFrame):
@@ -41,6 +80,7 @@ class Timeline(QFrame):
         # Visual styling for the background
         self.setStyleSheet("background-color: #1e1e1e; border-top: 1px solid #333;")
         self.waveform_data = []
+        self.analysis = {} # Results of the import-time audio pass
         self.duration = 0
         
         # Placeholder Label
@@ -60,8 +100,12 @@ class Timeline(QFrame):
         
         self.worker = WaveformWorker(file_path, width)
         self.worker.finished.connect(self.on_waveform_ready)
+        self.worker.analysed.connect(self.on_analysis_ready)
         self.worker.start()
 
+    def on_analysis_ready(self, results):
+        self.analysis = results
+
     def on_waveform_ready(self, data):
         self.waveform_data = data
         if self.waveform_data:
@@ -0,0 +1,219 @@
+# ui/widgets/caption_overlay.py
+from collections import OrderedDict
+
+import numpy as np
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt, QEvent, QPoint, QPointF, QRect, QSize
+from PySide6.QtGui import QPainter, QColor, QFont, QFontMetricsF, QImage, QPainterPath, QPen
+
+from core import tracing
+
+# Same script geometry as render_engine.generate_ass_file
+PLAY_RES = (1920, 1080)
+OUTLINE = 2         # Style Outline, script pixels (black, like the ASS default OutlineColour)
+CACHE_LINES = 256   # Rendered caption images kept (LRU)
+
+def fit_rect(width, height, video_w, video_h):
+    """ Letterboxed picture area of a video_w x video_h frame inside width x height (VLC keeps the aspect) """
+    scale = min(width / video_w, height / video_h)
+    w, h = round(video_w * scale), round(video_h * scale)
+    return QRect((width - w) // 2, (height - h) // 2, w, h)
+
+def watch_window(overlay, surface, watched):
+    """
+    Keeps `overlay`'s event filter on the surface's top-level window, which
+    changes as the dock floats or re-docks. Returns the window now watched.
+    """
+    window = surface.window()
+    if window is not watched:
+        if watched is not None:
+            watched.removeEventFilter(overlay)
+        window.installEventFilter(overlay)
+    return window
+
+class CaptionIndex:
+    """ Active caption for a time: sorted start/end columns and one binary search """
+    def __init__(self, subtitles):
+        order = sorted(range(len(subtitles)), key=lambda i: subtitles[i]["start"])
+        self.texts = [subtitles[i]["text"] for i in order]
+        self.starts = np.array([subtitles[i]["start"] for i in order], np.float64)
+        self.ends = np.array([subtitles[i]["end"] for i in order], np.float64)
+
+    def active(self, t):
+        """ Position of the caption showing at t (latest start wins on overlaps), or -1 """
+        i = int(np.searchsorted(self.starts, t, side="right")) - 1
+        return i if i >= 0 and t < self.ends[i] else -1
+
+def ass_font(family, size, scale):
+    """
+    QFont sized like libass: Fontsize is the line height (ascent + descent)
+    in script pixels, not the em size Qt uses.
+    """
+    font = QFont(family)
+    font.setPixelSize(max(1, round(size * scale)))
+    height = QFontMetricsF(font).height()
+    if height > 0:
+        font.setPixelSize(max(1, round(size * scale * font.pixelSize() / height)))
+    return font
+
+def wrap_lines(text, metrics, width):
+    """ Greedy word wrap of each \\n-separated line to `width` pixels """
+    lines = []
+    for line in text.split("\n"):
+        current = ""
+        for word in line.split(" "):
+            trial = f"{current} {word}" if current else word
+            if current and metrics.horizontalAdvance(trial) > width:
+                lines.append(current)
+                current = word
+            else:
+                current = trial
+        lines.append(current)
+    return lines
+
+def render_caption(text, style, scale, dpr=1.0):
+    """ Caption lines as a transparent ARGB image: centred lines, outlined like the ASS style """
+    font = ass_font(style["font"], style["size"], scale * dpr)
+    metrics = QFontMetricsF(font)
+    outline = OUTLINE * scale * dpr
+    lines = wrap_lines(text, metrics, PLAY_RES[0] * scale * dpr - 2 * outline)
+    widths = [metrics.horizontalAdvance(line) for line in lines]
+    pad = int(np.ceil(outline)) + 1
+    w = int(np.ceil(max(widths))) + 2 * pad
+    h = int(np.ceil(metrics.height() * len(lines))) + 2 * pad
+
+    path = QPainterPath()
+    for row, (line, lw) in enumerate(zip(lines, widths)):
+        path.addText(QPointF((w - lw) / 2, pad + metrics.ascent() + row * metrics.height()), font, line)
+    image = QImage(max(1, w), max(1, h), QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    p = QPainter(image)
+    p.setRenderHint(QPainter.Antialiasing)
+    if outline > 0:
+        p.strokePath(path, QPen(QColor(0, 0, 0), 2 * outline, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
+    p.fillPath(path, QColor(style["color"]))
+    p.end()
+    image.setDevicePixelRatio(dpr)
+    return image
+
+class CaptionOverlay(QWidget):
+    """
+    Live preview of the burned-in captions over the Program Monitor.
+    VLC draws into the surface's native window, which Qt cannot paint on,
+    so this is a small frameless, click-through tool window kept over the
+    caption area. Rendered lines are cached by (text, style, scale); the
+    widget only moves/repaints when the active caption or the style changes.
+    """
+    def __init__(self, surface):
+        super().__init__(surface, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowDoesNotAcceptFocus
+                         | Qt.WindowTransparentForInput)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.surface = surface
+        surface.installEventFilter(self)
+        # Moving the main window or a floating dock moves the surface on screen but sends it no event
+        self._window = watch_window(self, surface, None)
+        self.project = None
+        self.video_size = PLAY_RES
+        self._index = None
+        self._index_key = None
+        self._time = 0.0
+        self._shown = None    # (caption position, style key, surface geometry) on screen now
+        self._image = None
+        self._cache = OrderedDict()
+
+    # --- Inputs ---
+    def set_project(self, project):
+        self.project = project
+        self._index_key = None
+        self.refresh()
+
+    def set_video_size(self, width, height):
+        """ Source frame size, for the letterboxed picture area (VLC keeps the aspect) """
+        if width > 0 and height > 0 and (width, height) != self.video_size:
+            self.video_size = (width, height)
+            self.refresh()
+
+    def set_time(self, seconds):
+        """ Playhead moved: repaints only if another caption (or none) is now active """
+        self._time = seconds
+        self._update()
+
+    def refresh(self):
+        """ Re-reads subtitles/style from the project (style edits preview instantly) """
+        self._shown = None
+        self._update()
+
+    # --- Lookup ---
+    def _captions(self):
+        subs_rev = self.project.subtitles_rev
+        key = (id(self.project), subs_rev)
+        if key != self._index_key:
+            self._index = CaptionIndex(self.project.subtitles) if self.project.subtitles else None
+            self._index_key = key
+        return self._index
+
+    def video_rect(self):
+        return fit_rect(self.surface.width(), self.surface.height(), *self.video_size)
+
+    def _caption_image(self, text, style, scale):
+        dpr = self.surface.devicePixelRatioF()
+        key = (text, style["font"], style["size"], style["color"], round(scale, 4), dpr)
+        image = self._cache.get(key)
+        if image is None:
+            with tracing.span("captions.render", "ui", chars=len(text)):
+                image = self._cache[key] = render_caption(text, style, scale, dpr)
+            if len(self._cache) > CACHE_LINES:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return image
+
+    def _update(self):
+        if self.project is None or not self.surface.isVisible():
+            self.hide()
+            return
+        index = self._captions()
+        pos = index.active(self._time) if index is not None else -1
+        style = self.project.font_settings
+        geometry = (self.surface.mapToGlobal(QPoint(0, 0)), self.surface.size())
+        shown = (pos, tuple(sorted(style.items())), geometry)
+        if shown == self._shown:
+            return
+        self._shown = shown
+        if pos < 0:
+            self._image = None
+            self.hide()
+            return
+
+        # Alignment 2 (bottom centre), MarginV = y_pos, in script pixels scaled to the picture
+        area = self.video_rect()
+        scale = area.height() / PLAY_RES[1]
+        self._image = self._caption_image(index.texts[pos], style, scale)
+        size = QSize(round(self._image.width() / self._image.devicePixelRatio()),
+                     round(self._image.height() / self._image.devicePixelRatio()))
+        pad = OUTLINE * scale + 1
+        bottom = area.bottom() + 1 - round(style.get("y_pos", 0) * scale - pad)
+        top_left = QPoint(area.center().x() - size.width() // 2, bottom - size.height())
+        self.setGeometry(QRect(self.surface.mapToGlobal(top_left), size))
+        self.show()
+        self.update()
+
+    # --- Qt ---
+    def eventFilter(self, obj, event):
+        # getattr: the filter can still fire while the surface tears this widget down
+        surface = getattr(self, "surface", None)
+        if obj is surface and event.type() in (QEvent.Resize, QEvent.Move, QEvent.Show, QEvent.Hide):
+            self._window = watch_window(self, surface, self._window) # Re-shown after (un)floating
+            self.refresh()
+        elif obj is getattr(self, "_window", None) and event.type() in (QEvent.Move, QEvent.WindowStateChange):
+            self.refresh()
+        return False
+
+    def paintEvent(self, event):
+        if self._image is None:
+            return
+        p = QPainter(self)
+        p.setCompositionMode(QPainter.CompositionMode_Source)
+        p.drawImage(0, 0, self._image)
@@ -59,7 +59,7 @@ class EffectsPanel(QFrame):
     def populate_effects(self):
         """ Hardcoded industry standard categories """
         data = {
-            "Audio Effects": ["Amplitude", "Delay", "Echo", "Reverb", "Parametric EQ"],
+            "Audio Effects": ["Amplitude", "Pan", "Delay", "Echo", "Reverb", "Parametric EQ"],
             "Audio Transitions": ["Constant Power", "Exponential Fade"],
             "Video Effects": ["Blur & Sharpen", "Color Correction", "Distort", "Generate", "Transform"],
             "Video Transitions": ["Dissolve", "Iris", "Page Peel", "Slide", "Zoom", "Wipe"]
@@ -0,0 +1,185 @@
+# ui/widgets/motion_preview.py
+import threading
+
+import numpy as np
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt, QEvent, QRect, QThread, Signal
+from PySide6.QtGui import QPainter, QImage
+
+from core import tracing
+from core.motion import DRAFT_FACTOR, MotionFrame, decode_frame, downsample, draft_canvas, sequence_canvas
+from .caption_overlay import fit_rect, watch_window
+
+class PreviewWorker(QThread):
+    """
+    Renders Motion previews off the UI thread. Only the newest request is
+    kept: values that arrive while a render runs replace each other, so a
+    drag never queues up stale frames. Each request gets a quarter-res
+    draft from the cached proxy; with `refine`, a full-resolution pass
+    follows, abandoned between row bands as soon as a newer request comes.
+    """
+    rendered = Signal(int, QImage, bool) # generation, frame, is draft
+
+    def __init__(self):
+        super().__init__()
+        self._cond = threading.Condition()
+        self._request = None
+        self._generation = 0
+        self._stopping = False
+        self._frame_key = None
+        self._frames = None # (full MotionFrame, draft MotionFrame) of the decoded frame
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def request(self, path, seconds, motion, refine):
+        with self._cond:
+            self._generation += 1
+            self._request = (self._generation, path, seconds, dict(motion), refine)
+            self._cond.notify()
+        return self._generation
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self.wait()
+
+    def _stale(self):
+        return self._request is not None or self._stopping
+
+    def _source(self, path, seconds):
+        """ Decoded frame + its quarter-res proxy, kept until the playhead or media changes """
+        key = (path, round(seconds, 3))
+        if key != self._frame_key:
+            frame = decode_frame(path, seconds)
+            self._frames = (MotionFrame(frame), MotionFrame(downsample(frame, DRAFT_FACTOR)))
+            self._frame_key = key
+        return self._frames
+
+    def _emit(self, generation, pixels, draft):
+        h, w = pixels.shape[:2]
+        # copy(): the QImage must own its bytes once it crosses threads
+        self.rendered.emit(generation, QImage(pixels.data, w, h, w * 3, QImage.Format_RGB888).copy(), draft)
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._request is None and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                generation, path, seconds, motion, refine = self._request
+                self._request = None
+            try:
+                full, draft = self._source(path, seconds)
+            except Exception as e:
+                print(f"Motion preview decode error: {e}")
+                continue
+
+            canvas = sequence_canvas(full.width, full.height)
+            with tracing.span("motion.draft", "video"):
+                pixels = draft.render(motion, draft_canvas(*canvas))
+            self._emit(generation, pixels, True)
+            if not refine or self._stale():
+                continue
+
+            # Full resolution in bands, dropped if the user moves on
+            cw, ch = canvas
+            out = np.empty((ch, cw, 3), np.uint8)
+            with tracing.span("motion.refine", "video") as sp:
+                for y in range(0, ch, DRAFT_FACTOR * 64):
+                    if self._stale():
+                        sp.set(abandoned=True)
+                        break
+                    full.render(motion, canvas, out, (y, min(ch, y + DRAFT_FACTOR * 64)))
+                else:
+                    self._emit(generation, out, False)
+
+class MotionPreview(QWidget):
+    """
+    Shows Motion previews over the Program Monitor while playback is
+    paused. Like CaptionOverlay it is a frameless tool window over the
+    picture area, since VLC owns the surface; `overlays` (the captions) are
+    kept above it.
+    """
+    def __init__(self, surface, overlays=()):
+        super().__init__(surface, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowDoesNotAcceptFocus
+                         | Qt.WindowTransparentForInput)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.surface = surface
+        self.overlays = list(overlays)
+        surface.installEventFilter(self)
+        self._window = watch_window(self, surface, None) # Window moves reach us here, not via the surface
+        self._image = None
+        self._draft = True
+        self._shown = 0     # Generation on screen
+        self._motion = None # Last requested values
+        self._refined = False
+        self.worker = PreviewWorker()
+        self.worker.rendered.connect(self.show_frame)
+        self.worker.start()
+
+    @property
+    def active(self):
+        return self._motion is not None
+
+    def request(self, path, seconds, motion, refine):
+        """ Newest Motion values: draft now, full resolution too if `refine` (drag finished) """
+        if motion == self._motion and (self._refined or not refine):
+            return
+        self._motion = dict(motion)
+        self._refined = refine
+        self.worker.request(path, seconds, motion, refine)
+
+    def show_frame(self, generation, image, draft):
+        if generation < self._shown or (draft and generation == self._shown and not self._draft):
+            return # Late result of an older request
+        self._shown = generation
+        self._image = image
+        self._draft = draft
+        self._place()
+        self.update()
+
+    def hide_preview(self):
+        """ Playback resumed: VLC's picture is current again """
+        self._motion = None
+        self._image = None
+        self._draft = True
+        self._shown = self.worker.generation + 1 # Renders still in flight are dropped
+        self.hide()
+
+    def stop(self):
+        self.worker.stop()
+
+    def _place(self):
+        if self._image is None or not self.surface.isVisible():
+            self.hide()
+            return
+        area = fit_rect(self.surface.width(), self.surface.height(), self._image.width(), self._image.height())
+        self.setGeometry(QRect(self.surface.mapToGlobal(area.topLeft()), area.size()))
+        if not self.isVisible():
+            self.show()
+            for overlay in self.overlays:
+                if overlay.isVisible():
+                    overlay.raise_()
+
+    # --- Qt ---
+    def eventFilter(self, obj, event):
+        surface = getattr(self, "surface", None)
+        if obj is surface and event.type() in (QEvent.Resize, QEvent.Move, QEvent.Show, QEvent.Hide):
+            self._window = watch_window(self, surface, self._window)
+            self._place()
+        elif obj is getattr(self, "_window", None) and event.type() in (QEvent.Move, QEvent.WindowStateChange):
+            self._place()
+        return False
+
+    def paintEvent(self, event):
+        if self._image is None:
+            return
+        p = QPainter(self)
+        # Drafts are a quarter of the source: fast scaling while dragging, smooth once refined
+        p.setRenderHint(QPainter.SmoothPixmapTransform, not self._draft)
+        p.drawImage(self.rect(), self._image)
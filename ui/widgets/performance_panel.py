@@ -0,0 +1,117 @@
+from PySide6.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, QWidget, QCheckBox,
+                               QPushButton, QLabel, QFileDialog)
+from PySide6.QtCore import Qt, QTimer, QPointF
+from PySide6.QtGui import QPainter, QColor, QPolygonF
+
+from core import tracing
+
+class SeriesGraph(QWidget):
+    """ One sparkline row per trace series (span durations in ms, counter values) """
+    ROW_H = 38
+    WINDOW = 30.0 # Seconds of history shown
+
+    def __init__(self):
+        super().__init__()
+        self.series = {}
+        self.setMinimumHeight(self.ROW_H)
+
+    def set_series(self, series):
+        self.series = series
+        self.setMinimumHeight(max(1, len(series)) * self.ROW_H)
+        self.update()
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.fillRect(self.rect(), QColor("#1b1b1b"))
+        if not self.series:
+            p.setPen(QColor("#555"))
+            p.drawText(self.rect(), Qt.AlignCenter, "Enable recording to see live timings")
+            return
+
+        w = self.width()
+        label_w = 190
+        graph_w = max(10, w - label_w - 10)
+        now = max(points[-1][0] for points in self.series.values() if points)
+        for row, (name, points) in enumerate(sorted(self.series.items())):
+            top = row * self.ROW_H
+            recent = [(t, v) for t, v in points if t >= now - self.WINDOW]
+            values = [v for _, v in recent] or [0.0]
+            peak = max(max(values), 1e-9)
+
+            p.setPen(QColor("#ccc"))
+            p.drawText(6, top + 15, name)
+            p.setPen(QColor("#3997f3"))
+            p.drawText(6, top + 31, f"{values[-1]:.2f}   max {max(values):.2f}")
+
+            p.fillRect(label_w, top + 3, graph_w, self.ROW_H - 6, QColor("#232323"))
+            if len(recent) > 1:
+                scale_x = graph_w / self.WINDOW
+                scale_y = (self.ROW_H - 10) / peak
+                line = QPolygonF([QPointF(label_w + (t - now + self.WINDOW) * scale_x,
+                                          top + self.ROW_H - 5 - v * scale_y) for t, v in recent])
+                p.setPen(QColor("#6fcf97"))
+                p.drawPolyline(line)
+
+class PerformancePanel(QFrame):
+    """
+    Live view of core.tracing: toggle recording, watch span durations and
+    counters, export everything as a Chrome trace (chrome://tracing).
+    """
+    REFRESH_MS = 250
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+
+        bar = QHBoxLayout()
+        self.chk_record = QCheckBox("Record")
+        self.chk_record.setChecked(tracing.is_enabled())
+        self.chk_record.toggled.connect(self.set_recording)
+        btn_clear = QPushButton("Clear")
+        btn_clear.clicked.connect(self.clear)
+        btn_export = QPushButton("Export Trace...")
+        btn_export.clicked.connect(self.export_trace)
+        self.lbl_count = QLabel("0 events")
+        self.lbl_count.setStyleSheet("color: #888;")
+        bar.addWidget(self.chk_record)
+        bar.addWidget(btn_clear)
+        bar.addWidget(btn_export)
+        bar.addStretch()
+        bar.addWidget(self.lbl_count)
+        layout.addLayout(bar)
+
+        self.graph = SeriesGraph()
+        layout.addWidget(self.graph, 1)
+
+        # Polls only while recording and on screen
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        if tracing.is_enabled():
+            self.timer.start()
+
+    def set_recording(self, on):
+        tracing.enable(on)
+        if on:
+            self.timer.start()
+        else:
+            self.timer.stop()
+            self.refresh()
+
+    def clear(self):
+        tracing.clear()
+        self.refresh()
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        self.graph.set_series(tracing.series())
+        self.lbl_count.setText(f"{tracing.event_count()} events")
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "kanha_trace.json", "Chrome Trace (*.json)")
+        if not path:
+            return
+        count = tracing.export_chrome_trace(path)
+        print(f"⏱ Trace exported: {count} events -> {path}")
@@ -2,6 +2,8 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel,
 from PySide6.QtCore import Qt, QSize
 from utils.asset_loader import AssetLoader
 from utils import icons  # <--- IMPORT CONFIG
+from .caption_overlay import CaptionOverlay
+from .motion_preview import MotionPreview
 
 class ProgramMonitor(QWidget):
     def __init__(self):
@@ -12,6 +14,10 @@ class ProgramMonitor(QWidget):
         self.video_surface = QFrame()
         self.video_surface.setStyleSheet("background: black;")
         layout.addWidget(self.video_surface)
+        # Live caption preview (same style as the burned-in .ass)
+        self.captions = CaptionOverlay(self.video_surface)
+        # Effect Controls Motion preview while paused (captions stay on top)
+        self.preview = MotionPreview(self.video_surface, overlays=[self.captions])
         
         controls = QFrame()
         controls.setStyleSheet("background: #1e1e1e; min-height: 40px;")
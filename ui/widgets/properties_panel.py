@@ -2,6 +2,7 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QFormLayout, QLabel, QSlide
                                QSpinBox, QFontComboBox, QPushButton, QColorDialog, 
                                QScrollArea, QFrame, QHBoxLayout)
 from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QFont
 from utils.asset_loader import AssetLoader
 from utils import icons # Central Config
 
@@ -31,6 +32,9 @@ class PropertiesPanel(QFrame):
         self.sl_pos_y = self.create_slider("Position Y", 540, 0, 2160)
         self.sl_scale = self.create_slider("Scale", 100, 0, 500)
         self.sl_rotation = self.create_slider("Rotation", 0, -360, 360)
+        # Keys match ProjectState.motion
+        self.motion_sliders = {"pos_x": self.sl_pos_x, "pos_y": self.sl_pos_y,
+                               "scale": self.sl_scale, "rotation": self.sl_rotation}
 
         motion_form.addRow("Position X", self.sl_pos_x)
         motion_form.addRow("Position Y", self.sl_pos_y)
@@ -71,7 +75,7 @@ class PropertiesPanel(QFrame):
         
         # A. The Icon (Left Sidebar)
         icon_lbl = QLabel()
-        icon_lbl.setPixmap(AssetLoader.icon(icon_name).pixmap(24, 24))
+        icon_lbl.setPixmap(AssetLoader.pixmap(icon_name, 24))
         icon_lbl.setStyleSheet("padding-top: 0px;") # Align with title
         icon_lbl.setAlignment(Qt.AlignTop)
         
@@ -94,6 +98,22 @@ class PropertiesPanel(QFrame):
         
         self.vbox.addWidget(group_frame)
 
+    def set_values(self, motion, font_settings):
+        """ Mirrors project values without emitting change signals (used after undo/redo) """
+        for key, slider in self.motion_sliders.items():
+            if key in motion and slider.value() != motion[key]:
+                slider.blockSignals(True)
+                slider.setValue(motion[key])
+                slider.blockSignals(False)
+
+        self.font_size.blockSignals(True)
+        self.font_size.setValue(font_settings["size"])
+        self.font_size.blockSignals(False)
+        if self.font_face.currentFont().family() != font_settings["font"]:
+            self.font_face.blockSignals(True)
+            self.font_face.setCurrentFont(QFont(font_settings["font"]))
+            self.font_face.blockSignals(False)
+
     def create_slider(self, tooltip, val, min_v, max_v):
         sl = QSlider(Qt.Horizontal)
         sl.setRange(min_v, max_v)
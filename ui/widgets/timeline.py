@@ -1,48 +1,426 @@
 # ui/widgets/timeline.py
-from PySide6.QtWidgets import QFrame, QHBoxLayout, QVBoxLayout, QLabel
-from PySide6.QtCore import Qt
+import bisect
+import math
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PySide6.QtWidgets import QFrame, QHBoxLayout, QVBoxLayout, QLabel, QWidget
+from PySide6.QtCore import Qt, QPointF, QRectF, QThread, QTimer, Signal
+from PySide6.QtGui import QPainter, QColor, QPixmap, QImage, QPen
+
+from core import tracing
+from core.audio_engine import RUST_AVAILABLE, kanha_core
+from core.timeline import Sequence
+from ..timeline import ShotWorker, WaveformWorker
+
+TRACK_H = 50    # Matches QFrame#TrackControl min-height
+DIVIDER_H = 20  # Gap between video and audio tracks
+SPACING = 1
+
+def track_rows(sequence):
+    """ Row order like Premiere: V3, V2, V1, divider, A1, A2, A3. Returns [(track or None, y)] """
+    video = [t for t in sequence.tracks if t.kind == "video"][::-1]
+    audio = [t for t in sequence.tracks if t.kind != "video"]
+    rows, y = [], 0
+    for track in video + [None] + audio:
+        rows.append((track, y))
+        y += (TRACK_H if track is not None else DIVIDER_H) + SPACING
+    return rows
+
+class FilmstripWorker(QThread):
+    """ Decodes low-res thumbnails for detail-zoom filmstrips (Rust only) """
+    finished = Signal(list, list) # times, [QImage]
+
+    def __init__(self, path, count=120, height=TRACK_H - 4):
+        super().__init__()
+        self.path = path
+        self.count = count
+        self.height = height
+
+    def run(self):
+        if not RUST_AVAILABLE:
+            return
+        try:
+            clip = kanha_core.VideoClip(self.path)
+            w = max(2, int(self.height * 16 / 9)) // 2 * 2
+            frames = clip.get_timeline_strip(self.count, w, self.height)
+        except Exception as e:
+            print(f"Filmstrip Error: {e}")
+            return
+        step = clip.duration / max(1, self.count)
+        times = [i * step for i in range(len(frames))]
+        # copy(): QImage must not outlive the bytes it wraps
+        images = [QImage(f, w, self.height, w * 3, QImage.Format_RGB888).copy() for f in frames]
+        self.finished.emit(times, images)
+
+class TimelineView(QWidget):
+    """
+    Virtualised clip area.
+
+    Only clips returned by Track.indices_in() for the visible time window
+    are painted. Level of detail follows zoom:
+      - bars:   < LABEL_PPS px/s, clips merged into pixel spans, one drawRects call
+      - labels: clip rectangles with names
+      - detail: >= DETAIL_PPS px/s, cached waveform / filmstrip tiles
+    Detail tiles are rendered per zoom bucket (pps rounded to a power of
+    sqrt(2)) and scaled when drawn, so zooming inside a bucket reuses them.
+    New tiles are rendered within FRAME_BUDGET per paint; the rest show as
+    plain bars and are filled in on the next frames.
+    """
+    playheadMoved = Signal(float)
+
+    LABEL_PPS = 8.0
+    DETAIL_PPS = 40.0
+    TILE_W = 256
+    MAX_TILES = 600
+    FRAME_BUDGET = 0.008 # Seconds of tile rendering per paint
+
+    COLORS = {"video": QColor("#4a6fa5"), "audio": QColor("#3f8f5f")}
+    MARKER_COLOR = "#f2c94c" # Shot boundaries
+
+    def __init__(self):
+        super().__init__()
+        self.setMinimumHeight(7 * TRACK_H)
+        self.setFocusPolicy(Qt.WheelFocus)
+        self.sequence = Sequence()
+        self.pps = 20.0            # Zoom: pixels per second
+        self.scroll = 0.0          # Sequence time at the left edge
+        self.target_scroll = 0.0
+        self.playhead = 0.0
+        self.selected = None       # (track name, clip id)
+        self.waveforms = {}        # source path -> WaveformPyramid
+        self.thumbnails = {}       # source path -> (times list, [QImage])
+        self.markers = {}          # source path -> ShotIndex (shot boundaries)
+        self._tiles = OrderedDict() # LRU of rendered detail tiles
+        self._rows = track_rows(self.sequence)
+
+        # Smooth scrolling: ease towards target_scroll at ~60 fps
+        self._anim = QTimer(self)
+        self._anim.setInterval(16)
+        self._anim.timeout.connect(self._step_scroll)
+
+    # --- Model ---
+    def set_sequence(self, sequence):
+        self.sequence = sequence
+        self._rows = track_rows(sequence)
+        self._tiles.clear()
+        self.update()
+
+    def set_waveform(self, path, pyramid):
+        self.waveforms[path] = pyramid
+        self._drop_tiles(path)
+
+    def set_thumbnails(self, path, times, images):
+        self.thumbnails[path] = (list(times), images)
+        self._drop_tiles(path)
+
+    def set_markers(self, path, index):
+        self.markers[path] = index
+        self.update()
+
+    def _drop_tiles(self, path):
+        for key in [k for k in self._tiles if k[0] == path]:
+            del self._tiles[key]
+        self.update()
+
+    # --- Coordinates ---
+    def time_at(self, x):
+        return self.scroll + x / self.pps
+
+    def x_at(self, t):
+        return (t - self.scroll) * self.pps
+
+    def row_at(self, y):
+        for track, top in self._rows:
+            h = TRACK_H if track is not None else DIVIDER_H
+            if top <= y < top + h:
+                return track
+        return None
+
+    def lod(self):
+        if self.pps < self.LABEL_PPS: return 0
+        if self.pps < self.DETAIL_PPS: return 1
+        return 2
+
+    # --- Painting ---
+    def paintEvent(self, event):
+        deadline = time.perf_counter() + self.FRAME_BUDGET
+        p = QPainter(self)
+        p.fillRect(self.rect(), QColor("#181818"))
+
+        w = self.width()
+        t0, t1 = self.time_at(0), self.time_at(w)
+        lod = self.lod()
+        pending = False
+
+        for track, y in self._rows:
+            if track is None:
+                p.fillRect(0, y, w, DIVIDER_H, QColor("#222"))
+                continue
+            idx = track.indices_in(t0, t1)
+            if not len(idx):
+                continue
+            color = self.COLORS.get(track.kind, QColor("#777"))
+            starts = track.starts[idx]
+            ends = track.ends[idx]
+            if lod == 0:
+                self._paint_bars(p, starts, ends, y, color)
+                continue
+            for i, start, end in zip(idx, starts, ends):
+                pending |= self._paint_clip(p, track, int(i), start, end, y, color, lod, deadline)
+
+        # Playhead
+        x = self.x_at(self.playhead)
+        if 0 <= x <= w:
+            p.setPen(QPen(QColor("#3997f3"), 1))
+            p.drawLine(int(x), 0, int(x), self.height())
+        p.end()
+        if tracing.ENABLED:
+            tracing.complete("timeline.paint", deadline - self.FRAME_BUDGET, time.perf_counter(), "ui", lod=lod)
+            tracing.counter("timeline.tiles", len(self._tiles), "ui")
+
+        if pending:
+            QTimer.singleShot(0, self.update) # Finish missing tiles next frame
+
+    def _paint_bars(self, p, starts, ends, y, color):
+        """ Far zoom: merge clips into pixel spans so the rect count is bounded by width """
+        x0 = np.floor(self.x_at(starts)).astype(np.int64)
+        x1 = np.maximum(np.ceil(self.x_at(ends)).astype(np.int64), x0 + 1)
+        reach = np.maximum.accumulate(x1)
+        new_span = np.concatenate(([True], x0[1:] > reach[:-1]))
+        first = np.flatnonzero(new_span)
+        span_x0 = x0[first]
+        span_x1 = np.maximum.reduceat(x1, first)
+        rects = [QRectF(a, y + 4, b - a, TRACK_H - 8) for a, b in zip(span_x0.tolist(), span_x1.tolist())]
+        p.setPen(Qt.NoPen)
+        p.setBrush(color)
+        p.drawRects(rects)
+
+    def _paint_clip(self, p, track, pos, start, end, y, color, lod, deadline):
+        w = self.width()
+        x0, x1 = self.x_at(start), self.x_at(end)
+        rect = QRectF(max(x0, -2), y + 2, min(x1, w + 2) - max(x0, -2), TRACK_H - 4)
+        selected = self.selected == (track.name, int(track.ids[pos]))
+        p.setPen(QPen(QColor("#fff") if selected else color.darker(150), 1))
+        p.setBrush(color)
+        p.drawRect(rect)
+
+        pending = False
+        path = self._source_path(track, pos)
+        if lod == 2 and path is not None:
+            pending = self._paint_tiles(p, track, pos, path, start, x0, rect, deadline)
+        if lod >= 1 and track.kind == "video" and path in self.markers:
+            self._paint_markers(p, track, pos, self.markers[path], start, rect)
+
+        if rect.width() > 30:
+            p.setPen(QColor("#eee"))
+            label_rect = rect.adjusted(4, 2, -4, 0)
+            label = p.fontMetrics().elidedText(self._clip_label(track, pos), Qt.ElideRight, int(label_rect.width()))
+            p.drawText(label_rect, Qt.AlignLeft | Qt.AlignTop, label)
+        return pending
+
+    def _paint_markers(self, p, track, pos, index, start, rect):
+        """ Shot boundaries inside the clip's source range, as ticks along its top edge """
+        src_in, src_out = float(track.ins[pos]), float(track.outs[pos])
+        lo, hi = np.searchsorted(index.boundaries, (src_in, src_out))
+        if hi <= lo:
+            return
+        xs = self.x_at(start + index.boundaries[lo:hi] - src_in)
+        top = rect.top()
+        for x, confidence in zip(xs.tolist(), index.confidence[lo:hi].tolist()):
+            if rect.left() < x < rect.right():
+                marker = QColor(self.MARKER_COLOR)
+                marker.setAlphaF(0.35 + 0.65 * confidence)
+                p.setPen(QPen(marker, 2))
+                p.drawLine(QPointF(x, top), QPointF(x, top + 12))
+
+    def _source_path(self, track, pos):
+        sid = int(track.sources[pos])
+        return self.sequence.sources[sid] if sid < len(self.sequence.sources) else None
+
+    def _clip_label(self, track, pos):
+        path = self._source_path(track, pos)
+        return path.replace("\\", "/").rsplit("/", 1)[-1] if path else f"Clip {int(track.ids[pos])}"
+
+    # --- Detail tiles (waveform / filmstrip) ---
+    def _paint_tiles(self, p, track, pos, path, start, clip_x0, rect, deadline):
+        bucket = math.floor(math.log2(self.pps) * 2)
+        bucket_pps = 2.0 ** (bucket / 2)
+        tile_t = self.TILE_W / bucket_pps          # Source seconds per tile
+        scale = self.pps / bucket_pps
+
+        src_in = float(track.ins[pos])
+        vis0 = src_in + (self.time_at(rect.left()) - start)
+        vis1 = src_in + (self.time_at(rect.right()) - start)
+        pending = False
+        p.save()
+        p.setClipRect(rect)
+        for tile in range(int(vis0 // tile_t), int(vis1 // tile_t) + 1):
+            key = (path, track.kind, bucket, tile)
+            pix = self._tiles.get(key)
+            if pix is None:
+                if time.perf_counter() > deadline:
+                    pending = True
+                    continue
+                pix = self._render_tile(path, track.kind, tile * tile_t, tile_t)
+                if pix is None:
+                    break
+                self._tiles[key] = pix
+                if len(self._tiles) > self.MAX_TILES:
+                    self._tiles.popitem(last=False)
+            else:
+                self._tiles.move_to_end(key)
+            x = clip_x0 + (tile * tile_t - src_in) * self.pps
+            p.drawPixmap(QRectF(x, rect.top(), self.TILE_W * scale, rect.height()), pix,
+                         QRectF(0, 0, pix.width(), pix.height()))
+        p.restore()
+        return pending
+
+    def _render_tile(self, path, kind, t0, span):
+        h = TRACK_H - 4
+        if kind == "audio":
+            pyramid = self.waveforms.get(path)
+            if pyramid is None:
+                return None
+            levels = pyramid.window(t0, t0 + span, self.TILE_W)
+            pix = QPixmap(self.TILE_W, h)
+            pix.fill(Qt.transparent)
+            painter = QPainter(pix)
+            painter.setPen(QColor("#9fe0b5"))
+            mid = h / 2
+            for x, level in enumerate((levels * h * 0.9 / 2).tolist()):
+                if level >= 0.5:
+                    painter.drawLine(x, int(mid - level), x, int(mid + level))
+            painter.end()
+            return pix
+
+        strip = self.thumbnails.get(path)
+        if not strip:
+            return None
+        times, images = strip
+        thumb_w = max(1, int(h * 16 / 9))
+        pix = QPixmap(self.TILE_W, h)
+        pix.fill(Qt.transparent)
+        painter = QPainter(pix)
+        for x in range(0, self.TILE_W, thumb_w):
+            t = t0 + (x + thumb_w / 2) * span / self.TILE_W
+            i = min(max(bisect.bisect_left(times, t), 0), len(images) - 1)
+            painter.drawImage(QRectF(x, 0, thumb_w, h), images[i])
+        painter.end()
+        return pix
+
+    # --- Interaction ---
+    def wheelEvent(self, e):
+        steps = e.angleDelta().y() / 120.0
+        if e.modifiers() & Qt.ControlModifier:
+            # Zoom around the cursor
+            anchor = self.time_at(e.position().x())
+            self.pps = float(np.clip(self.pps * (1.25 ** steps), 0.01, 2000.0))
+            self.scroll = self.target_scroll = max(0.0, anchor - e.position().x() / self.pps)
+            self.update()
+        else:
+            self.target_scroll = max(0.0, self.target_scroll - steps * 120 / self.pps)
+            if not self._anim.isActive():
+                self._anim.start()
+        e.accept()
+
+    def _step_scroll(self):
+        diff = self.target_scroll - self.scroll
+        if abs(diff * self.pps) < 0.5:
+            self.scroll = self.target_scroll
+            self._anim.stop()
+        else:
+            self.scroll += diff * 0.35
+        self.update()
+
+    def mousePressEvent(self, e):
+        t = self.time_at(e.position().x())
+        track = self.row_at(e.position().y())
+        clip = track.clip_at(t) if track is not None else None
+        if clip is not None:
+            self.selected = (track.name, clip.clip_id)
+        else:
+            self.selected = None
+            self.playhead = max(0.0, t)
+            self.playheadMoved.emit(self.playhead)
+        self.update()
+
+    def set_playhead(self, t):
+        old_x, self.playhead = self.x_at(self.playhead), t
+        new_x = self.x_at(t)
+        # Repaint only the two thin strips the line moved between
+        self.update(int(old_x) - 1, 0, 3, self.height())
+        self.update(int(new_x) - 1, 0, 3, self.height())
 
 class Timeline(QFrame):
     def __init__(self):
         super().__init__()
+        self.analysis = {} # Waveform pyramid, speech intervals, level stats
         self.init_ui()
 
+    def load_waveform(self, file_path):
+        """ Runs the single-pass audio analysis in background """
+        self.worker = WaveformWorker(file_path, max(800, self.width()))
+        self.worker.analysed.connect(lambda results: self.on_analysis_ready(file_path, results))
+        self.worker.start()
+
+    def load_filmstrip(self, file_path):
+        self.strip_worker = FilmstripWorker(file_path)
+        self.strip_worker.finished.connect(lambda t, imgs: self.view.set_thumbnails(file_path, t, imgs))
+        self.strip_worker.start()
+
+    def load_shots(self, file_path):
+        """ Shot-boundary markers (cached index, detected in the background on first import) """
+        self.shot_worker = ShotWorker(file_path)
+        self.shot_worker.finished.connect(lambda index: self.view.set_markers(file_path, index))
+        self.shot_worker.start()
+
+    def on_analysis_ready(self, path, results):
+        self.analysis = results
+        if results.get("waveform") is not None:
+            self.view.set_waveform(path, results["waveform"])
+
     def init_ui(self):
         layout = QHBoxLayout(self)
         layout.setContentsMargins(0,0,0,0)
         layout.setSpacing(0)
-        
+
         # HEADERS
-        headers = QFrame()
-        headers.setObjectName("TimelineHeader")
-        headers.setFixedWidth(100)
-        v_layout = QVBoxLayout(headers)
-        v_layout.setSpacing(1)
-        v_layout.setContentsMargins(0,0,0,0)
-        
-        # Create Fake Tracks
-        track_names = ["V3", "V2", "V1", "", "A1", "A2", "A3"]
-        for name in track_names:
+        self.headers = QFrame()
+        self.headers.setObjectName("TimelineHeader")
+        self.headers.setFixedWidth(100)
+        self.header_layout = QVBoxLayout(self.headers)
+        self.header_layout.setSpacing(SPACING)
+        self.header_layout.setContentsMargins(0,0,0,0)
+
+        # CLIP AREA (virtualised)
+        self.view = TimelineView()
+        self.build_headers()
+
+        layout.addWidget(self.headers)
+        layout.addWidget(self.view, 1)
+
+    def build_headers(self):
+        """ One header row per sequence track, same heights as the view rows """
+        while self.header_layout.count():
+            item = self.header_layout.takeAt(0)
+            if item.widget(): item.widget().deleteLater()
+
+        for track, _ in track_rows(self.view.sequence):
             row = QFrame()
-            if name: 
+            if track is not None:
                 row.setObjectName("TrackControl")
-                lbl = QLabel(name)
+                row.setFixedHeight(TRACK_H)
+                lbl = QLabel(track.name)
                 lbl.setStyleSheet("color: #777; padding-left: 5px; font-weight: bold;")
                 box = QVBoxLayout(row); box.addWidget(lbl); box.setAlignment(Qt.AlignVCenter)
             else:
-                row.setStyleSheet("background: #222; max-height: 20px;") # Divider
-            v_layout.addWidget(row)
-        v_layout.addStretch()
-        
-        # CLIP AREA (Placeholder for now)
-        tracks = QFrame()
-        tracks.setStyleSheet("background: #181818;")
-        # Center label placeholder
-        ctr = QVBoxLayout(tracks)
-        lbl = QLabel("Sequences Go Here")
-        lbl.setStyleSheet("color: #333; font-size: 30px; font-weight: bold;")
-        lbl.setAlignment(Qt.AlignCenter)
-        ctr.addWidget(lbl)
-        
-        layout.addWidget(headers)
-        layout.addWidget(tracks)
\ No newline at end of file
+                row.setStyleSheet("background: #222;") # Divider
+                row.setFixedHeight(DIVIDER_H)
+            self.header_layout.addWidget(row)
+        self.header_layout.addStretch()
+
+    def set_sequence(self, sequence):
+        self.view.set_sequence(sequence)
+        self.build_headers()
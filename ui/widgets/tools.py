@@ -1,6 +1,7 @@
 from PySide6.QtWidgets import QFrame, QVBoxLayout, QPushButton
 from PySide6.QtCore import QSize
 from utils.asset_loader import AssetLoader 
+from utils import icons
 
 class ToolStrip(QFrame):
     def __init__(self):
@@ -9,13 +10,8 @@ class ToolStrip(QFrame):
         layout.setContentsMargins(5, 10, 5, 10)
         layout.setSpacing(15)
         
-        # Use your icon filenames here
-        tools = [
-            "mouse_pointer.png",  # Default arrow (assume you have one or make one)
-            "code.png",           # Slice tool?
-            "alert-triangle.png", # Hand tool?
-            "file.png"            # Text tool?
-        ]
+        # Icon filenames live in utils/icons.py
+        tools = [icons.TOOL_POINTER, icons.TOOL_CUT, icons.TOOL_HAND, icons.TOOL_TEXT]
         
         for icon_name in tools:
             btn = QPushButton()
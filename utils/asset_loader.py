@@ -1,24 +1,127 @@
+import json
 import os
+import struct
 from PySide6.QtGui import QIcon, QPixmap
+from PySide6.QtCore import Qt
 # Import the config we just made
-from . import icons 
+from . import icons
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+BUNDLE_PATH = os.path.join(ASSET_DIR, "assets.kab")
+
+# Bundle layout: [magic][index size][index JSON][PNG][PNG]...
+# The index maps file name -> [offset, size] relative to the end of the index.
+BUNDLE_MAGIC = b"KABN"
+BUNDLE_HEADER = struct.Struct("<4sI")
+
+def build_bundle(asset_dir=ASSET_DIR, path=BUNDLE_PATH):
+    """ Packs every PNG in asset_dir into one bundle file (see tools/build_assets.py) """
+    names = sorted(n for n in os.listdir(asset_dir) if n.lower().endswith(".png"))
+    index, blobs, offset = {}, [], 0
+    for name in names:
+        with open(os.path.join(asset_dir, name), "rb") as f:
+            data = f.read()
+        index[name] = [offset, len(data)]
+        blobs.append(data)
+        offset += len(data)
+    raw_index = json.dumps(index).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, len(raw_index)))
+        f.write(raw_index)
+        f.writelines(blobs)
+    return names
+
+def _read_bundle(path=BUNDLE_PATH):
+    """ name -> PNG bytes, from one read of the bundle ({} if absent or invalid) """
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError:
+        return {}
+    magic, size = BUNDLE_HEADER.unpack_from(raw)
+    if magic != BUNDLE_MAGIC:
+        print(f"⚠️ Warning: {path} is not an asset bundle, using loose files")
+        return {}
+    start = BUNDLE_HEADER.size + size
+    index = json.loads(raw[BUNDLE_HEADER.size:start].decode("utf-8"))
+    return {name: raw[start + o:start + o + n] for name, (o, n) in index.items()}
 
 class AssetLoader:
-    
+    """
+    Icons and pixmaps, decoded once and memoised by (name, size).
+    Image bytes come from the prebuilt bundle when there is one, else from
+    the loose files (the asset folder is listed once, never stat'ed per call).
+    """
+    _bundle = None    # name -> PNG bytes
+    _on_disk = None   # Loose file names in ASSET_DIR
+    _icons = {}       # (name, size) -> QIcon
+    _pixmaps = {}     # (name, size) -> QPixmap
+
     @staticmethod
     def get_path(filename):
         """ Resolves the full path to an asset file """
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         # Security check: ensures filename isn't empty
         if not filename: return ""
-        return os.path.join(base_dir, "assets", filename)
+        return os.path.join(ASSET_DIR, filename)
 
-    @staticmethod
-    def icon(filename):
-        """ Returns QIcon, safe fallback if file missing """
-        path = AssetLoader.get_path(filename)
-        if os.path.exists(path):
-            return QIcon(path)
-        # Optional: Print warning so you know an image is missing
-        # print(f"⚠️ Warning: Missing Icon {filename}")
-        return QIcon()
\ No newline at end of file
+    @classmethod
+    def _load_index(cls):
+        if cls._bundle is None:
+            cls._bundle = _read_bundle()
+            try:
+                cls._on_disk = set(os.listdir(ASSET_DIR))
+            except OSError:
+                cls._on_disk = set()
+
+    @classmethod
+    def exists(cls, filename):
+        cls._load_index()
+        return bool(filename) and (filename in cls._bundle or filename in cls._on_disk)
+
+    @classmethod
+    def pixmap(cls, filename, size=None):
+        """ QPixmap (scaled to `size` px if given); null pixmap if missing """
+        key = (filename, size)
+        pix = cls._pixmaps.get(key)
+        if pix is None:
+            if size is not None:
+                pix = cls.pixmap(filename)
+                if not pix.isNull():
+                    pix = pix.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            else:
+                cls._load_index()
+                pix = QPixmap()
+                if filename in cls._bundle:
+                    pix.loadFromData(cls._bundle[filename], "PNG")
+                elif filename in cls._on_disk:
+                    pix.load(cls.get_path(filename))
+            cls._pixmaps[key] = pix
+        return pix
+
+    @classmethod
+    def icon(cls, filename, size=None):
+        """ Returns QIcon, safe fallback if file missing (shared instance per name/size) """
+        key = (filename, size)
+        icon = cls._icons.get(key)
+        if icon is None:
+            pix = cls.pixmap(filename, size)
+            icon = QIcon(pix) if not pix.isNull() else QIcon()
+            cls._icons[key] = icon
+        return icon
+
+    @classmethod
+    def check_assets(cls, names=None):
+        """ Reports every missing asset in one message; returns the missing names """
+        if names is None:
+            names = [v for k, v in vars(icons).items() if k.isupper() and isinstance(v, str)]
+        missing = sorted({n for n in names if not cls.exists(n)})
+        if missing:
+            print(f"⚠️ Warning: {len(missing)} missing asset(s) in {ASSET_DIR}: {', '.join(missing)}")
+        return missing
+
+    @classmethod
+    def clear_cache(cls):
+        """ Forget decoded images and the bundle (after rebuilding assets) """
+        cls._bundle = cls._on_disk = None
+        cls._icons.clear()
+        cls._pixmaps.clear()
@@ -13,7 +13,7 @@ FORWARD    = "fast-forward.png"
 # --- TOOLS PANEL ---
 # Match these to the sidebar icons in your screenshot
 TOOL_POINTER = "mouse_pointer.png"  # Standard cursor
-TOOL_CUT     = "scissors.png"       # Razor tool
+TOOL_CUT     = "code.png"           # Razor tool (no scissors.png asset yet)
 TOOL_TEXT    = "file.png"           # Text tool (using your asset)
 TOOL_HAND    = "alert-triangle.png" # Using alert as placeholder for now
 
@@ -1,19 +1,14 @@
 # utils/time_utils.py
+from utils.timebase import DEFAULT_RATE, FrameRate, frames_to_timecode_fields, seconds_to_frames, to_ass
 
-def ms_to_timestamp(ms: int) -> str:
-    """Converts milliseconds to 00:00:00 format"""
-    seconds = ms // 1000
-    m, s = divmod(seconds, 60)
-    h, m = divmod(m, 60)
-    frames = int((ms % 1000) / 33.3)
+def ms_to_timestamp(ms: int, rate=DEFAULT_RATE) -> str:
+    """Converts milliseconds to 00:00:00 format (MM:SS:FF, or HH:MM:SS past an hour)"""
+    rate = FrameRate.from_any(rate)
+    h, m, s, frames = frames_to_timecode_fields(seconds_to_frames(max(0, ms) / 1000.0, rate), rate)
     if h > 0:
         return f"{h:02}:{m:02}:{s:02}"
     return f"{m:02}:{s:02}:{frames:02}"
 
 def seconds_to_ass_time(seconds: float) -> str:
-    """Converts seconds to ASS format H:MM:SS.cs"""
-    h = int(seconds // 3600)
-    m = int((seconds % 3600) // 60)
-    s = int(seconds % 60)
-    cs = int((seconds - int(seconds)) * 100)
-    return f"{h}:{m:02d}:{s:02d}.{cs:02d}"
\ No newline at end of file
+    """Converts seconds to ASS format H:MM:SS.cs (rounded to the nearest centisecond)"""
+    return to_ass(seconds)
@@ -0,0 +1,265 @@
+# utils/timebase.py
+"""
+Frame-accurate time handling shared by the player, timeline, subtitles
+and exporters.
+
+Frame rates are exact fractions (30000/1001, not 29.97). A time t lies in
+frame floor(t * rate); every converter uses that one rule so all
+subsystems agree on frame boundaries. Converters accept scalars or
+NumPy arrays. The formatters build whole columns of timestamps with
+array operations, so a 100k-line caption file costs a few vector ops
+rather than 100k format calls.
+"""
+import math
+from fractions import Fraction
+
+import numpy as np
+
+# Absorbs float error such as 0.7 * 30 = 20.999999999999996 (a millionth of a frame)
+EPSILON = 1e-6
+
+class FrameRate:
+    """ Exact frame rate num/den, optionally counted as SMPTE drop-frame """
+    __slots__ = ("num", "den", "drop_frame")
+
+    def __init__(self, num, den=1, drop_frame=False):
+        ratio = Fraction(num, den)
+        self.num, self.den = ratio.numerator, ratio.denominator
+        if drop_frame and self.nominal not in (30, 60):
+            raise ValueError(f"Drop-frame needs a 29.97 or 59.94 rate, got {self}")
+        self.drop_frame = bool(drop_frame) and self.den == 1001
+
+    @classmethod
+    def from_any(cls, value, drop_frame=False):
+        """
+        FrameRate from a FrameRate, Fraction, "30000/1001" string or float.
+        Floats within 0.01 of an NTSC rate (23.976, 29.97, 59.94...) become
+        the exact x000/1001 fraction.
+        """
+        if isinstance(value, FrameRate):
+            return value
+        if isinstance(value, str):
+            value = Fraction(value.strip())
+        if isinstance(value, Fraction):
+            return cls(value.numerator, value.denominator, drop_frame)
+        value = float(value)
+        if value <= 0:
+            raise ValueError(f"Invalid frame rate: {value}")
+        nominal = round(value)
+        if abs(value - nominal) < 1e-3:
+            return cls(nominal, 1, drop_frame)
+        ntsc = round(value * 1.001)
+        if abs(value - ntsc / 1.001) < 0.01:
+            return cls(ntsc * 1000, 1001, drop_frame)
+        exact = Fraction(value).limit_denominator(1001)
+        return cls(exact.numerator, exact.denominator, drop_frame)
+
+    @property
+    def fps(self):
+        return self.num / self.den
+
+    @property
+    def nominal(self):
+        """ Frames counted per timecode second (30 for 29.97) """
+        return round(self.num / self.den)
+
+    @property
+    def fraction(self):
+        return Fraction(self.num, self.den)
+
+    def __eq__(self, other):
+        return (isinstance(other, FrameRate) and (self.num, self.den, self.drop_frame)
+                == (other.num, other.den, other.drop_frame))
+
+    def __hash__(self):
+        return hash((self.num, self.den, self.drop_frame))
+
+    def __str__(self):
+        return f"{self.num}/{self.den}" if self.den != 1 else str(self.num)
+
+    def __repr__(self):
+        return f"FrameRate({self}{', DF' if self.drop_frame else ''})"
+
+    # --- Conversions (scalars or arrays) ---
+    def frame_at(self, seconds):
+        return seconds_to_frames(seconds, self)
+
+    def seconds(self, frames):
+        return frames_to_seconds(frames, self)
+
+    def snap(self, seconds):
+        return snap_to_frame(seconds, self)
+
+    def timecode(self, seconds):
+        return to_smpte(seconds, self)
+
+# Common rates
+FILM = FrameRate(24)
+NTSC_FILM = FrameRate(24000, 1001)
+PAL = FrameRate(25)
+NTSC = FrameRate(30000, 1001)
+NTSC_DF = FrameRate(30000, 1001, drop_frame=True)
+FPS_30 = FrameRate(30)
+PAL_HIGH = FrameRate(50)
+NTSC_HIGH = FrameRate(60000, 1001)
+NTSC_HIGH_DF = FrameRate(60000, 1001, drop_frame=True)
+FPS_60 = FrameRate(60)
+DEFAULT_RATE = FPS_30
+
+# ------------------------------------------
+#  FRAMES <-> SECONDS
+# ------------------------------------------
+def _scalar(value, out):
+    return out.item() if np.ndim(value) == 0 else out
+
+def seconds_to_frames(seconds, rate, rounding="floor"):
+    """
+    Frame index containing each time ("floor"), or the nearest frame
+    boundary ("round"). Returns int64 (array in, array out).
+    """
+    rate = FrameRate.from_any(rate)
+    x = np.asarray(seconds, np.float64) * rate.num / rate.den
+    if rounding == "floor":
+        frames = np.floor(x + EPSILON)
+    elif rounding == "round":
+        frames = np.floor(x + 0.5)
+    elif rounding == "ceil":
+        frames = np.ceil(x - EPSILON)
+    else:
+        raise ValueError(f"Unknown rounding: {rounding}")
+    return _scalar(seconds, frames.astype(np.int64))
+
+def frames_to_seconds(frames, rate):
+    """ Start time of each frame """
+    rate = FrameRate.from_any(rate)
+    return _scalar(frames, np.asarray(frames, np.int64) * rate.den / rate.num)
+
+def snap_to_frame(seconds, rate):
+    """ Nearest frame boundary (cut points, clip edges) """
+    return frames_to_seconds(seconds_to_frames(seconds, rate, "round"), rate)
+
+# ------------------------------------------
+#  TIMECODE
+# ------------------------------------------
+def _drop_counts(rate):
+    """ (frames dropped per minute, frames per 10 minutes, frames per dropping minute) """
+    drop = rate.nominal // 15  # 2 at 29.97, 4 at 59.94
+    per_minute = rate.nominal * 60 - drop
+    return drop, per_minute * 10 + drop, per_minute
+
+def frames_to_timecode_fields(frames, rate):
+    """ (hours, minutes, seconds, frames) int64 arrays in timecode counting """
+    rate = FrameRate.from_any(rate)
+    f = np.asarray(frames, np.int64).copy()
+    if rate.drop_frame:
+        # Timecode skips frame labels 0..drop-1 each minute except every tenth
+        drop, per_ten, per_minute = _drop_counts(rate)
+        tens, rem = np.divmod(f, per_ten)
+        extra = np.where(rem > drop, drop * ((rem - drop) // per_minute), 0)
+        f = f + drop * 9 * tens + extra
+    n = rate.nominal
+    return f // (3600 * n), f // (60 * n) % 60, f // n % 60, f % n
+
+def timecode_to_frames(hours, minutes, seconds, frames, rate):
+    """ Inverse of frames_to_timecode_fields (arrays or scalars) """
+    rate = FrameRate.from_any(rate)
+    h, m, s, ff = (np.asarray(v, np.int64) for v in (hours, minutes, seconds, frames))
+    total = (h * 3600 + m * 60 + s) * rate.nominal + ff
+    if rate.drop_frame:
+        drop = _drop_counts(rate)[0]
+        minutes_total = h * 60 + m
+        total = total - drop * (minutes_total - minutes_total // 10)
+    return _scalar(hours, total)
+
+def parse_timecode(text, rate):
+    """ "HH:MM:SS:FF" or drop-frame "HH:MM:SS;FF" -> frame index """
+    parts = text.replace(";", ":").replace(".", ":").split(":")
+    if len(parts) != 4:
+        raise ValueError(f"Bad timecode: {text}")
+    return timecode_to_frames(*(int(p) for p in parts), rate)
+
+def parse_time(text):
+    """ "H:MM:SS.cc" (ASS), "HH:MM:SS,mmm" (SRT) or "HH:MM:SS.mmm" (VTT) -> seconds """
+    clock, _, frac = text.strip().replace(",", ".").partition(".")
+    parts = [int(p) for p in clock.split(":")]
+    while len(parts) < 3:
+        parts.insert(0, 0)
+    h, m, s = parts
+    return h * 3600 + m * 60 + s + (int(frac) / 10 ** len(frac) if frac else 0.0)
+
+# ------------------------------------------
+#  FORMATTERS (vectorised)
+# ------------------------------------------
+def _digits(values, width):
+    """ (N, width) ASCII digit matrix of non-negative ints, zero padded """
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (values[:, None] // powers % 10 + ord("0")).astype(np.uint8)
+
+def _pack(fields):
+    """
+    Joins digit fields and separators into one fixed-width byte string
+    per row. `fields` items are (int array, width) or a separator str.
+    """
+    n = next(len(f[0]) for f in fields if not isinstance(f, str))
+    cols = []
+    for field in fields:
+        if isinstance(field, str):
+            cols.append(np.broadcast_to(np.frombuffer(field.encode(), np.uint8), (n, len(field))))
+        else:
+            cols.append(_digits(*field))
+    rows = np.ascontiguousarray(np.hstack(cols))
+    return rows.view(f"S{rows.shape[1]}").ravel().astype(str).tolist()
+
+def _hour_width(hours, minimum):
+    top = int(hours.max()) if len(hours) else 0
+    return max(minimum, len(str(top)))
+
+def _clock_fields(seconds, units):
+    """ Split non-negative seconds into h, m, s, sub-second units (rounded, not truncated) """
+    total = np.floor(np.maximum(np.asarray(seconds, np.float64).ravel(), 0) * units + 0.5).astype(np.int64)
+    return total // (3600 * units), total // (60 * units) % 60, total // units % 60, total % units
+
+def format_ass(seconds):
+    """ ASS "H:MM:SS.cc" for every time in `seconds` (list of str) """
+    h, m, s, cs = _clock_fields(seconds, 100)
+    return _pack([(h, _hour_width(h, 1)), ":", (m, 2), ":", (s, 2), ".", (cs, 2)])
+
+def format_srt(seconds):
+    """ SRT "HH:MM:SS,mmm" """
+    h, m, s, ms = _clock_fields(seconds, 1000)
+    return _pack([(h, _hour_width(h, 2)), ":", (m, 2), ":", (s, 2), ",", (ms, 3)])
+
+def format_vtt(seconds):
+    """ WebVTT "HH:MM:SS.mmm" """
+    h, m, s, ms = _clock_fields(seconds, 1000)
+    return _pack([(h, _hour_width(h, 2)), ":", (m, 2), ":", (s, 2), ".", (ms, 3)])
+
+def format_smpte(frames, rate):
+    """ SMPTE "HH:MM:SS:FF" from frame indices (";FF" for drop-frame) """
+    rate = FrameRate.from_any(rate)
+    h, m, s, ff = frames_to_timecode_fields(np.maximum(np.asarray(frames, np.int64).ravel(), 0), rate)
+    sep = ";" if rate.drop_frame else ":"
+    return _pack([(h, _hour_width(h, 2)), ":", (m, 2), ":", (s, 2), sep, (ff, len(str(rate.nominal - 1)))])
+
+# Scalar shortcuts (plain int maths: a one-row array costs more than the formatting)
+def _clock(seconds, units):
+    total = math.floor(max(seconds, 0.0) * units + 0.5)
+    s, sub = divmod(total, units)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return h, m, s, sub
+
+def to_ass(seconds):
+    h, m, s, cs = _clock(seconds, 100)
+    return f"{h}:{m:02}:{s:02}.{cs:02}"
+
+def to_srt(seconds):
+    h, m, s, ms = _clock(seconds, 1000)
+    return f"{h:02}:{m:02}:{s:02},{ms:03}"
+
+def to_vtt(seconds):
+    h, m, s, ms = _clock(seconds, 1000)
+    return f"{h:02}:{m:02}:{s:02}.{ms:03}"
+
+def to_smpte(seconds, rate):
+    return format_smpte([seconds_to_frames(seconds, rate)], rate)[0]